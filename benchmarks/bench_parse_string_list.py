@@ -0,0 +1,103 @@
+"""
+基准测试：字符串化列表解析 parse_string_list 与 ast.literal_eval 的逐字段对比
+
+用法:
+    python benchmarks/bench_parse_string_list.py [数据文件 ...] [--repeat N]
+
+默认使用 data/output/complete 下步骤1生成的完整数据；数据文件可以是
+JSON / JSON Lines / MessagePack 任意格式。每个字段先校验两种解析结果完全一致，再分别计时。
+"""
+import argparse
+import ast
+import glob
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.parse_utils import parse_string_list
+from utils.serialization_utils import iter_records
+
+DEFAULT_INPUT = os.path.join("data", "output", "complete", "*.json")
+
+
+def collect_field_values(paths):
+    """
+    按字段收集需要解析的字符串（与DataCleaner._safe_parse_string_list的判断条件一致）
+
+    早期版本输出的数据中字段已经是列表，按Excel单元格的原始形式用str()还原为文本
+    """
+    values = defaultdict(list)
+    for path in paths:
+        for record in iter_records(path):
+            for field, value in record.items():
+                if isinstance(value, list):
+                    value = str(value)
+                if isinstance(value, str) and (value.startswith('[') or value.startswith("'[")):
+                    values[field].append(value)
+    return values
+
+
+def safe_call(parse, text):
+    """与清洗器一致：解析失败时返回原始字符串"""
+    try:
+        return parse(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def time_parser(parse, texts, repeat):
+    """返回解析全部文本repeat次的总耗时（秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            safe_call(parse, text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="parse_string_list 与 ast.literal_eval 逐字段基准测试")
+    parser.add_argument("inputs", nargs="*", help="数据文件路径，支持通配符")
+    parser.add_argument("--repeat", type=int, default=None,
+                        help="每个字段重复解析的次数，默认按数据量自动选择")
+    args = parser.parse_args()
+
+    patterns = args.inputs or [DEFAULT_INPUT]
+    paths = sorted(p for pattern in patterns for p in glob.glob(pattern))
+    if not paths:
+        print(f"没有找到数据文件: {patterns}")
+        return
+
+    field_values = collect_field_values(paths)
+    total_values = sum(len(v) for v in field_values.values())
+    if not total_values:
+        print("数据中没有字符串化的列表字段")
+        return
+    repeat = args.repeat or max(1, 20000 // total_values)
+
+    print(f"数据文件: {len(paths)} 个，待解析值: {total_values} 个，重复次数: {repeat}")
+    print(f"{'字段':<24}{'数量':>8}{'literal_eval(ms)':>18}{'fast(ms)':>12}{'加速比':>10}")
+
+    total_slow = total_fast = 0.0
+    for field, texts in field_values.items():
+        # 先校验结果一致，repr比较可以区分1与1.0、True与1等
+        for text in texts:
+            expected = safe_call(ast.literal_eval, text)
+            actual = safe_call(parse_string_list, text)
+            if repr(expected) != repr(actual):
+                raise AssertionError(f"字段 '{field}' 解析结果不一致: {text[:100]!r}")
+
+        slow = time_parser(ast.literal_eval, texts, repeat)
+        fast = time_parser(parse_string_list, texts, repeat)
+        total_slow += slow
+        total_fast += fast
+        print(f"{field:<24}{len(texts):>8}{slow * 1000:>18.1f}{fast * 1000:>12.1f}{slow / fast:>9.1f}x")
+
+    print(f"{'合计':<24}{total_values:>8}{total_slow * 1000:>18.1f}{total_fast * 1000:>12.1f}"
+          f"{total_slow / total_fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
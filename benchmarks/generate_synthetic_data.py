@@ -0,0 +1,303 @@
+"""
+合成数据生成器：按1688商品Excel的原始格式生成可复现的压测数据
+
+用法:
+    python benchmarks/generate_synthetic_data.py --rows 100000 --format excel --output-dir data/input
+    python benchmarks/generate_synthetic_data.py --rows 10000000 --format jsonl --rows-per-file 1000000
+
+生成的每条记录与步骤1从Excel读取的原始数据形状一致：
+- 时间、价格、销售、商品详情、公司基本信息、公司详情信息、包装重量：str(list)生成的嵌套列表文本
+- sku商品详情图片和信息：制表符分隔的SKU行组成的列表文本
+- 主产品图片、商品详情图片：URL列表文本
+
+excel格式用于从步骤1开始压测（写入data/input），json/jsonl/msgpack格式可以直接作为步骤2的输入。
+相同的参数和种子生成完全相同的数据；逐条生成并写出，内存占用与行数无关。
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import REQUIRED_FIELDS, OPTIONAL_FIELDS
+from utils.serialization_utils import open_record_writer, get_output_extension
+
+# 字段顺序与Excel表头一致
+FIELDS = list(REQUIRED_FIELDS) + [f for f in OPTIONAL_FIELDS if f not in REQUIRED_FIELDS]
+
+# Excel单个工作表最多1048576行（含表头）
+EXCEL_MAX_ROWS = 1048575
+
+_PRODUCTS = ["猫窝", "狗窝", "猫抓板", "宠物垫", "猫爬架", "宠物碗", "牵引绳", "猫砂盆", "宠物玩具", "宠物背包"]
+_ADJECTIVES = ["大号", "四季通用", "加厚", "可拆洗", "冬季保暖", "夏季凉席", "耐磨耐抓", "网红", "简约", "多功能"]
+_MATERIALS = ["棉", "麻", "PP", "PVC", "毛绒", "瓦楞纸", "实木", "硅胶"]
+_REGIONS = ["山东", "浙江", "广东", "江苏", "河北", "福建", "河南"]
+_COLORS = ["蓝色", "红色", "灰色", "粉色", "黑色", "白色", "卡其色", "绿色"]
+_SPECS = ["小号", "中号", "大号", "特大号", "XS", "S", "M", "L", "XL"]
+_CITIES = ["临沂", "义乌", "东莞", "苏州", "保定", "泉州", "郑州"]
+_COMPANY_WORDS = ["微视角", "宠乐", "萌趣", "优品", "恒达", "佳美", "鑫源", "森宠"]
+_COMPANY_TYPES = ["文化传媒", "宠物用品", "日用品", "工艺品", "贸易"]
+_BUSINESS_MODES = ["生产型", "经销批发", "招商代理"]
+
+_PACKAGE_HEADER = "规格\t颜色\t长(cm)\t宽(cm)\t高(cm)\t体积(cm³)\t重量(g)"
+
+
+class SyntheticDataGenerator:
+    """
+    合成数据生成器
+    商品标题、卖家、SKU按设定的比例重复出现，用于覆盖清洗缓存、去重规则等路径
+    """
+
+    def __init__(self, seed: int = 0, missing_rate: float = 0.02, duplicate_title_rate: float = 0.2,
+                 shared_seller_rate: float = 0.8, seller_count: int = 1000, sku_variation_rate: float = 0.5,
+                 history_size: int = 10000):
+        """
+        Args:
+            seed: 随机种子
+            missing_rate: 每个字段为空（空单元格）的概率
+            duplicate_title_rate: 商品复用之前某个商品标题的概率
+            shared_seller_rate: 商品来自共享卖家池的概率（其余为只出现一次的卖家）
+            seller_count: 共享卖家池的大小
+            sku_variation_rate: 重名商品的价格和SKU与原商品不同的概率（其余为完全相同的重复上架）
+            history_size: 可被复用的历史商品数上限（环形缓冲区，保证内存占用有界）
+        """
+        self.rnd = random.Random(seed)
+        self.missing_rate = missing_rate
+        self.duplicate_title_rate = duplicate_title_rate
+        self.shared_seller_rate = shared_seller_rate
+        self.sku_variation_rate = sku_variation_rate
+        self.history_size = history_size
+        self.sellers = [self._make_seller(i) for i in range(max(1, seller_count))]
+        self._history: List[Dict[str, Any]] = []
+        self._history_pos = 0
+        self._one_off_sellers = 0
+
+    def _make_seller(self, seller_id: int) -> Dict[str, str]:
+        """生成一个卖家的公司基本信息和公司详情信息（同一卖家的文本完全相同）"""
+        rnd = self.rnd
+        name = f"{rnd.choice(_CITIES)}{rnd.choice(_COMPANY_WORDS)}{rnd.choice(_COMPANY_TYPES)}有限公司{seller_id}"
+        company_info = [
+            [name],
+            [f"{rnd.randint(1, 15)}年回头率{rnd.randint(10, 90)}%主营{rnd.choice(_PRODUCTS)}"],
+            [f"成立时间 {rnd.randint(2000, 2023)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}"],
+            [f"{name}专业生产{rnd.choice(_PRODUCTS)}进入黄页"],
+        ]
+        if rnd.random() < 0.5:
+            details = (f"经营模式\n{rnd.choice(_BUSINESS_MODES)}\n年交易额\n{rnd.randint(0, 5000)}万\n"
+                       f"代工模式\nOEM,ODM\n厂房面积\n{rnd.randint(100, 50000)}m²")
+        else:
+            details = (f"基本信息\n注册资金\n人民币{rnd.randint(10, 5000)}万元\n经营模式\n生产厂家\n"
+                       f"行业信息\n主要市场\n{rnd.choice(['全国', '华东', '华南', '海外'])}\n"
+                       f"经营信息\n品牌名称\n{rnd.choice(_COMPANY_WORDS)}")
+        # 约一半的数据中换行以转义形式出现
+        if rnd.random() < 0.5:
+            details = details.replace("\n", "\\n")
+        return {"公司基本信息": str(company_info), "公司详情信息": str([[details]])}
+
+    def _pick_seller(self) -> Dict[str, str]:
+        if self.rnd.random() < self.shared_seller_rate:
+            return self.rnd.choice(self.sellers)
+        self._one_off_sellers += 1
+        return self._make_seller(len(self.sellers) + self._one_off_sellers)
+
+    def _make_title(self, index: int) -> str:
+        rnd = self.rnd
+        return (f"{rnd.choice(_PRODUCTS)}{rnd.choice(_ADJECTIVES)}{rnd.choice(_ADJECTIVES)}"
+                f"{rnd.choice(_MATERIALS)}{index}")
+
+    def _format_price(self, value: float) -> str:
+        """Excel中的价格文本：整数和小数部分被换行拆开"""
+        integer, decimal = f"{value:.2f}".split(".")
+        return f"¥\n{integer}\n.{decimal}"
+
+    def _make_price(self) -> tuple:
+        """生成价格文本和基准价"""
+        rnd = self.rnd
+        base = round(rnd.uniform(1, 200), 1)
+        style = rnd.random()
+        if style < 0.3:
+            text = (f"券后\n{self._format_price(base * 0.9)}\n\n首件预估到手价\n\n价格\n"
+                    f"{self._format_price(base)}\n\n1个起批")
+        elif style < 0.6:
+            tiers = [base, round(base * 0.95, 1), round(base * 0.9, 1)]
+            text = (f"{self._format_price(tiers[0])}\n\n1-9个\n\n{self._format_price(tiers[1])}\n\n10-99个\n\n"
+                    f"{self._format_price(tiers[2])}\n\n≥100个")
+        else:
+            text = f"{self._format_price(base)}\n\n{self._format_price(base * 1.2)}"
+        return str([[text]]), base
+
+    def _make_sku(self, base_price: float) -> str:
+        """生成SKU行：名称、商品ID、SKU ID、颜色+规格、图片、价格（部分行缺少图片和价格）"""
+        rnd = self.rnd
+        rows = []
+        for k in range(rnd.randint(1, 6)):
+            color_spec = f"{rnd.choice(_COLORS)}+{rnd.choice(_SPECS)}"
+            row = [rnd.choice(_PRODUCTS), str(rnd.randint(10 ** 11, 10 ** 12)),
+                   str(rnd.randint(10 ** 12, 10 ** 13)), color_spec]
+            if rnd.random() < 0.8:
+                price = f"{base_price + k:.2f}" if rnd.random() < 0.9 else "--"
+                row += [f"https://cbu01.alicdn.com/img/ibank/sku_{rnd.getrandbits(40):x}.jpg", price]
+            rows.append("\t".join(row))
+        return str(rows)
+
+    def _make_package_weight(self) -> str:
+        rnd = self.rnd
+        lines = [_PACKAGE_HEADER]
+        for _ in range(rnd.randint(1, 4)):
+            length, width, height = rnd.randint(10, 80), rnd.randint(10, 80), rnd.randint(5, 40)
+            lines.append(f"{rnd.choice(_SPECS)}\t{rnd.choice(_COLORS)}\t{length}\t{width}\t{height}\t"
+                         f"{length * width * height}\t{rnd.randint(50, 5000)}")
+        separator = "\n" if rnd.random() < 0.5 else "\\n"
+        return str([[separator.join(lines)]])
+
+    def _make_images(self, low: int, high: int) -> str:
+        rnd = self.rnd
+        return str([f"https://cbu01.alicdn.com/img/ibank/O1CN01{rnd.getrandbits(64):016x}.jpg"
+                    for _ in range(rnd.randint(low, high))])
+
+    def _make_product(self, index: int) -> Dict[str, Any]:
+        """生成一个新商品（标题、卖家、价格、SKU）"""
+        price, base_price = self._make_price()
+        return {
+            "title": self._make_title(index),
+            "seller": self._pick_seller(),
+            "价格": price,
+            "base_price": base_price,
+            "sku商品详情图片和信息": self._make_sku(base_price),
+        }
+
+    def _next_product(self, index: int) -> Dict[str, Any]:
+        """按duplicate_title_rate复用历史商品标题，否则生成新商品"""
+        rnd = self.rnd
+        if self._history and rnd.random() < self.duplicate_title_rate:
+            product = dict(rnd.choice(self._history))
+            if rnd.random() < self.sku_variation_rate:
+                # 同一标题、不同价格和SKU（可能是同一卖家的不同链接，也可能是其他卖家）
+                product["价格"], product["base_price"] = self._make_price()
+                product["sku商品详情图片和信息"] = self._make_sku(product["base_price"])
+                if rnd.random() < 0.5:
+                    product["seller"] = self._pick_seller()
+            return product
+
+        product = self._make_product(index)
+        if len(self._history) < self.history_size:
+            self._history.append(product)
+        else:
+            self._history[self._history_pos] = product
+            self._history_pos = (self._history_pos + 1) % self.history_size
+        return product
+
+    def make_record(self, index: int) -> Dict[str, Any]:
+        """
+        生成第index条原始记录
+
+        Returns:
+            Dict[str, Any]: 字段名 -> 单元格文本（空单元格为None）
+        """
+        rnd = self.rnd
+        product = self._next_product(index)
+        listed = f"2025-{rnd.randint(1, 9):02d}-{rnd.randint(1, 28):02d} {rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:00"
+        record = {
+            "商品标题": str([[product["title"]]]),
+            "时间": str([[f"最早上架时间：{listed}"], [f"最新发布时间：{listed}"]]),
+            "价格": product["价格"],
+            "销售": str([["年销量", f"{rnd.randint(0, 100000)}件"], ["近30天销量", f"{rnd.randint(0, 5000)}件"]]),
+            "商品详情": str([["材质", rnd.choice(_MATERIALS), "产地", rnd.choice(_REGIONS)],
+                            ["是否进口", "否", "货号", str(rnd.randint(1000, 99999))]]),
+            "主产品图片": self._make_images(1, 5),
+            "商品详情图片": self._make_images(0, 12),
+            "sku商品详情图片和信息": product["sku商品详情图片和信息"],
+            "产品网址": f"https://detail.1688.com/offer/{rnd.randint(10 ** 11, 10 ** 12)}.html",
+            "公司基本信息": product["seller"]["公司基本信息"],
+            "包装重量": self._make_package_weight(),
+            "公司详情信息": product["seller"]["公司详情信息"],
+        }
+        if self.missing_rate > 0:
+            for field in FIELDS:
+                if rnd.random() < self.missing_rate:
+                    record[field] = None
+        return {field: record[field] for field in FIELDS}
+
+    def iter_records(self, rows: int) -> Iterator[Dict[str, Any]]:
+        """逐条生成rows条记录"""
+        for index in range(rows):
+            yield self.make_record(index)
+
+
+def write_excel(records: Iterator[Dict[str, Any]], path: str, rows: int) -> None:
+    """以openpyxl的write_only模式逐行写入Excel"""
+    from openpyxl import Workbook
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
+    worksheet.append(FIELDS)
+    for _ in range(rows):
+        record = next(records)
+        worksheet.append([record[field] for field in FIELDS])
+    workbook.save(path)
+
+
+def write_records(records: Iterator[Dict[str, Any]], path: str, rows: int, fmt: str) -> None:
+    """以项目统一的增量写入器写入JSON/JSON Lines/MessagePack"""
+    with open_record_writer(path, fmt, lazy=False) as writer:
+        for _ in range(rows):
+            writer.write(next(records))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="生成1688商品格式的合成压测数据")
+    parser.add_argument("--rows", type=int, default=10000, help="生成的记录数（默认10000）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--format", choices=["excel", "json", "json_compact", "jsonl", "msgpack"],
+                        default="excel", help="输出格式")
+    parser.add_argument("--output-dir", default=os.path.join("data", "input"), help="输出目录")
+    parser.add_argument("--prefix", default="synthetic", help="输出文件名前缀")
+    parser.add_argument("--rows-per-file", type=int, default=None,
+                        help=f"每个文件的记录数，默认不拆分（excel最多{EXCEL_MAX_ROWS}行）")
+    parser.add_argument("--missing-rate", type=float, default=0.02, help="每个字段为空的概率")
+    parser.add_argument("--duplicate-title-rate", type=float, default=0.2, help="复用历史商品标题的概率")
+    parser.add_argument("--shared-seller-rate", type=float, default=0.8, help="商品来自共享卖家池的概率")
+    parser.add_argument("--sellers", type=int, default=1000, help="共享卖家池大小")
+    parser.add_argument("--sku-variation-rate", type=float, default=0.5, help="重名商品的价格/SKU不同的概率")
+    args = parser.parse_args(argv)
+
+    rows_per_file = args.rows_per_file or args.rows
+    if args.format == "excel":
+        rows_per_file = min(rows_per_file, EXCEL_MAX_ROWS)
+        extension = ".xlsx"
+    else:
+        extension = get_output_extension(args.format)
+
+    generator = SyntheticDataGenerator(
+        seed=args.seed,
+        missing_rate=args.missing_rate,
+        duplicate_title_rate=args.duplicate_title_rate,
+        shared_seller_rate=args.shared_seller_rate,
+        seller_count=args.sellers,
+        sku_variation_rate=args.sku_variation_rate,
+    )
+    records = generator.iter_records(args.rows)
+
+    file_count = (args.rows + rows_per_file - 1) // rows_per_file
+    start_time = time.perf_counter()
+    written = 0
+    for part in range(1, file_count + 1):
+        part_rows = min(rows_per_file, args.rows - written)
+        suffix = f"_{part:04d}" if file_count > 1 else ""
+        path = os.path.join(args.output_dir, f"{args.prefix}_s{args.seed}{suffix}{extension}")
+        if args.format == "excel":
+            write_excel(records, path, part_rows)
+        else:
+            write_records(records, path, part_rows, args.format)
+        written += part_rows
+        elapsed = time.perf_counter() - start_time
+        print(f"[{part}/{file_count}] {path}: {part_rows} 条，累计 {written} 条，"
+              f"{written / elapsed:.0f} 条/秒")
+
+
+if __name__ == "__main__":
+    main()
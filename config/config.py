@@ -17,6 +17,12 @@ REQUIRED_FIELDS = [
     "公司基本信息"
 ]
 
+# 可选字段配置 - 不参与完整性验证，但清洗阶段会使用
+OPTIONAL_FIELDS = [
+    "包装重量",
+    "公司详情信息"
+]
+
 # Excel处理配置
 EXCEL_CONFIG = {
     "visible": False,           # Excel应用是否可见
@@ -35,7 +41,7 @@ XLWINGS_SETTINGS = {
 
 # 输出设置# 输出设置
 OUTPUT_SETTINGS = {
-    "format": "json",          # 输出格式
+    "format": "json",          # 输出格式: json(带缩进) / json_compact / jsonl / msgpack
     "encoding": "utf-8",       # 文件编码
     "backup_enabled": True,    # 是否启用备份
     "indent": 2               # JSON缩进
@@ -46,7 +52,8 @@ PROCESSING_RULES = {
     "batch_size": 100,         # 批处理大小
     "log_level": "INFO",       # 日志级别
     "max_retries": 3,          # 最大重试次数
-    "timeout": 30              # 超时时间(秒)
+    "timeout": 30,             # 超时时间(秒)
+    "max_workers": 4           # 并行处理的进程数，<=1时串行处理
 }
 
 # 数据验证配置
@@ -55,14 +62,67 @@ VALIDATION_CONFIG = {
     "check_empty_string": True, # 检查空字符串
     "check_empty_list": True,  # 检查空列表
     "generate_report": True,   # 生成验证报告
-    "save_incomplete_data": True  # 保存不完整数据
+    "save_incomplete_data": True,  # 保存不完整数据
+    "columnar": True           # 按列批量计算空值掩码（False时逐行逐字段检查）
+}
+
+# 清洗计划配置 - 字段与清洗器类型的对应关系，DataCleaner初始化时编译一次
+CLEANING_PLAN_CONFIG = {
+    "fields": {                # 字段名 -> 清洗器类型（按此顺序输出字段）
+        "商品标题": "title",
+        "时间": "time",
+        "价格": "price",
+        "销售": "sales",
+        "商品详情": "product_details",
+        "包装重量": "package_weight",
+        "主产品图片": "image_urls",
+        "商品详情图片": "image_urls",
+        "sku商品详情图片和信息": "sku",
+        "产品网址": "product_url",
+        "公司基本信息": "company_info",
+        "公司详情信息": "company_details"
+    },
+    "enabled_fields": None,    # 只清洗列出的字段，None表示清洗fields中的全部字段
+    "numeric_prices": True,    # 额外输出数值价格："价格数值"（最低价/最高价/券后价）和每个SKU的"价格数值"
+    "sku_fingerprint": True    # 额外输出"SKU指纹"（颜色规格 -> 价格 映射的哈希），步骤三直接读取，不再逐个商品计算
+}
+
+# 包装重量配置
+PACKAGE_WEIGHT_CONFIG = {
+    "output_mode": "rows",          # rows: 每行一个字典（字符串值）；columns: 表头 + 按列的数组，尺寸和重量为数值
+    "numeric_columns": ["长(cm)", "宽(cm)", "高(cm)", "体积(cm³)", "重量(g)"]  # columns形式下转换为数值的列
+}
+
+# 清洗缓存配置 - 同一供应商的商品重复出现完全相同的公司字段，按原始值缓存清洗结果
+CLEANING_CACHE_CONFIG = {
+    "enabled": True,           # 是否启用字段清洗缓存
+    "fields": {                # 需要缓存的字段及其LRU缓存容量（条数）
+        "公司基本信息": 4096,
+        "公司详情信息": 4096
+    }
+}
+
+# 步骤二批量处理配置 - 多个分割文件并行清洗，内容和清洗版本未变化的文件直接跳过
+STEP2_BATCH_CONFIG = {
+    "max_workers": 4,               # 同时清洗的文件数（进程数），<=1时逐个文件处理（文件内按PROCESSING_RULES并行）
+    "skip_unchanged": True,         # 输入内容哈希和清洗版本与清单一致且输出仍存在时跳过
+    "manifest_file": "step2_manifest.json"  # 清单文件名，保存在step2_cleandata目录下
+}
+
+# 诊断统计配置 - 逐条警告改为按类别计数，处理结束后统一输出
+DIAGNOSTICS_CONFIG = {
+    "max_samples": 5           # 每个统计项保留的示例数（记录索引、商品标题等）
 }
 
 # 日志配置
 LOGGING_CONFIG = {
     "level": "INFO",
     "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    "file_path": "data/output/logs/validation.log"
+    "file_path": "data/output/logs/validation.log",
+    "queue_mode": "auto",              # 队列模式：日志先入队，由单独的监听线程写文件和终端（多进程共享日志文件）；
+                                       # auto: 启动进程池时才切换到队列模式，True: 始终使用，False: 不使用
+    "max_bytes": 10 * 1024 * 1024,     # 队列模式下单个日志文件的轮转大小，0表示不轮转
+    "backup_count": 5                  # 队列模式下保留的轮转日志文件数
 }
 
 
@@ -72,7 +132,33 @@ SPLIT_CONFIG = {
     "create_subdirs": True,         # 是否创建子目录
     "split_threshold": 300,         # 分割阈值，超过此数量才进行分割
     "output_subdir": "split_data",  # 分割文件输出子目录名
-    "auto_split": True              # 是否自动分割
+    "auto_split": True,             # 是否自动分割
+    "streaming": True,              # split_json_file是否逐条流式解析（内存占用与文件大小无关）
+    "max_bytes": None               # 每个分割文件的目标字节数上限（如50 * 1024 * 1024），None表示只按条数分割
+}
+
+# 去重配置
+DEDUP_CONFIG = {
+    "compact_products": True,       # 去重时以紧凑商品对象（槽位 + 共享值 + 列式SKU/包装重量）保存商品，减少内存占用
+    "external_memory": False,       # 外存模式：商品写入磁盘标题索引（临时SQLite），内存占用取决于最大的标题分组而不是商品总数
+    "external_temp_dir": None,      # 外存模式临时索引所在目录，None表示使用系统临时目录
+    # 复合键去重规则（可用字段: company 公司名称 / price 价格 / sku SKU指纹，即颜色规格->价格映射排序后的哈希）
+    "partition_fields": ["company"],  # 同标题商品按这些字段分区，字段不同视为不同产品（归入唯一商品）
+    "redundant_fields": ["price"],    # 分区内这些字段全部相同视为冗余，只保留第一个
+    "variant_fields": ["sku"],        # 分区内冗余键唯一的商品有多个时按这些字段分组：相同视为冗余，不同归入重名商品
+    "variant_grouping": "bucket",     # bucket: 按SKU指纹分桶，每种SKU组合各保留一个；first: 旧逻辑，只与第一个商品比较
+    "incremental": False,             # 增量模式：只处理未并入商品目录的输入文件，与目录中相同标题的商品一起去重
+    "catalog_path": None              # 商品目录（SQLite）路径，None表示唯一商品输出目录的上一级下的product_catalog.sqlite
+}
+
+# 近似重名检测配置（MinHash + LSH）
+NEAR_DUPLICATE_CONFIG = {
+    "enabled": False,               # 开启后标题相似度达到阈值的商品合并为同一标题，再按公司/价格/SKU规则去重
+    "threshold": 0.8,               # 字符shingle集合的Jaccard相似度阈值
+    "shingle_size": 2,              # 字符shingle长度（中文标题以2为宜）
+    "num_perm": 128,                # MinHash签名长度，越长越准确、越慢
+    "bands": None,                  # LSH的band数，None表示按阈值自动选择
+    "seed": 1                       # 哈希函数随机种子，相同种子结果可复现
 }
 
 # 产品属性提取配置
@@ -2,22 +2,41 @@
 数据清洗模块 - 将完整的原始数据转换为标准化JSON格式
 实现第二步：对验证通过的完整数据进行字段清洗和格式转换
 """
+import hashlib
 import json
+import logging
 import re
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 
 # 导入配置和工具函数
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.config import REQUIRED_FIELDS, OUTPUT_SETTINGS, PROCESSING_RULES
-from utils.logger_utils import setup_logger
-from utils.validation_utils import is_none_or_empty
-import ast
+from config.config import (
+    REQUIRED_FIELDS, OUTPUT_SETTINGS, PROCESSING_RULES, CLEANING_CACHE_CONFIG, CLEANING_PLAN_CONFIG,
+    PACKAGE_WEIGHT_CONFIG
+)
+from utils.logger_utils import setup_logger, get_log_queue, init_worker_logging
+from utils.serialization_utils import dump_records, open_record_writer, iter_records
+from utils.parse_utils import parse_string_list
+from utils.cache_utils import LRUCache
+from utils.diagnostics_utils import DiagnosticsCollector
+from utils.price_utils import extract_price_values, parse_price_number
+from src.dedupe_engine import SKU_FINGERPRINT_FIELD, sku_fingerprint
 
+# 预编译的正则表达式
+_MULTI_NEWLINE_RE = re.compile(r'\n{2,}')
+_RETURN_RATE_RE = re.compile(r'回头率\s*(\d+%)')
+_ESTABLISHED_DATE_RE = re.compile(r'成立时间\s*(\d{4}-\d{2}-\d{2})')
+# 包装重量表格的行分隔符：转义的"\\n"和真实换行，一次扫描完成分行
+_TABLE_LINE_SPLIT_RE = re.compile(r'\\n|\n')
+# 包装重量表格中的数值（长、宽、高、体积、重量）
+_TABLE_NUMBER_RE = re.compile(r'-?\d+(?:\.\d+)?')
 
 class DataCleaner:
     """
@@ -25,28 +44,133 @@ class DataCleaner:
     负责将原始的完整数据转换为标准化的JSON格式
     """
     
-    def __init__(self):
+    # 清洗逻辑版本，修改任何清洗方法的输出时需要递增，步骤二据此判断已有的清洗结果是否过期
+    CLEANER_VERSION = "4"
+    
+    # 清洗器类型 -> 清洗方法名，CLEANING_PLAN_CONFIG中的字段通过类型引用清洗方法
+    CLEANER_METHODS = {
+        "title": "_clean_title",
+        "time": "_clean_time_data",
+        "price": "_clean_price_data",
+        "sales": "_clean_sales_data",
+        "product_details": "_clean_product_details",
+        "package_weight": "_clean_package_weight",
+        "image_urls": "_clean_image_urls",
+        "sku": "_clean_sku_data",
+        "product_url": "_clean_product_url",
+        "company_info": "_clean_company_info",
+        "company_details": "_clean_company_details"
+    }
+    
+    def __init__(self, enabled_fields: Optional[List[str]] = None):
         """
         初始化数据清洗器
         
         Args:
-            log_file_path: 日志文件路径，如果为None则使用默认路径
+            enabled_fields: 只清洗的字段列表，为None时使用CLEANING_PLAN_CONFIG中的enabled_fields
         """
         self.logger = setup_logger(log_name="step2_data_cleaner")
         self.output_settings = OUTPUT_SETTINGS
         self.processing_rules = PROCESSING_RULES
         
+        if enabled_fields is None:
+            enabled_fields = CLEANING_PLAN_CONFIG.get("enabled_fields")
+        self.enabled_fields = list(enabled_fields) if enabled_fields is not None else None
+        
+        # 按字段的清洗结果缓存，键为原始字段值
+        self.field_caches = {}
+        if CLEANING_CACHE_CONFIG.get("enabled", False):
+            self.field_caches = {
+                field_name: LRUCache(maxsize)
+                for field_name, maxsize in CLEANING_CACHE_CONFIG.get("fields", {}).items()
+                if self.enabled_fields is None or field_name in self.enabled_fields
+            }
+        
+        # 包装重量的输出形式：rows（字典列表）或 columns（表头 + 按列的数值数组）
+        self.package_weight_mode = PACKAGE_WEIGHT_CONFIG.get("output_mode", "rows")
+        if self.package_weight_mode not in ("rows", "columns"):
+            raise ValueError(f"不支持的包装重量输出形式: {self.package_weight_mode}")
+        self.package_weight_numeric_columns = frozenset(PACKAGE_WEIGHT_CONFIG.get("numeric_columns", ()))
+        
+        # 是否额外输出数值价格（"价格数值"字段和每个SKU的"价格数值"）
+        self.numeric_prices = CLEANING_PLAN_CONFIG.get("numeric_prices", False)
+        
+        # 是否额外输出SKU指纹（"SKU指纹"字段，步骤三按它对同公司不同价格的商品分桶）
+        self.sku_fingerprints = CLEANING_PLAN_CONFIG.get("sku_fingerprint", False)
+        
+        # 编译清洗计划：字段 -> 清洗方法、缓存和缺失时的清洗结果，只在初始化时构建一次
+        self.cleaning_plan = self._compile_cleaning_plan()
+        # 除元数据外至少需要的业务字段数（全部字段时为2，与原有判断一致）
+        self.min_cleaned_fields = min(2, len(self.cleaning_plan))
+        # 由价格文本派生数值价格的字段（清洗器类型为price的字段）
+        self.numeric_price_field = None
+        if self.numeric_prices:
+            self.numeric_price_field = next(
+                (field_name for field_name, *_ in self.cleaning_plan
+                 if CLEANING_PLAN_CONFIG["fields"][field_name] == "price"), None)
+        
         # 清洗结果存储
-        self.cleaning_results = {
-            "total_count": 0,
-            "success_count": 0,
-            "error_count": 0,
-            "cleaned_data": [],
-            "error_data": [],
-            "cleaning_report": {}
-        }
+        self.cleaning_results = _new_cleaning_results()
+        
+        # 当前清洗的输入文件，写入清洗失败记录的_source_file，用于按需还原原始数据
+        self._source_file: Optional[str] = None
+        
+        # 流式清洗使用的进程池，跨文件复用（工作进程中的字段缓存也随之复用），close()时关闭
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_workers = 0
+        
+        self.logger.info(f"数据清洗器初始化完成，清洗字段数: {len(self.cleaning_plan)}")
+    
+    def _compile_cleaning_plan(self) -> List[Tuple[str, Callable[[Any], Any], Optional[LRUCache], Any]]:
+        """
+        根据CLEANING_PLAN_CONFIG编译清洗计划
+        
+        Returns:
+            List[Tuple]: 按输出顺序排列的 (字段名, 清洗方法, 字段缓存, 字段缺失时的清洗结果)
+            
+        Raises:
+            ValueError: 配置了未知的清洗器类型或字段
+        """
+        field_types = CLEANING_PLAN_CONFIG["fields"]
+        
+        if self.enabled_fields is not None:
+            unknown_fields = [f for f in self.enabled_fields if f not in field_types]
+            if unknown_fields:
+                raise ValueError(f"清洗计划中没有以下字段: {unknown_fields}")
+        
+        plan = []
+        for field_name, cleaner_type in field_types.items():
+            if self.enabled_fields is not None and field_name not in self.enabled_fields:
+                continue
+            
+            method_name = self.CLEANER_METHODS.get(cleaner_type)
+            if method_name is None:
+                raise ValueError(f"字段 '{field_name}' 配置了未知的清洗器类型: {cleaner_type}")
+            cleaner_func = getattr(self, method_name)
+            
+            # 字段缺失时的清洗结果是固定的，预先计算一次
+            plan.append((field_name, cleaner_func, self.field_caches.get(field_name), cleaner_func(None)))
         
-        self.logger.info("数据清洗器初始化完成")
+        return plan
+    
+    def get_version(self) -> str:
+        """
+        获取清洗版本：清洗逻辑版本 + 影响输出内容的配置（清洗字段、输出格式）的摘要
+        
+        Returns:
+            str: 版本字符串，相同版本对相同输入的输出完全一致
+        """
+        settings = {
+            "fields": [(field_name, CLEANING_PLAN_CONFIG["fields"][field_name]) for field_name, *_ in self.cleaning_plan],
+            "numeric_prices": self.numeric_prices,
+            "sku_fingerprint": self.sku_fingerprints,
+            "package_weight": [self.package_weight_mode, sorted(self.package_weight_numeric_columns)],
+            "format": self.output_settings.get("format", "json"),
+            "indent": self.output_settings.get("indent", 2),
+            "encoding": self.output_settings.get("encoding", "utf-8")
+        }
+        digest = hashlib.sha1(json.dumps(settings, ensure_ascii=False).encode("utf-8")).hexdigest()
+        return f"{self.CLEANER_VERSION}-{digest[:12]}"
     
     def _safe_parse_string_list(self, value: Any) -> Any:
         """
@@ -60,57 +184,263 @@ class DataCleaner:
         """
         if isinstance(value, str) and (value.startswith('[') or value.startswith("'[")):
             try:
-                # 使用ast.literal_eval更安全地解析
-                return ast.literal_eval(value)
+                # 字符串嵌套列表走快速解析，其他形式内部回退到ast.literal_eval
+                return parse_string_list(value)
             except (ValueError, SyntaxError):
                 # 如果解析失败，返回原始字符串
                 return value
         return value
     
-    def clean_product_data(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def clean_product_data(self, data: List[Dict[str, Any]], max_workers: Optional[int] = None,
+                           source_file: Optional[str] = None) -> Dict[str, Any]:
         """
         清洗商品数据主函数
         
         Args:
             data: 完整的原始数据列表
+            max_workers: 并行清洗的进程数，为None时使用PROCESSING_RULES中的max_workers，<=1时串行处理
+            source_file: data的来源文件，记录在清洗失败数据中，用于按需还原原始数据
             
         Returns:
             Dict[str, Any]: 清洗结果
         """
         self.logger.info(f"开始清洗数据，共 {len(data)} 条记录")
+        self._source_file = source_file
         
         # 重置清洗结果
-        self.cleaning_results = {
-            "total_count": len(data),
-            "success_count": 0,
-            "error_count": 0,
-            "cleaned_data": [],
-            "error_data": [],
-            "cleaning_report": {}
-        }
+        self.cleaning_results = _new_cleaning_results(len(data))
+        
+        batch_size = self.processing_rules.get("batch_size", 100)
+        if max_workers is None:
+            max_workers = self.processing_rules.get("max_workers", 1)
+        # 数据不足一个批次时进程池的启动开销大于收益，直接串行处理
+        max_workers = min(max_workers, (len(data) + batch_size - 1) // batch_size)
+        
+        if max_workers > 1:
+            self._clean_rows_parallel(data, batch_size, max_workers)
+        else:
+            self._reset_cache_stats()
+            self._clean_rows(data)
+            self._add_cache_stats(self._get_cache_stats())
+        
+        # 生成清洗报告
+        self._generate_cleaning_report()
+        
+        self.logger.info(f"数据清洗完成：成功 {self.cleaning_results['success_count']} 条，"
+                        f"失败 {self.cleaning_results['error_count']} 条")
+        
+        return self.cleaning_results
+    
+    def _clean_rows(self, rows: List[Dict[str, Any]], start_index: int = 0):
+        """
+        逐条清洗数据，结果追加到cleaning_results中
+        
+        Args:
+            rows: 原始数据列表
+            start_index: 第一条数据在整个输入中的索引，用于生成_original_index
+        """
+        self.cleaning_results["cleaned_data"].extend(self.clean_iter(rows, start_index))
+    
+    def clean_iter(self, records: Iterable[Dict[str, Any]], start_index: int = 0,
+                   error_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        逐条清洗数据的生成器，每清洗成功一条就立即产出，不在内存中累积结果
+        
+        成功/失败条数和诊断统计累加到cleaning_results中；清洗失败的数据
+        交给error_callback处理，未指定时追加到cleaning_results["error_data"]
         
-        # 逐条清洗数据
-        for index, row in enumerate(data):
+        Args:
+            records: 原始数据的可迭代对象（如iter_records()的返回值）
+            start_index: 第一条数据在整个输入中的索引，用于生成_original_index
+            error_callback: 接收清洗失败记录的回调函数
+            
+        Yields:
+            Dict[str, Any]: 清洗后的数据项
+        """
+        for index, row in enumerate(records, start_index):
             try:
                 cleaned_item = self._clean_single_item(row, index)
                 if cleaned_item:
-                    self.cleaning_results["cleaned_data"].append(cleaned_item)
                     self.cleaning_results["success_count"] += 1
+                    yield cleaned_item
                 else:
-                    self._handle_cleaning_error(row, index, "清洗后数据为空")
+                    self._handle_cleaning_error(row, index, "清洗后数据为空", error_callback)
                     
             except Exception as e:
                 self.logger.error(f"清洗第 {index} 条数据时出错: {e}")
-                self._handle_cleaning_error(row, index, str(e))
+                self._handle_cleaning_error(row, index, str(e), error_callback)
+    
+    def clean_to_files(self, records: Iterable[Dict[str, Any]], success_path: str, error_path: str,
+                       max_workers: Optional[int] = None, source_file: Optional[str] = None) -> Dict[str, Any]:
+        """
+        流式清洗：边读取边清洗边写入，清洗结果不在内存中累积，内存占用与输入文件大小无关
         
-        # 生成清洗报告
+        清洗成功的数据写入success_path（数据为空时同样生成文件），清洗失败的数据
+        写入error_path（没有失败数据时不生成文件），格式按OUTPUT_SETTINGS["format"]。
+        读取或清洗中途出错时删除已写出的部分文件后重新抛出异常，不会留下被截断的输出。
+        同一个清洗器可以依次处理多个文件，字段缓存和进程池在文件之间复用。
+        
+        Args:
+            records: 原始数据的可迭代对象（如iter_records()的返回值）
+            success_path: 清洗成功数据的输出路径
+            error_path: 清洗失败数据的输出路径
+            max_workers: 并行清洗的进程数，为None时使用PROCESSING_RULES中的max_workers，<=1时串行处理
+            source_file: records的来源文件，记录在清洗失败数据中，用于按需还原原始数据
+            
+        Returns:
+            Dict[str, Any]: 清洗结果（cleaned_data和error_data为空，数据已写入文件）
+        """
+        self.cleaning_results = _new_cleaning_results()
+        self._source_file = source_file
+        
+        batch_size = self.processing_rules.get("batch_size", 100)
+        if max_workers is None:
+            max_workers = self.processing_rules.get("max_workers", 1)
+        
+        batches = _iter_batches(records, batch_size)
+        # 预读两个批次：数据不足两个批次时进程池的启动开销大于收益，直接串行处理
+        head_batches = list(islice(batches, 2))
+        batches = chain(head_batches, batches)
+        
+        with open_record_writer(success_path, lazy=False) as success_writer, \
+                open_record_writer(error_path) as error_writer:
+            if max_workers > 1 and len(head_batches) > 1:
+                self.logger.info(f"启用并行流式清洗模式，进程数: {max_workers}，批次大小: {batch_size}")
+                for batch_results in self._iter_batch_results_parallel(batches, max_workers):
+                    # 批次数据直接写入文件，只合并统计信息
+                    for cleaned_item in batch_results["cleaned_data"]:
+                        success_writer.write(cleaned_item)
+                    for error_item in batch_results["error_data"]:
+                        # 工作进程不知道来源文件，写入前补上
+                        error_item["_source_file"] = source_file
+                        error_writer.write(error_item)
+                    batch_results["cleaned_data"] = []
+                    batch_results["error_data"] = []
+                    self.merge_results(batch_results)
+            else:
+                self._reset_cache_stats()
+                for start_index, rows in batches:
+                    for cleaned_item in self.clean_iter(rows, start_index, error_writer.write):
+                        success_writer.write(cleaned_item)
+                self._add_cache_stats(self._get_cache_stats())
+        
+        # 每条数据要么清洗成功要么记为失败
+        self.cleaning_results["total_count"] = (self.cleaning_results["success_count"]
+                                                + self.cleaning_results["error_count"])
         self._generate_cleaning_report()
         
-        self.logger.info(f"数据清洗完成：成功 {self.cleaning_results['success_count']} 条，"
-                        f"失败 {self.cleaning_results['error_count']} 条")
+        self.logger.info(f"流式清洗完成：成功 {self.cleaning_results['success_count']} 条，"
+                        f"失败 {self.cleaning_results['error_count']} 条，清洗数据已写入: {success_path}")
+        if self.cleaning_results["error_count"]:
+            self.logger.info(f"清洗失败数据已写入: {error_path}")
         
         return self.cleaning_results
     
+    def _iter_batch_results_parallel(self, batches: Iterable[Tuple[int, List[Dict[str, Any]]]],
+                                     max_workers: int) -> Iterator[Dict[str, Any]]:
+        """
+        使用进程池清洗批次，按提交顺序产出各批次结果
+        同时在途的批次数不超过max_workers * 2，避免提前读入整个文件
+        
+        Args:
+            batches: (第一条数据的全局索引, 该批次的原始数据) 的可迭代对象
+            max_workers: 进程数
+            
+        Yields:
+            Dict[str, Any]: 单个批次的清洗结果
+        """
+        executor = self._get_executor(max_workers)
+        pending = deque()
+        for batch in batches:
+            pending.append(executor.submit(_clean_batch_worker, batch))
+            if len(pending) >= max_workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    
+    def _get_executor(self, max_workers: int) -> ProcessPoolExecutor:
+        """获取可复用的进程池，进程数变化时重新创建"""
+        if self._executor is not None and self._executor_workers != max_workers:
+            self.close()
+        if self._executor is None:
+            # 工作进程按相同的字段范围创建清洗器
+            self._executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker_cleaner,
+                                                 initargs=(self.enabled_fields, get_log_queue()))
+            self._executor_workers = max_workers
+        return self._executor
+    
+    def close(self):
+        """关闭流式清洗使用的进程池"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._executor_workers = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def _clean_rows_parallel(self, data: List[Dict[str, Any]], batch_size: int, max_workers: int):
+        """
+        按batch_size分批，使用进程池并行清洗，并按批次顺序合并结果
+        
+        Args:
+            data: 完整的原始数据列表
+            batch_size: 每个批次的记录数
+            max_workers: 进程数
+        """
+        self.logger.info(f"启用并行清洗模式，进程数: {max_workers}，批次大小: {batch_size}")
+        
+        batches = [(start, data[start:start + batch_size]) for start in range(0, len(data), batch_size)]
+        
+        # 工作进程按相同的字段范围创建清洗器
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker_cleaner,
+                                 initargs=(self.enabled_fields, get_log_queue())) as executor:
+            # executor.map按提交顺序返回结果，合并后的_original_index顺序与串行处理一致
+            for batch_results in executor.map(_clean_batch_worker, batches):
+                for error_item in batch_results["error_data"]:
+                    error_item["_source_file"] = self._source_file
+                self.merge_results(batch_results)
+    
+    def merge_results(self, other_results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        将另一份清洗结果（如并行进程中单个批次的结果）追加到当前结果中
+        
+        Args:
+            other_results: 另一份清洗结果，_original_index应已是全局索引
+            
+        Returns:
+            Dict[str, Any]: 合并后的清洗结果
+        """
+        results = self.cleaning_results
+        results["success_count"] += other_results["success_count"]
+        results["error_count"] += other_results["error_count"]
+        results["cleaned_data"].extend(other_results["cleaned_data"])
+        results["error_data"].extend(other_results["error_data"])
+        self._add_cache_stats(other_results.get("cache_stats", {}))
+        if other_results.get("diagnostics"):
+            results["diagnostics"].merge(other_results["diagnostics"])
+        return results
+    
+    def _reset_cache_stats(self):
+        """重置各字段缓存的命中统计（保留缓存内容，供后续文件继续命中）"""
+        for cache in self.field_caches.values():
+            cache.reset_stats()
+    
+    def _get_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """获取各字段缓存的命中统计"""
+        return {field_name: cache.stats() for field_name, cache in self.field_caches.items()}
+    
+    def _add_cache_stats(self, cache_stats: Dict[str, Dict[str, int]]):
+        """将一份缓存统计累加到清洗结果中"""
+        total_stats = self.cleaning_results["cache_stats"]
+        for field_name, stats in cache_stats.items():
+            field_stats = total_stats.setdefault(field_name, {"hits": 0, "misses": 0, "maxsize": stats["maxsize"]})
+            field_stats["hits"] += stats["hits"]
+            field_stats["misses"] += stats["misses"]
+    
     def _clean_single_item(self, item: Dict[str, Any], index: int) -> Optional[Dict[str, Any]]:
         """
         清洗单个数据项
@@ -126,41 +456,88 @@ class DataCleaner:
             "_original_index": index,
         }
         
-        # 清洗各个字段
-        field_cleaners = {
-            "商品标题": self._clean_title,
-            "时间": self._clean_time_data,
-            "价格": self._clean_price_data,
-            "销售": self._clean_sales_data,
-            "商品详情": self._clean_product_details,
-            "包装重量": self._clean_package_weight,
-            "主产品图片": self._clean_image_urls,
-            "商品详情图片": self._clean_image_urls,
-            "sku商品详情图片和信息": self._clean_sku_data,
-            "产品网址": self._clean_product_url,
-            "公司基本信息": self._clean_company_info,
-            "公司详情信息": self._clean_company_details
-        }
-        
-        for field_name, cleaner_func in field_cleaners.items():
+        for field_name, cleaner_func, cache, absent_value in self.cleaning_plan:
             try:
                 raw_value = item.get(field_name)
-                # 1. 移除原始值空检查，始终执行清洗流程
-                parsed_value = self._safe_parse_string_list(raw_value)
-                cleaned_value = cleaner_func(parsed_value)
                 
-                # 2. 直接添加字段（不再检查 cleaned_value 是否为 None）
+                if raw_value is None:
+                    # 字段缺失：直接使用预先计算的清洗结果
+                    cleaned_item[field_name] = _copy_cleaned_value(absent_value)
+                    self._record_empty_field(field_name, index)
+                    continue
+                
+                if isinstance(raw_value, str):
+                    if cache is not None:
+                        # 相同原始值直接复用缓存的清洗结果
+                        cleaned_value = self._clean_field_cached(cache, raw_value, cleaner_func)
+                    elif raw_value.startswith('[') or raw_value.startswith("'["):
+                        cleaned_value = cleaner_func(self._safe_parse_string_list(raw_value))
+                    else:
+                        cleaned_value = cleaner_func(raw_value)
+                    is_empty = not raw_value or raw_value.isspace()
+                else:
+                    # 已经是结构化数据（如列表），无需解析
+                    cleaned_value = cleaner_func(raw_value)
+                    is_empty = isinstance(raw_value, (list, dict)) and not raw_value
+                
+                # 直接添加字段（不再检查 cleaned_value 是否为 None）
                 cleaned_item[field_name] = cleaned_value
                 
-                # 3. 调整日志级别：原始数据为空时仅记录 debug 信息
-                if is_none_or_empty(raw_value):
-                    self.logger.warning(f"字段 '{field_name}' 原始数据为空，索引: {index}")
+                if is_empty:
+                    self._record_empty_field(field_name, index)
                     
             except Exception as e:
-                self.logger.error(f"清洗字段 '{field_name}' 时出错，索引: {index}，错误: {e}")
+                # 只计数并保留少量示例，逐条明细仅在DEBUG级别输出
+                diagnostics = self.cleaning_results["diagnostics"]
+                diagnostics.record("字段清洗出错", field_name, {"索引": index, "错误": str(e)})
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(f"清洗字段 '{field_name}' 时出错，索引: {index}，错误: {e}")
                 # 继续处理其他字段，不因单个字段错误而失败
         
-        return cleaned_item if len(cleaned_item) > 2 else None  # 除了元数据外至少要有一个业务字段
+        # 除了元数据外至少要有min_cleaned_fields个业务字段
+        if len(cleaned_item) <= self.min_cleaned_fields:
+            return None
+        
+        # 数值价格在清洗时解析一次，下游比较、排序、分桶时无需再解析文本
+        if self.numeric_price_field is not None and self.numeric_price_field in cleaned_item:
+            cleaned_item["价格数值"] = extract_price_values(cleaned_item[self.numeric_price_field])
+        
+        # SKU指纹同样只在清洗时计算一次，步骤三直接读取
+        if self.sku_fingerprints and "sku商品详情图片和信息" in cleaned_item:
+            cleaned_item[SKU_FINGERPRINT_FIELD] = sku_fingerprint(cleaned_item)
+        
+        return cleaned_item
+    
+    def _record_empty_field(self, field_name: str, index: int):
+        """
+        记录原始数据为空的字段（计数并保留少量示例索引，逐条明细仅在DEBUG级别输出）
+        
+        Args:
+            field_name: 字段名
+            index: 数据项索引
+        """
+        self.cleaning_results["diagnostics"].record("字段原始数据为空", field_name, index)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"字段 '{field_name}' 原始数据为空，索引: {index}")
+    
+    def _clean_field_cached(self, cache: LRUCache, raw_value: str, cleaner_func) -> Any:
+        """
+        带缓存的字段清洗，缓存未命中时解析并清洗原始值后写入缓存
+        
+        Args:
+            cache: 该字段的LRU缓存
+            raw_value: 原始字段值（字符串）
+            cleaner_func: 字段清洗函数
+            
+        Returns:
+            Any: 清洗后的字段值（缓存值的副本）
+        """
+        cleaned_value = cache.get(raw_value, _CACHE_MISS)
+        if cleaned_value is _CACHE_MISS:
+            cleaned_value = cleaner_func(self._safe_parse_string_list(raw_value))
+            cache.put(raw_value, cleaned_value)
+        # 返回副本，避免多个商品共享同一个字典对象
+        return _copy_cleaned_value(cleaned_value)
     
     def _clean_title(self, raw_title: Any) -> Optional[str]:
         """
@@ -221,7 +598,7 @@ class DataCleaner:
         price_text_raw = price_text_raw.replace('\r\n', '\n').strip()
 
         # 两个及以上换行替换为空格
-        price_text_raw = re.sub(r'\n{2,}', ' ', price_text_raw)
+        price_text_raw = _MULTI_NEWLINE_RE.sub(' ', price_text_raw)
         # 单个换行去掉
         price_text_raw = price_text_raw.replace('\n', '')
 
@@ -271,15 +648,20 @@ class DataCleaner:
         
         return details_dict if details_dict else {}
     
-    def _clean_package_weight(self, raw_weight: Any) -> List[Dict[str, Union[str, int]]]:
+    def _clean_package_weight(self, raw_weight: Any) -> Union[List[Dict[str, str]], Dict[str, Any]]:
         """
         清洗包装重量数据
         
         输入格式: [['规格\t颜色\t长(cm)\t宽(cm)\t高(cm)\t体积(cm³)\t重量(g)\n大号【直径约50厘米】\t蓝色\t50\t50\t13\t32500\t810\n...']]
-        输出格式: [{"规格": "大号【直径约50厘米】", "颜色": "蓝色", "长(cm)": "50", ...}] 或空字符串
+        输出格式（PACKAGE_WEIGHT_CONFIG["output_mode"]）:
+        - rows: [{"规格": "大号【直径约50厘米】", "颜色": "蓝色", "长(cm)": "50", ...}]，没有数据时为[]
+        - columns: {"表头": ["规格", "颜色", "长(cm)", ...],
+                    "数据": {"规格": ["大号【直径约50厘米】"], "颜色": ["蓝色"], "长(cm)": [50.0], ...}}，
+                   numeric_columns中的列为数值（无法解析时为null），没有数据时为{}
         """
+        empty = [] if self.package_weight_mode == "rows" else {}
         if raw_weight is None:
-            return []
+            return empty
         
         try:
             if isinstance(raw_weight, list) and len(raw_weight) > 0:
@@ -288,27 +670,27 @@ class DataCleaner:
                 elif isinstance(raw_weight[0], str):
                     table_str = raw_weight[0].strip()
                 else:
-                    return []
+                    return empty
             elif isinstance(raw_weight, str):
                 table_str = raw_weight.strip()
             else:
-                return []
+                return empty
             
             if not table_str:
-                return []
+                return empty
             
-            # 按行分割（处理\r\n和\n）
-            lines = table_str.replace('\\n', '\n').split('\n')
+            # 按行分割（转义的\\n和真实换行一次处理）
+            lines = _TABLE_LINE_SPLIT_RE.split(table_str)
             if len(lines) < 2:  # 至少需要表头和一行数据
-                return []
+                return empty
             
             # 第一行为表头
-            headers = lines[0].split('\t')
+            headers = [header.strip() for header in lines[0].split('\t')]
             if not headers:
-                return []
+                return empty
             
-            # 解析数据行
-            result = []
+            # 解析数据行，列数与表头不一致的行跳过
+            rows = []
             for line in lines[1:]:
                 line = line.strip()
                 if not line:
@@ -317,22 +699,39 @@ class DataCleaner:
                 values = line.split('\t')
                 if len(values) != len(headers):
                     continue
-                
-                row_dict = {}
-                for i, header in enumerate(headers):
-                    header = header.strip()
-                    value = values[i].strip() if i < len(values) else ""
-                    
-                    # 所有字段都保存为字符串格式
-                    row_dict[header] = value
-                
-                if row_dict:
-                    result.append(row_dict)
+                rows.append([value.strip() for value in values])
             
-            return result if result else []
+            if not rows:
+                return empty
+            
+            if self.package_weight_mode == "columns":
+                return self._build_package_weight_columns(headers, rows)
+            
+            # 所有字段都保存为字符串格式
+            return [dict(zip(headers, values)) for values in rows]
         
         except Exception:
-            return []
+            return empty
+    
+    def _build_package_weight_columns(self, headers: List[str], rows: List[List[str]]) -> Dict[str, Any]:
+        """
+        将包装重量表格转换为按列存储：规格、颜色等文本列保持字符串，尺寸和重量列转换为数值
+        
+        Args:
+            headers: 表头（已去除首尾空白）
+            rows: 各行的值（列数与表头一致）
+            
+        Returns:
+            Dict[str, Any]: {"表头": [...], "数据": {表头: [该列各行的值]}}
+        """
+        columns = {}
+        for column_index, header in enumerate(headers):
+            # 表头重复时与rows形式一致：保留首次出现的位置、最后一列的值
+            values = [values[column_index] for values in rows]
+            if header in self.package_weight_numeric_columns:
+                values = [float(value) if _TABLE_NUMBER_RE.fullmatch(value) else None for value in values]
+            columns[header] = values
+        return {"表头": list(columns), "数据": columns}
     
     def _clean_image_urls(self, raw_images: Any) -> Optional[List[str]]:
         """
@@ -395,11 +794,14 @@ class DataCleaner:
             image_url = parts[4].strip() if len(parts) > 4 and parts[4].startswith("http") else ""
             price = parts[5].strip() if len(parts) > 5 and parts[5] != "--" else ""
 
-            sku_items.append({
+            sku_item = {
                 "颜色规格": color_spec,
                 "图片": image_url,
                 "价格": price
-            })
+            }
+            if self.numeric_prices:
+                sku_item["价格数值"] = parse_price_number(price)
+            sku_items.append(sku_item)
 
         return sku_items if sku_items else {}
     
@@ -439,7 +841,7 @@ class DataCleaner:
                 elif i == 1:
                     # 第二个元素包含回头率等信息
                     if "回头率" in content:
-                        match = re.search(r'回头率\s*(\d+%)', content)
+                        match = _RETURN_RATE_RE.search(content)
                         if match:
                             company_dict["回头率"] = match.group(1)
                     if "主营" in content:
@@ -449,7 +851,7 @@ class DataCleaner:
                 elif i == 2:
                     # 第三个元素包含成立时间
                     if "成立时间" in content:
-                        match = re.search(r'成立时间\s*(\d{4}-\d{2}-\d{2})', content)
+                        match = _ESTABLISHED_DATE_RE.search(content)
                         if match:
                             company_dict["成立时间"] = match.group(1)
                 elif i == 3:
@@ -558,18 +960,26 @@ class DataCleaner:
         except Exception:
             return []
     
-    def _handle_cleaning_error(self, item: Dict[str, Any], index: int, error_msg: str):
+    def _handle_cleaning_error(self, item: Dict[str, Any], index: int, error_msg: str,
+                               error_callback: Optional[Callable[[Dict[str, Any]], None]] = None):
         """
-        处理清洗错误
+        处理清洗错误，失败记录交给error_callback，未指定时追加到error_data
+        
+        失败记录不保存原始数据的副本，只保存来源文件、序号（_original_index）和原始数据的内容哈希，
+        需要时用rebuild_error_records()从来源文件还原
         """
         error_item = {
             "_original_index": index,
             "_error_message": error_msg,
             "_error_time": datetime.now().isoformat(),
-            "_original_data": item
+            "_source_file": self._source_file,
+            "_source_hash": compute_record_hash(item)
         }
         
-        self.cleaning_results["error_data"].append(error_item)
+        if error_callback is not None:
+            error_callback(error_item)
+        else:
+            self.cleaning_results["error_data"].append(error_item)
         self.cleaning_results["error_count"] += 1
     
     def _generate_cleaning_report(self):
@@ -588,6 +998,24 @@ class DataCleaner:
             "失败率": f"{(error / total * 100):.2f}%" if total > 0 else "0%",
             "清洗时间": datetime.now().isoformat()
         }
+        
+        if self.cleaning_results["cache_stats"]:
+            cache_report = {}
+            for field_name, stats in self.cleaning_results["cache_stats"].items():
+                lookups = stats["hits"] + stats["misses"]
+                cache_report[field_name] = {
+                    "命中": stats["hits"],
+                    "未命中": stats["misses"],
+                    "命中率": f"{(stats['hits'] / lookups * 100):.2f}%" if lookups > 0 else "0%",
+                    "缓存容量": stats["maxsize"]
+                }
+            self.cleaning_results["cleaning_report"]["缓存统计"] = cache_report
+        
+        diagnostics = self.cleaning_results["diagnostics"]
+        if diagnostics:
+            self.cleaning_results["cleaning_report"]["诊断统计"] = diagnostics.to_report()
+            for category, category_counts in diagnostics.counts.items():
+                self.logger.warning(f"{category}统计: {category_counts}")
     
 
     
@@ -603,17 +1031,8 @@ class DataCleaner:
             bool: 保存是否成功
         """
         try:
-            # 确保输出目录存在
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # 写入文件
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(
-                    self.cleaning_results["cleaned_data"],
-                    f,
-                    ensure_ascii=False,
-                    indent=self.output_settings.get("indent", 2)
-                )
+            # 按OUTPUT_SETTINGS["format"]写入文件（自动创建输出目录）
+            dump_records(self.cleaning_results["cleaned_data"], output_path)
             
             self.logger.info(f"清洗数据已保存到: {output_path}")
             return True
@@ -637,17 +1056,8 @@ class DataCleaner:
                 self.logger.info("没有清洗失败的数据需要保存")
                 return True
             
-            # 确保输出目录存在
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # 写入文件
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(
-                    self.cleaning_results["error_data"],
-                    f,
-                    ensure_ascii=False,
-                    indent=self.output_settings.get("indent", 2)
-                )
+            # 按OUTPUT_SETTINGS["format"]写入文件（自动创建输出目录）
+            dump_records(self.cleaning_results["error_data"], output_path)
             
             self.logger.info(f"清洗失败数据已保存到: {output_path}")
             return True
@@ -657,3 +1067,146 @@ class DataCleaner:
             return False 
         
 
+
+# 缓存未命中标记（清洗结果本身可能是None或空值）
+_CACHE_MISS = object()
+
+
+def compute_record_hash(record: Any) -> str:
+    """
+    计算单条原始数据的内容哈希（键排序后的JSON），用于校验还原的原始数据与出错时一致
+    
+    Args:
+        record: 原始数据
+        
+    Returns:
+        str: SHA-1十六进制哈希值
+    """
+    payload = json.dumps(record, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def rebuild_error_records(error_items: Iterable[Dict[str, Any]],
+                          records: Optional[Iterable[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    按清洗失败记录中的引用还原原始数据，结果中补充_original_data字段
+    
+    每个来源文件只顺序读取一次，读到最后一个需要的序号即停止；内容哈希不一致
+    （来源文件已被修改）或序号超出范围时不还原，并在_rebuild_error中说明原因
+    
+    Args:
+        error_items: 清洗失败记录（如load_records(错误数据文件)）
+        records: 原始数据，为None时按各记录的_source_file读取来源文件
+        
+    Returns:
+        List[Dict[str, Any]]: 补充了_original_data的清洗失败记录
+    """
+    error_items = [dict(error_item) for error_item in error_items]
+    
+    # 来源 -> 需要还原的序号
+    wanted = defaultdict(set)
+    for error_item in error_items:
+        source = None if records is not None else error_item.get("_source_file")
+        wanted[source].add(error_item["_original_index"])
+    
+    originals = {}
+    for source, indexes in wanted.items():
+        if records is not None:
+            source_records = records
+        elif source is None or not os.path.exists(source):
+            continue
+        else:
+            source_records = iter_records(source)
+        last_index = max(indexes)
+        for index, record in enumerate(source_records):
+            if index in indexes:
+                originals[(source, index)] = record
+            if index >= last_index:
+                break
+    
+    for error_item in error_items:
+        source = None if records is not None else error_item.get("_source_file")
+        key = (source, error_item["_original_index"])
+        if key not in originals:
+            error_item["_rebuild_error"] = "找不到来源文件或序号超出范围"
+        elif compute_record_hash(originals[key]) != error_item.get("_source_hash"):
+            error_item["_rebuild_error"] = "来源数据的内容哈希不一致，文件可能已被修改"
+        else:
+            error_item["_original_data"] = originals[key]
+    
+    return error_items
+
+
+def _new_cleaning_results(total_count: int = 0) -> Dict[str, Any]:
+    """创建空的清洗结果"""
+    return {
+        "total_count": total_count,
+        "success_count": 0,
+        "error_count": 0,
+        "cleaned_data": [],
+        "error_data": [],
+        "cache_stats": {},
+        "diagnostics": DiagnosticsCollector(),
+        "cleaning_report": {}
+    }
+
+
+def _iter_batches(records: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    将记录流按batch_size切分为批次
+    
+    Yields:
+        Tuple[int, List]: (第一条数据的全局索引, 该批次的原始数据)
+    """
+    iterator = iter(records)
+    start_index = 0
+    while True:
+        rows = list(islice(iterator, batch_size))
+        if not rows:
+            return
+        yield start_index, rows
+        start_index += len(rows)
+
+
+def _copy_cleaned_value(value: Any) -> Any:
+    """复制清洗结果中的字典和列表，字符串等不可变值直接复用"""
+    if isinstance(value, dict):
+        return {key: _copy_cleaned_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_cleaned_value(item) for item in value]
+    return value
+
+
+# 每个工作进程复用同一个清洗器实例，避免每个批次重复初始化
+_worker_cleaner: Optional[DataCleaner] = None
+
+
+def _init_worker_cleaner(enabled_fields: Optional[List[str]], log_queue=None):
+    """
+    进程池初始化函数：接入主进程的日志队列并在工作进程中创建清洗器
+    
+    Args:
+        enabled_fields: 与主进程清洗器一致的清洗字段列表
+        log_queue: 主进程的日志队列，为None时工作进程自行写日志
+    """
+    global _worker_cleaner
+    init_worker_logging(log_queue)
+    _worker_cleaner = DataCleaner(enabled_fields=enabled_fields)
+
+
+def _clean_batch_worker(batch: Tuple[int, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    进程池工作函数：在独立进程中清洗一个批次的数据
+    
+    Args:
+        batch: (第一条数据的全局索引, 该批次的原始数据)
+        
+    Returns:
+        Dict[str, Any]: 该批次的清洗结果
+    """
+    start_index, rows = batch
+    _worker_cleaner.cleaning_results = _new_cleaning_results(len(rows))
+    _worker_cleaner._reset_cache_stats()
+    _worker_cleaner._clean_rows(rows, start_index)
+    _worker_cleaner.cleaning_results["cache_stats"] = _worker_cleaner._get_cache_stats()
+    return _worker_cleaner.cleaning_results
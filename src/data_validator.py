@@ -3,24 +3,34 @@
 实现第一步：判断每个字段是否为None
 """
 
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Iterable, Callable
 from collections import defaultdict
 import json
 from datetime import datetime
+import numpy as np
+import pandas as pd
 
 # 导入配置和工具函数
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.config import REQUIRED_FIELDS, VALIDATION_CONFIG, LOGGING_CONFIG
+from config.config import REQUIRED_FIELDS, VALIDATION_CONFIG, LOGGING_CONFIG, PROCESSING_RULES, SPLIT_CONFIG
 
-from utils.validation_utils import get_missing_fields
+from utils.validation_utils import (
+    get_missing_fields, build_empty_masks, records_to_columns, summarize_empty_masks
+)
 
 from utils.data_utils import create_validation_summary
 
 from utils.logger_utils import setup_logger
 
+from utils.serialization_utils import (
+    RecordWriter, open_record_writer, dump_records, get_output_extension, iter_records
+)
+
+from utils.data_splitter_utils import ChunkedRecordWriter
+
 
 class DataValidator:
     """
@@ -40,15 +50,21 @@ class DataValidator:
         self.logger = setup_logger("step1_data_validator",)
         
         # 验证结果存储
+        self.reset_results()
+    
+
+    def reset_results(self) -> None:
+        """
+        重置验证结果，开始新一轮验证
+        """
         self.validation_results = {
             "total_count": 0,
-            "complete_count": 0, 
+            "complete_count": 0,
             "incomplete_count": 0,
             "complete_data": [],
             "incomplete_data": [],
             "missing_fields_stats": {}
         }
-    
 
     def validate_required_fields(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -63,42 +79,390 @@ class DataValidator:
         self.logger.info(f"开始验证数据，共 {len(data)} 条记录")
         
         # 重置验证结果
-        self.validation_results = {
-            "total_count": len(data),
-            "complete_count": 0,
-            "incomplete_count": 0,
-            "complete_data": [],
-            "incomplete_data": [],
-            "missing_fields_stats": {}
-        }
+        self.reset_results()
+        self._validate_rows(data)
+        
+        self.logger.info(f"验证完成：完整数据 {self.validation_results['complete_count']} 条，"
+                        f"不完整数据 {self.validation_results['incomplete_count']} 条")
+        
+        return self.validation_results
+    
+    def validate_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        complete_sink: Optional[Callable[[Dict[str, Any]], None]] = None,
+        incomplete_sink: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        增量验证一批数据，结果累加到当前验证结果中（不重置）
+        
+        配合流式读取使用：调用方先执行reset_results()，再逐批调用本方法，
+        不完整数据的_row_index按全部批次的累计序号计算
+        
+        Args:
+            batch: 一批待验证的数据
+            complete_sink: 完整数据的接收函数，为None时追加到complete_data
+            incomplete_sink: 不完整数据的接收函数，为None时追加到incomplete_data
+            
+        Returns:
+            Dict[str, Any]: 累计的验证结果
+        """
+        self._validate_rows(batch, complete_sink, incomplete_sink)
+        return self.validation_results
+    
+    def validate_dataframe(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        直接按列验证DataFrame，无需先逐行转换为字典再检查
+        
+        输出的记录与Excel读取路径一致：NaN转为None，空白字符串转为""
+        
+        Args:
+            df: 待验证的DataFrame
+            
+        Returns:
+            Dict[str, Any]: 验证结果
+        """
+        self.logger.info(f"开始按列验证数据，共 {len(df)} 条记录")
+        
+        self.reset_results()
+        masks = build_empty_masks(df, self.required_fields)
+        
+        # 统一空值表示后再转换为记录：NaN转为None，空白字符串转为""
+        records = df.astype(object).to_dict(orient="records")
+        for row in records:
+            for key, value in row.items():
+                if isinstance(value, str):
+                    if not value.strip():
+                        row[key] = ""
+                elif value is not None and pd.api.types.is_scalar(value) and pd.isna(value):
+                    row[key] = None
+        self._apply_masks(records, masks)
+        
+        self.logger.info(f"验证完成：完整数据 {self.validation_results['complete_count']} 条，"
+                        f"不完整数据 {self.validation_results['incomplete_count']} 条")
+        
+        return self.validation_results
+    
+    def validate_stream(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        complete_writer: Optional[Any] = None,
+        incomplete_writer: Optional[RecordWriter] = None,
+        output_dir: str = "data/output",
+        batch_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        流式验证数据：每批数据验证后立即写入完整/不完整数据文件
+        
+        内存中只保留计数和缺失字段统计，complete_data/incomplete_data保持为空，
+        峰值内存只与批次大小相关，与输入总量无关
+        
+        Args:
+            rows: 任意可迭代的数据记录（如iter_excel_rows的返回值）
+            complete_writer: 完整数据写入器，为None时按配置自动创建（分块文件或单个文件）
+            incomplete_writer: 不完整数据写入器，为None时自动创建
+            output_dir: 自动创建写入器时使用的输出目录
+            batch_size: 每批验证的记录数，为None时使用PROCESSING_RULES中的batch_size
+            
+        Returns:
+            Dict[str, Any]: 验证结果，output_files中记录实际写出的文件
+        """
+        self.logger.info("开始流式验证数据")
+        
+        if complete_writer is None or incomplete_writer is None:
+            default_complete, default_incomplete = self.create_stream_writers(output_dir)
+            complete_writer = complete_writer or default_complete
+            incomplete_writer = incomplete_writer or default_incomplete
+        
+        batch_size = batch_size or PROCESSING_RULES.get("batch_size", 100)
+        self.reset_results()
+        
+        try:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    self._validate_rows(batch, complete_writer.write, incomplete_writer.write)
+                    batch = []
+            if batch:
+                self._validate_rows(batch, complete_writer.write, incomplete_writer.write)
+        finally:
+            self.close_stream_writers(complete_writer, incomplete_writer)
+        
+        self.logger.info(f"流式验证完成：完整数据 {self.validation_results['complete_count']} 条，"
+                        f"不完整数据 {self.validation_results['incomplete_count']} 条")
+        
+        return self.validation_results
+    
+    def create_stream_writers(self, output_dir: str = "data/output") -> Tuple[Any, RecordWriter]:
+        """
+        创建流式验证使用的完整/不完整数据写入器（文件在首次写入时创建，格式由OUTPUT_SETTINGS决定）
+        
+        启用自动分割时，完整数据直接滚动写入split_data目录下的分块文件，
+        不再生成完整数据大文件后二次分割
+        
+        Args:
+            output_dir: 输出目录
+            
+        Returns:
+            Tuple[Any, RecordWriter]: (完整数据写入器, 不完整数据写入器)
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        incomplete_file = f"{output_dir}/step1_data_validator/incomplete/incomplete_data_{timestamp}{get_output_extension()}"
+        return self._create_complete_writer(output_dir, timestamp), open_record_writer(incomplete_file)
+    
+    def _create_complete_writer(self, output_dir: str, timestamp: str, lazy: bool = True) -> Any:
+        """
+        创建完整数据写入器：启用自动分割时返回分块写入器，否则返回单文件写入器
+        
+        Args:
+            output_dir: 输出目录
+            timestamp: 文件名时间戳
+            lazy: 单文件写入器是否在首次写入时才创建文件
+        """
+        if SPLIT_CONFIG.get("auto_split", True):
+            split_dir = f"{output_dir}/step1_data_validator/{SPLIT_CONFIG.get('output_subdir', 'split_data')}"
+            return ChunkedRecordWriter(split_dir, f"complete_data_{timestamp}", SPLIT_CONFIG["chunk_size"],
+                                       max_bytes=SPLIT_CONFIG.get("max_bytes"))
+        
+        complete_file = f"{output_dir}/step1_data_validator/complete/complete_data_{timestamp}{get_output_extension()}"
+        return open_record_writer(complete_file, lazy=lazy)
+    
+    def close_stream_writers(self, complete_writer: Any, incomplete_writer: RecordWriter) -> None:
+        """
+        关闭流式写入器，并在验证结果的output_files中记录写出的文件（未写入数据的文件不记录）
+        
+        Args:
+            complete_writer: 完整数据写入器
+            incomplete_writer: 不完整数据写入器
+        """
+        complete_writer.close()
+        incomplete_writer.close()
+        self.validation_results["output_files"] = self._collect_output_files(complete_writer, incomplete_writer)
+    
+    def _collect_output_files(self, complete_writer: Any, incomplete_writer: Any) -> Dict[str, Any]:
+        """
+        汇总写入器实际写出的文件路径
+        
+        Returns:
+            Dict[str, Any]: complete_data为完整数据文件（分块模式下为分块清单），
+                            complete_parts为分块文件列表，incomplete_data为不完整数据文件
+        """
+        output_files = {}
+        if complete_writer.count:
+            output_files["complete_data"] = complete_writer.file_path
+            self.logger.info(f"完整数据已保存到: {complete_writer.file_path}")
+            if isinstance(complete_writer, ChunkedRecordWriter):
+                output_files["complete_parts"] = complete_writer.split_files
+                self.logger.info(f"完整数据已按每文件 {complete_writer.chunk_size} 条直接写入 "
+                                 f"{len(complete_writer.split_files)} 个分块文件")
+        if incomplete_writer.count:
+            output_files["incomplete_data"] = incomplete_writer.file_path
+            self.logger.info(f"不完整数据已保存到: {incomplete_writer.file_path}")
+        return output_files
+    
+    def _validate_rows(
+        self,
+        data: List[Dict[str, Any]],
+        complete_sink: Optional[Callable[[Dict[str, Any]], None]] = None,
+        incomplete_sink: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> None:
+        """
+        验证数据并累加到验证结果中，根据配置选择按列或逐行检查
+        
+        Args:
+            data: 要验证的数据列表
+            complete_sink: 完整数据的接收函数，为None时追加到complete_data
+            incomplete_sink: 不完整数据的接收函数，为None时追加到incomplete_data
+        """
+        complete_sink = complete_sink or self.validation_results["complete_data"].append
+        incomplete_sink = incomplete_sink or self.validation_results["incomplete_data"].append
+        
+        if self.validation_config.get("columnar", False):
+            columns = records_to_columns(data, self.required_fields)
+            self._apply_masks(data, build_empty_masks(columns, self.required_fields),
+                              complete_sink, incomplete_sink)
+        else:
+            self._validate_rows_per_field(data, complete_sink, incomplete_sink)
+    
+    def _apply_masks(
+        self,
+        data: List[Dict[str, Any]],
+        masks: np.ndarray,
+        complete_sink: Optional[Callable[[Dict[str, Any]], None]] = None,
+        incomplete_sink: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> None:
+        """
+        根据空值掩码分离完整/不完整数据，并累加到验证结果中
+        
+        Args:
+            data: 要验证的数据列表
+            masks: 与data逐行对应的空值掩码矩阵
+            complete_sink: 完整数据的接收函数，为None时追加到complete_data
+            incomplete_sink: 不完整数据的接收函数，为None时追加到incomplete_data
+        """
+        results = self.validation_results
+        complete_sink = complete_sink or results["complete_data"].append
+        incomplete_sink = incomplete_sink or results["incomplete_data"].append
+        offset = results["total_count"]
+        results["total_count"] += len(data)
+        
+        incomplete_rows = masks.any(axis=1).tolist()
+        fields = self.required_fields
+        
+        for position, (row, incomplete) in enumerate(zip(data, incomplete_rows)):
+            if not incomplete:
+                complete_sink(row)
+                continue
+            
+            # 只有不完整的行需要生成缺失字段列表
+            row_with_index = row.copy()
+            row_with_index["_missing_fields"] = [
+                field for field, missing in zip(fields, masks[position].tolist()) if missing
+            ]
+            row_with_index["_row_index"] = offset + position
+            incomplete_sink(row_with_index)
+            results["incomplete_count"] += 1
+        
+        results["complete_count"] += len(data) - sum(incomplete_rows)
+        
+        # 缺失字段统计由掩码列求和得到
+        for field, count in summarize_empty_masks(masks, self.required_fields).items():
+            results["missing_fields_stats"][field] = results["missing_fields_stats"].get(field, 0) + count
+    
+    def _validate_rows_per_field(
+        self,
+        data: List[Dict[str, Any]],
+        complete_sink: Callable[[Dict[str, Any]], None],
+        incomplete_sink: Callable[[Dict[str, Any]], None]
+    ) -> None:
+        """
+        逐行逐字段验证数据并累加到验证结果中
+        
+        Args:
+            data: 要验证的数据列表
+            complete_sink: 完整数据的接收函数
+            incomplete_sink: 不完整数据的接收函数
+        """
+        results = self.validation_results
+        offset = results["total_count"]
+        results["total_count"] += len(data)
         
         # 遍历每行数据进行验证
-        for index, row in enumerate(data):
+        for index, row in enumerate(data, start=offset):
             missing_fields = get_missing_fields(row, self.required_fields)
             
             if not missing_fields:
                 # 数据完整
-                self.validation_results["complete_data"].append(row)
-                self.validation_results["complete_count"] += 1
+                complete_sink(row)
+                results["complete_count"] += 1
             else:
                 # 数据不完整
                 row_with_index = row.copy()
                 row_with_index["_missing_fields"] = missing_fields
                 row_with_index["_row_index"] = index
                 
-                self.validation_results["incomplete_data"].append(row_with_index)
-                self.validation_results["incomplete_count"] += 1
+                incomplete_sink(row_with_index)
+                results["incomplete_count"] += 1
                 
                 # 统计缺失字段
                 for field in missing_fields:
-                    if field not in self.validation_results["missing_fields_stats"]:
-                        self.validation_results["missing_fields_stats"][field] = 0
-                    self.validation_results["missing_fields_stats"][field] += 1
+                    if field not in results["missing_fields_stats"]:
+                        results["missing_fields_stats"][field] = 0
+                    results["missing_fields_stats"][field] += 1
+    
+    def merge_results(
+        self,
+        other_results: Dict[str, Any],
+        complete_sink: Optional[Callable[[Dict[str, Any]], None]] = None,
+        incomplete_sink: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        将另一份验证结果（如并行进程中单个文件的结果）合并到当前结果中
         
-        self.logger.info(f"验证完成：完整数据 {self.validation_results['complete_count']} 条，"
-                        f"不完整数据 {self.validation_results['incomplete_count']} 条")
+        合并后不完整数据的_row_index会加上当前已验证的条数，
+        与按顺序串行验证全部文件得到的序号保持一致
         
-        return self.validation_results
+        Args:
+            other_results: 另一份验证结果
+            complete_sink: 完整数据的接收函数，为None时追加到complete_data
+            incomplete_sink: 不完整数据的接收函数，为None时追加到incomplete_data
+            
+        Returns:
+            Dict[str, Any]: 合并后的验证结果
+        """
+        results = self.validation_results
+        complete_sink = complete_sink or results["complete_data"].append
+        incomplete_sink = incomplete_sink or results["incomplete_data"].append
+        offset = self._merge_counts(other_results)
+        
+        for row in other_results["complete_data"]:
+            complete_sink(row)
+        
+        for row in other_results["incomplete_data"]:
+            row["_row_index"] += offset
+            incomplete_sink(row)
+        
+        return results
+    
+    def merge_result_files(
+        self,
+        other_results: Dict[str, Any],
+        complete_file: Optional[str] = None,
+        incomplete_file: Optional[str] = None,
+        complete_sink: Optional[Callable[[Dict[str, Any]], None]] = None,
+        incomplete_sink: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        合并另一份已写入文件的验证结果（如并行进程流式写出的单个文件结果）
+        
+        other_results中只需包含计数和缺失字段统计；完整/不完整数据从文件中逐条读出，
+        不完整数据的_row_index加上当前已验证的条数，与串行验证得到的序号保持一致
+        
+        Args:
+            other_results: 另一份验证结果的计数和缺失字段统计
+            complete_file: 完整数据文件，为None时表示没有完整数据
+            incomplete_file: 不完整数据文件，为None时表示没有不完整数据
+            complete_sink: 完整数据的接收函数，为None时追加到complete_data
+            incomplete_sink: 不完整数据的接收函数，为None时追加到incomplete_data
+            
+        Returns:
+            Dict[str, Any]: 合并后的验证结果
+        """
+        results = self.validation_results
+        complete_sink = complete_sink or results["complete_data"].append
+        incomplete_sink = incomplete_sink or results["incomplete_data"].append
+        offset = self._merge_counts(other_results)
+        
+        if complete_file:
+            for row in iter_records(complete_file):
+                complete_sink(row)
+        
+        if incomplete_file:
+            for row in iter_records(incomplete_file):
+                row["_row_index"] += offset
+                incomplete_sink(row)
+        
+        return results
+    
+    def _merge_counts(self, other_results: Dict[str, Any]) -> int:
+        """
+        累加另一份验证结果的计数和缺失字段统计
+        
+        Returns:
+            int: 累加前已验证的条数（合并数据的_row_index偏移量）
+        """
+        results = self.validation_results
+        offset = results["total_count"]
+        
+        results["total_count"] += other_results["total_count"]
+        results["complete_count"] += other_results["complete_count"]
+        results["incomplete_count"] += other_results["incomplete_count"]
+        
+        for field, count in other_results["missing_fields_stats"].items():
+            results["missing_fields_stats"][field] = results["missing_fields_stats"].get(field, 0) + count
+        
+        return offset
     
     def check_data_integrity(self, data: List[Dict[str, Any]]) -> bool:
         """
@@ -145,7 +509,8 @@ class DataValidator:
             output_dir: 输出目录
             
         Returns:
-            Dict[str, str]: 保存的文件路径
+            Dict[str, str]: 保存的文件路径（启用自动分割时complete_data为分块清单，
+                            complete_parts为分块文件列表）
         """
         if self.validation_results["total_count"] == 0:
             self.logger.warning("尚未进行数据验证，无法保存结果")
@@ -155,26 +520,21 @@ class DataValidator:
         saved_files = {}
         
         try:
-            # 保存完整数据
+            # 保存完整数据（启用自动分割时直接写入分块文件，省去写大文件再读回分割的过程）
             if self.validation_results["complete_data"]:
-                complete_file = f"{output_dir}/step1_data_validator/complete/complete_data_{timestamp}.json"
-                os.makedirs(os.path.dirname(complete_file), exist_ok=True)
+                with self._create_complete_writer(output_dir, timestamp, lazy=False) as writer:
+                    for row in self.validation_results["complete_data"]:
+                        writer.write(row)
                 
-                with open(complete_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.validation_results["complete_data"], f, 
-                             ensure_ascii=False, indent=2)
-                
-                saved_files["complete_data"] = complete_file
-                self.logger.info(f"完整数据已保存到: {complete_file}")
+                saved_files["complete_data"] = writer.file_path
+                if isinstance(writer, ChunkedRecordWriter):
+                    saved_files["complete_parts"] = writer.split_files
+                self.logger.info(f"完整数据已保存到: {writer.file_path}")
             
             # 保存不完整数据
             if self.validation_results["incomplete_data"]:
-                incomplete_file = f"{output_dir}/step1_data_validator/incomplete/incomplete_data_{timestamp}.json"
-                os.makedirs(os.path.dirname(incomplete_file), exist_ok=True)
-                
-                with open(incomplete_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.validation_results["incomplete_data"], f, 
-                             ensure_ascii=False, indent=2)
+                incomplete_file = f"{output_dir}/step1_data_validator/incomplete/incomplete_data_{timestamp}{get_output_extension()}"
+                dump_records(self.validation_results["incomplete_data"], incomplete_file)
                 
                 saved_files["incomplete_data"] = incomplete_file
                 self.logger.info(f"不完整数据已保存到: {incomplete_file}")
@@ -0,0 +1,287 @@
+"""
+单遍去重引擎 - 按复合键对商品分组并应用去重规则
+实现思路：
+- 商品只遍历一次：按标准化标题放入一个按插入顺序记录首次出现位置的哈希表；
+  标题第二次出现时才计算该标题下商品的 (分区键, 冗余键)，每个商品最多计算一次，标题唯一的商品不计算
+- 规则以配置表达（DEDUP_CONFIG中的partition_fields / redundant_fields / variant_fields）：
+  1. 标题只出现一次的商品直接归入唯一商品
+  2. 同标题下按分区键（默认公司名称）拆分，分区不同视为不同产品
+  3. 分区内冗余键（默认价格）相同的商品视为冗余，只保留第一个
+  4. 分区内冗余键唯一的商品有多个时，按变体键（默认SKU指纹）分桶：每桶只保留一个，第一个桶保留的商品归入唯一商品，
+     其余各桶保留的商品归入重名商品（variant_grouping="first"时为旧逻辑：只与第一个商品比较）；
+     SKU指纹在步骤二清洗时算好写入"SKU指纹"字段，这里直接读取
+- 分组完成后只遍历一次哈希表即可按 标题 -> 分区 -> 冗余键 的首次出现顺序得到结果，不再重新扫描商品
+"""
+import hashlib
+import json
+import logging
+import operator
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.diagnostics_utils import DiagnosticsCollector
+
+
+# 清洗时写入的SKU指纹字段
+SKU_FINGERPRINT_FIELD = "SKU指纹"
+
+
+def company_name(product: Dict[str, Any]) -> str:
+    """公司基本信息中的公司名称，缺失时为空字符串"""
+    company_info = product.get("公司基本信息", {})
+    return company_info.get("公司名称", "") if isinstance(company_info, dict) else ""
+
+
+def sku_fingerprint(product: Dict[str, Any]) -> str:
+    """
+    SKU指纹：颜色规格 -> 价格 映射（忽略缺少颜色规格或价格的SKU）排序后的哈希，与SKU顺序无关
+
+    Args:
+        product: 商品
+
+    Returns:
+        str: 16位十六进制哈希，映射相同的两个商品指纹相等
+    """
+    sku_map = {}
+    for sku in product.get("sku商品详情图片和信息", []):
+        color_spec = sku.get("颜色规格", "")
+        price = sku.get("价格", "")
+        if color_spec and price:
+            sku_map[color_spec] = price
+    canonical = json.dumps(sorted(sku_map.items(), key=repr), ensure_ascii=False,
+                           separators=(',', ':'), default=str)
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def stored_sku_fingerprint(product: Dict[str, Any]) -> str:
+    """清洗时写入的"SKU指纹"，没有该字段（旧版本清洗结果）时现场计算"""
+    fingerprint = product.get(SKU_FINGERPRINT_FIELD)
+    return fingerprint if fingerprint is not None else sku_fingerprint(product)
+
+
+# 可用于复合键的字段
+KEY_FIELDS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "company": company_name,
+    "price": operator.methodcaller("get", "价格", ""),
+    "sku": stored_sku_fingerprint,
+}
+
+
+def _key_function(fields: Iterable[str]) -> Callable[[Dict[str, Any]], Any]:
+    """由字段名列表生成复合键函数"""
+    fields = tuple(fields)
+    unknown = [field for field in fields if field not in KEY_FIELDS]
+    if unknown:
+        raise ValueError(f"未知的去重键字段: {unknown}，可用字段: {list(KEY_FIELDS)}")
+    extractors = tuple(KEY_FIELDS[field] for field in fields)
+    if not extractors:
+        return lambda product: ()
+    if len(extractors) == 1:
+        # 单字段直接使用字段值作为键，省去构造元组
+        return extractors[0]
+    return lambda product: tuple(extract(product) for extract in extractors)
+
+
+class _TitleBuckets(dict):
+    """同一标题下的分组：(分区键, 冗余键) -> 商品列表，插入顺序即首次出现顺序"""
+    __slots__ = ()
+
+
+class DedupeEngine:
+    """
+    单遍去重引擎
+    add()逐个加入商品（只计算一次复合键），resolve()返回唯一商品和按标题分组的重名商品
+    """
+
+    def __init__(self, normalize_title: Callable[[str], str],
+                 partition_fields: Iterable[str] = ("company",),
+                 redundant_fields: Iterable[str] = ("price",),
+                 variant_fields: Iterable[str] = ("sku",),
+                 variant_grouping: str = "bucket",
+                 diagnostics: Optional[DiagnosticsCollector] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            normalize_title: 标题标准化函数
+            partition_fields: 分区键字段，字段不同视为不同产品
+            redundant_fields: 冗余键字段，分区内全部相同视为冗余
+            variant_fields: 变体键字段，分区内冗余键唯一的商品按该键分桶或与第一个比较
+            variant_grouping: bucket 按变体键分桶，变体相同的商品各保留一个；first 只与第一个商品比较
+            diagnostics: 规则命中统计，为None时不统计
+            logger: 输出逐组明细（DEBUG级别）的日志记录器
+        """
+        self.normalize_title = normalize_title
+        self._partition_key = _key_function(partition_fields)
+        self._redundant_key = _key_function(redundant_fields)
+        self._variant_key = _key_function(variant_fields)
+        if variant_grouping not in ("bucket", "first"):
+            raise ValueError(f"未知的变体分组方式: {variant_grouping}，可选: bucket / first")
+        self.variant_grouping = variant_grouping
+        self.diagnostics = diagnostics if diagnostics is not None else DiagnosticsCollector()
+        self.logger = logger or logging.getLogger(__name__)
+        # 标准化标题 -> 商品（只出现一次）或 _TitleBuckets（重名），插入顺序即标题首次出现顺序
+        self._titles: Dict[str, Any] = {}
+        # 最近一次resolve()的统计
+        self.total_duplicates = 0
+        self.filtered_out = 0
+
+    def add(self, product: Dict[str, Any]) -> bool:
+        """
+        加入一个商品
+
+        Args:
+            product: 商品
+
+        Returns:
+            bool: 缺少商品标题时返回False（不参与去重）
+        """
+        title = product.get("商品标题", "")
+        if not title:
+            return False
+        title = self.normalize_title(title)
+        entry = self._titles.get(title)
+        if entry is None:
+            self._titles[title] = product
+            return True
+        if type(entry) is not _TitleBuckets:
+            # 标题第二次出现：为第一个商品补算复合键（重新赋值不改变标题的位置）
+            first = entry
+            entry = self._titles[title] = _TitleBuckets()
+            self._add_to_buckets(entry, first)
+        self._add_to_buckets(entry, product)
+        return True
+
+    def _add_to_buckets(self, buckets: _TitleBuckets, product: Dict[str, Any]) -> None:
+        """计算商品的 (分区键, 冗余键) 并放入标题分组"""
+        key = (self._partition_key(product), self._redundant_key(product))
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [product]
+        else:
+            bucket.append(product)
+
+    def extend(self, products: Iterable[Dict[str, Any]]) -> int:
+        """
+        加入多个商品
+
+        Args:
+            products: 商品迭代器
+
+        Returns:
+            int: 缺少商品标题的商品数
+        """
+        missing = 0
+        for product in products:
+            if not self.add(product):
+                missing += 1
+        return missing
+
+    def resolve(self) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+        """
+        应用去重规则
+
+        Returns:
+            unique_products: 唯一商品（先是标题唯一的商品，按原始顺序；再是各重名标题中保留的商品，按标题首次出现顺序）
+            duplicates: 标准化标题 -> 重名商品列表，按标题首次出现顺序
+        """
+        single_products = []
+        group_unique = []
+        duplicates: Dict[str, List[Dict[str, Any]]] = {}
+        self.total_duplicates = 0
+        self.filtered_out = 0
+        # 逐组明细只在DEBUG级别输出，默认只计数
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+
+        for title, entry in self._titles.items():
+            if type(entry) is not _TitleBuckets:
+                single_products.append(entry)
+                continue
+            # 分区 -> [冗余键分组]，保持首次出现顺序
+            partitions: Dict[Any, List[List[Dict[str, Any]]]] = {}
+            for (partition, _), bucket in entry.items():
+                groups = partitions.get(partition)
+                if groups is None:
+                    partitions[partition] = [bucket]
+                else:
+                    groups.append(bucket)
+            title_duplicates = []
+            for partition, groups in partitions.items():
+                self.total_duplicates += sum(len(group) for group in groups)
+                self._resolve_partition(title, partition, groups, group_unique, title_duplicates, debug_enabled)
+            if title_duplicates:
+                duplicates[title] = title_duplicates
+
+        return single_products + group_unique, duplicates
+
+    def _resolve_partition(self, title: str, partition: Any, groups: List[List[Dict[str, Any]]],
+                           unique_products: List[Dict[str, Any]], duplicates: List[Dict[str, Any]],
+                           debug_enabled: bool) -> None:
+        """
+        处理同一标题下的一个分区
+
+        Args:
+            title: 标准化标题
+            partition: 分区键
+            groups: 按冗余键分组的商品（首次出现顺序）
+            unique_products: 归入唯一商品的结果追加到该列表
+            duplicates: 归入重名商品的结果追加到该列表
+            debug_enabled: 是否输出逐组明细
+        """
+        # 冗余键相同的商品只保留一个
+        for group in groups:
+            if len(group) > 1:
+                unique_products.append(group[0])
+                self.filtered_out += len(group) - 1
+                self.diagnostics.record("去重规则", "价格相同-过滤冗余", title, count=len(group) - 1)
+                if debug_enabled:
+                    self.logger.debug(f"发现价格相同的重名商品: '{title}' 价格: '{group[0].get('价格', '')}', "
+                                      f"过滤掉 {len(group) - 1} 条冗余数据")
+
+        singles = [group[0] for group in groups if len(group) == 1]
+        if len(singles) == 1:
+            unique_products.append(singles[0])
+            return
+        if not singles:
+            return
+
+        # 冗余键唯一的商品有多个：比较变体键
+        self.diagnostics.record("去重规则", "同公司多价格-SKU比对", title)
+        if debug_enabled:
+            self.logger.debug(f"分区{partition}下标题为'{title}'的商品有多个价格唯一的项，进行SKU信息比对")
+        if self.variant_grouping == "first":
+            base_variant = self._variant_key(singles[0])
+            variant_groups = [[singles[0]]]
+            for product in singles[1:]:
+                if self._variant_key(product) == base_variant:
+                    variant_groups[0].append(product)
+                else:
+                    variant_groups.append([product])
+        else:
+            # 每个商品的变体键只计算一次，一次遍历得到所有变体相同的分组（首次出现顺序）
+            buckets: Dict[Any, List[Dict[str, Any]]] = {}
+            for product in singles:
+                variant = self._variant_key(product)
+                bucket = buckets.get(variant)
+                if bucket is None:
+                    buckets[variant] = [product]
+                else:
+                    bucket.append(product)
+            variant_groups = list(buckets.values())
+
+        # 变体相同的只保留一个：第一组归入唯一商品，其余各组归入重名商品
+        unique_products.append(variant_groups[0][0])
+        different = []
+        for group in variant_groups:
+            if group is not variant_groups[0]:
+                different.append(group[0])
+            if len(group) > 1:
+                self.filtered_out += len(group) - 1
+                self.diagnostics.record("去重规则", "同公司SKU一致-过滤冗余", title, count=len(group) - 1)
+            if debug_enabled and (len(group) > 1 or group is variant_groups[0]):
+                self.logger.debug(f"发现分区{partition}内SKU信息一致的商品: '{title}', 过滤掉 {len(group) - 1} 条冗余数据")
+
+        if different:
+            duplicates.extend(different)
+            self.diagnostics.record("去重规则", "同公司SKU不一致-归入重名", title, count=len(different))
+            if debug_enabled:
+                for product in different:
+                    self.logger.debug(f"发现分区{partition}内SKU信息不一致的商品: '{title}' 价格: '{product.get('价格', '')}'")
@@ -1,10 +1,18 @@
 import os
 import json
-from typing import List, Dict, Any,Tuple
-from collections import defaultdict
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+from itertools import islice
 
 from utils.logger_utils import setup_logger
-from config.config import SPLIT_CONFIG
+from utils.serialization_utils import load_records, iter_records, dump_records, get_output_extension, is_record_file
+from utils.diagnostics_utils import DiagnosticsCollector
+from config.config import SPLIT_CONFIG, DEDUP_CONFIG, NEAR_DUPLICATE_CONFIG
+from src.product_model import CompactProduct, ValueInterner
+from src.title_index import TitleIndex
+from src.dedupe_engine import DedupeEngine
+from src.near_duplicate import NearDuplicateDetector
+from src.product_catalog import ProductCatalog, STATUS_UNIQUE, STATUS_DUPLICATE
 
 class DuplicateChecker:
     """
@@ -16,6 +24,24 @@ class DuplicateChecker:
         """初始化重名检查器"""
         self.logger = setup_logger("duplicate_checker")
         self.chunk_size = SPLIT_CONFIG.get("chunk_size", 300)
+        # 去重规则命中统计，每次check_duplicates重新开始
+        self.diagnostics = DiagnosticsCollector()
+        # 以紧凑商品对象保存加载的商品（只读接口与字典一致）
+        self.compact_products = DEDUP_CONFIG.get("compact_products", False)
+        # 外存模式：商品写入磁盘标题索引，逐个标题分组读回处理
+        self.external_memory = DEDUP_CONFIG.get("external_memory", False)
+        self.external_temp_dir = DEDUP_CONFIG.get("external_temp_dir")
+        # 复合键去重规则
+        self.partition_fields = tuple(DEDUP_CONFIG.get("partition_fields", ("company",)))
+        self.redundant_fields = tuple(DEDUP_CONFIG.get("redundant_fields", ("price",)))
+        self.variant_fields = tuple(DEDUP_CONFIG.get("variant_fields", ("sku",)))
+        self.variant_grouping = DEDUP_CONFIG.get("variant_grouping", "bucket")
+        # 增量模式：只处理未并入商品目录的输入文件，与目录中相同标题的商品一起去重
+        self.incremental = DEDUP_CONFIG.get("incremental", False)
+        self.catalog_path = DEDUP_CONFIG.get("catalog_path")
+        # 近似重名检测：相似标题合并为同一标题后再应用去重规则
+        self.near_duplicate_config = dict(NEAR_DUPLICATE_CONFIG)
+        self.near_duplicate = self.near_duplicate_config.pop("enabled", False)
         self.logger.info(f"重名检查器初始化完成，每文件商品数: {self.chunk_size}")
 
     def _are_prices_equal(self, price1: str, price2: str) -> bool:
@@ -32,127 +58,71 @@ class DuplicateChecker:
         # 简单的字符串比较，因为需求要求"完全一致"
         return price1 == price2
     
-    def _extract_sku_info(self, sku_list: List[Dict[str, Any]]) -> Dict[str, str]:
+    def _new_dedupe_engine(self, title_mapping: Optional[Dict[str, str]] = None) -> DedupeEngine:
         """
-        提取SKU信息中的颜色规格和价格映射
+        按DEDUP_CONFIG中的复合键规则创建去重引擎：
+        1. 同标题下公司（partition_fields）不同视为不同产品，归入唯一商品
+        2. 同公司价格（redundant_fields）相同的视为冗余，只保留一个
+        3. 同公司价格唯一的商品有多个时按SKU指纹（variant_fields）分组：每组只保留一个，
+           第一组保留的商品归入唯一商品，其余各组保留的商品归入重名商品
         
         Args:
-            sku_list: SKU商品详情列表
-            
+            title_mapping: 近似重名标题 -> 代表标题，为None时只按标准化标题分组
+        
         Returns:
-            颜色规格到价格的映射字典
+            去重引擎
         """
-        sku_map = {}
-        for sku in sku_list:
-            color_spec = sku.get("颜色规格", "")
-            price = sku.get("价格", "")
-            if color_spec and price:
-                sku_map[color_spec] = price
-        return sku_map
+        return DedupeEngine(
+            self._title_key_function(title_mapping),
+            partition_fields=self.partition_fields,
+            redundant_fields=self.redundant_fields,
+            variant_fields=self.variant_fields,
+            variant_grouping=self.variant_grouping,
+            diagnostics=self.diagnostics,
+            logger=self.logger
+        )
     
-    def _are_sku_info_equal(self, sku_list1: List[Dict[str, Any]], 
-                           sku_list2: List[Dict[str, Any]]) -> bool:
-        """
-        比较两个商品的SKU信息是否完全一致
+    def _title_key_function(self, title_mapping: Optional[Dict[str, str]]) -> Callable[[str], str]:
+        """标题分组键：标准化标题，属于近似重名簇时替换为代表标题"""
+        if not title_mapping:
+            return self.normalize_title
         
-        Args:
-            sku_list1: 第一个商品的SKU列表
-            sku_list2: 第二个商品的SKU列表
-            
-        Returns:
-            SKU信息是否一致
-        """
-        sku_map1 = self._extract_sku_info(sku_list1)
-        sku_map2 = self._extract_sku_info(sku_list2)
+        def title_key(title: str) -> str:
+            normalized = self.normalize_title(title)
+            return title_mapping.get(normalized, normalized)
         
-        # 比较两个映射是否完全相同
-        return sku_map1 == sku_map2
-
-    def _filter_duplicate_products(self, title_groups: Dict[str, List[Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+        return title_key
+    
+    def _find_near_duplicate_titles(self, titles: Iterable[str],
+                                    new_titles: Optional[Iterable[str]] = None) -> Dict[str, str]:
         """
-        对重名商品进行二次检查，按照新的规则进行分类：
-        1. 价格相同的视为冗余，只保留一个
-        2. 价格不同但公司相同的情况下：
-        - SKU信息一致视为冗余，归入唯一商品
-        - SKU信息不一致归入重名商品
-        3. 公司不同视为不同产品，归入唯一商品
+        用MinHash + LSH找出近似重名的标题
         
         Args:
-            title_groups: 按标题分组的重名商品
+            titles: 按首次出现顺序排列的不重复标准化标题
+            new_titles: 只保留包含这些标题的簇（增量模式下历史标题之间的合并在之前的批次中已处理），None表示保留全部
             
         Returns:
-            filtered_unique: 根据新规则归类的唯一商品
-            filtered_duplicates: 根据新规则归类的重名商品
+            非代表标题 -> 代表标题（簇内最早出现的标题）
         """
-        filtered_unique = []
-        filtered_duplicates = defaultdict(list)
-        total_duplicates = 0
-        filtered_out = 0
-        
-        for title, products in title_groups.items():
-            total_duplicates += len(products)
-       
-            # 首先按公司分组
-            company_groups = defaultdict(list)
-            for product in products:
-                company_info = product.get("公司基本信息", {})
-                company = company_info.get("公司名称", "") if isinstance(company_info, dict) else ""
-                company_groups[company].append(product)
-            
-            # 对每个公司组进行处理
-            for company, company_products in company_groups.items():
-                # 在公司内部按价格分组
-                price_groups = defaultdict(list)
-                for product in company_products:
-                    price = product.get("价格", "")
-                    price_groups[price].append(product)
-                
-                # 处理价格相同的商品（去重）
-                for price, price_group in price_groups.items():
-                    if len(price_group) > 1:
-                        # 价格相同的商品，只保留一个
-                        filtered_unique.append(price_group[0])
-                        filtered_out += len(price_group) - 1
-                        self.logger.info(f"发现价格相同的重名商品: '{title}' 价格: '{price}', 过滤掉 {len(price_group)-1} 条冗余数据")
-                
-                # 获取所有价格唯一的商品
-                unique_price_products = [product for product_list in price_groups.values() if len(product_list) == 1 
-                                    for product in product_list]
-                
-                if len(unique_price_products) == 1:
-                    # 公司下只有一个价格唯一的商品，归入唯一商品
-                    filtered_unique.extend(unique_price_products)
-                elif len(unique_price_products) > 1:
-                    # 公司下有多个价格唯一的商品，需要比较SKU
-                    self.logger.info(f"公司'{company}'下标题为'{title}'的商品有多个价格唯一的项，进行SKU信息比对")
-                    base_product = unique_price_products[0]
-                    base_sku_info = base_product.get("sku商品详情图片和信息", [])
-                    
-                    same_sku_products = [base_product]
-                    different_sku_products = []
-                    
-                    for product in unique_price_products[1:]:
-                        sku_info = product.get("sku商品详情图片和信息", [])
-                        if self._are_sku_info_equal(base_sku_info, sku_info):
-                            same_sku_products.append(product)
-                        else:
-                            different_sku_products.append(product)
-                    
-                    # SKU信息一致的只保留一个
-                    if same_sku_products:
-                        filtered_unique.append(same_sku_products[0])
-                        filtered_out += len(same_sku_products) - 1
-                        self.logger.info(f"发现同一公司'{company}'SKU信息一致的商品: '{title}', 过滤掉 {len(same_sku_products)-1} 条冗余数据")
-                    
-                    # SKU信息不一致的归入重名商品
-                    if different_sku_products:
-                        filtered_duplicates[title].extend(different_sku_products)
-                        for prod in different_sku_products:
-                            price = prod.get("价格", "")
-                            self.logger.info(f"发现同一公司'{company}'SKU信息不一致的商品: '{title}' 价格: '{price}'")
-        
-        self.logger.info(f"重名商品二次检查：共处理 {total_duplicates} 个重名商品，过滤掉 {filtered_out} 个冗余商品")
-        return filtered_unique, dict(filtered_duplicates)
+        detector = NearDuplicateDetector(**self.near_duplicate_config)
+        detector.extend(titles)
+        mapping = detector.clusters()
+        if new_titles is not None:
+            kept = {mapping.get(title, title) for title in new_titles}
+            mapping = {title: canonical for title, canonical in mapping.items() if canonical in kept}
+        for title, canonical in mapping.items():
+            self.diagnostics.record("近似重名", "合并标题", f"{title} -> {canonical}")
+        self.logger.info(f"近似重名检测：{len(detector)} 个标题中 {len(mapping)} 个合并到 "
+                         f"{len(set(mapping.values()))} 个代表标题（阈值 {detector.threshold}，"
+                         f"{detector.bands} bands x {detector.rows} rows）")
+        return mapping
+    
+    def _log_filter_summary(self, engine: DedupeEngine) -> None:
+        """输出重名商品二次检查的统计"""
+        self.logger.info(f"重名商品二次检查：共处理 {engine.total_duplicates} 个重名商品，过滤掉 {engine.filtered_out} 个冗余商品")
+        if self.diagnostics:
+            self.logger.info(f"去重规则统计: {self.diagnostics.counts.get('去重规则', {})}")
     
     def normalize_title(self, title: str) -> str:
         """
@@ -182,6 +152,8 @@ class DuplicateChecker:
         Returns:
             处理结果统计
         """
+        self.diagnostics.reset()
+        
         # 创建输出目录
         os.makedirs(unique_output_dir, exist_ok=True)
         os.makedirs(duplicate_output_dir, exist_ok=True)
@@ -191,8 +163,7 @@ class DuplicateChecker:
         self.logger.info(f"重名商品输出目录: {duplicate_output_dir}")
         
         # 1. 收集所有商品数据
-        all_products = []
-        json_files = [f for f in os.listdir(input_dir) if f.endswith('.json')]
+        json_files = [f for f in os.listdir(input_dir) if is_record_file(f)]
         
         if not json_files:
             self.logger.error(f"输入目录 {input_dir} 中没有找到JSON文件")
@@ -205,96 +176,60 @@ class DuplicateChecker:
                 "duplicate_files": 0
             }
         
+        if self.incremental:
+            return self._check_duplicates_incremental(input_dir, json_files, unique_output_dir, duplicate_output_dir)
+        
+        if self.external_memory:
+            return self._check_duplicates_external(input_dir, json_files, unique_output_dir, duplicate_output_dir)
+        
+        # 加载的同时计算复合键并分组，商品只遍历一次；开启近似重名检测时先加载全部商品，合并相似标题后再分组
+        engine = self._new_dedupe_engine()
+        loaded_files = []
+        total_products = 0
+        missing_title_count = 0
+        # 同一次检查中相同内容的值（公司信息、表头、规格等）共享同一个对象
+        interner = ValueInterner()
         for file_name in json_files:
             file_path = os.path.join(input_dir, file_name)
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    products = json.load(f)
-                    all_products.extend(products)
+                if self.compact_products:
+                    products = [CompactProduct.from_dict(record, interner) for record in iter_records(file_path)]
+                else:
+                    products = load_records(file_path)
                 self.logger.debug(f"已加载文件: {file_name}, 商品数量: {len(products)}")
             except Exception as e:
                 self.logger.error(f"加载文件 {file_name} 时出错: {e}")
-        
-        self.logger.info(f"共加载 {len(all_products)} 条商品数据")
-        
-        # 2. 统计标题出现频率
-        title_count = defaultdict(int)
-        missing_title_count = 0
-        
-        for product in all_products:
-            title = product.get("商品标题", "")
-            if not title:
-                missing_title_count += 1
                 continue
-                
-            normalized_title = self.normalize_title(title)
-            title_count[normalized_title] += 1
-        
+            total_products += len(products)
+            if self.near_duplicate:
+                loaded_files.append(products)
+            else:
+                missing_title_count += self._add_products(engine, products)
+        
+        if self.near_duplicate:
+            titles = dict.fromkeys(self.normalize_title(product.get("商品标题", ""))
+                                   for products in loaded_files for product in products
+                                   if product.get("商品标题", ""))
+            engine = self._new_dedupe_engine(self._find_near_duplicate_titles(titles))
+            for products in loaded_files:
+                missing_title_count += self._add_products(engine, products)
+            loaded_files = None
+        
+        self.logger.info(f"共加载 {total_products} 条商品数据")
         if missing_title_count > 0:
             self.logger.warning(f"发现 {missing_title_count} 条记录缺少商品标题")
         
-        # 3. 修正：按标题分组重名商品
-        title_groups = defaultdict(list)
-        unique_products = []
-        
-        # 按原始顺序处理商品
-        for product in all_products:
-            title = product.get("商品标题", "")
-            if not title:
-                continue
-                
-            normalized_title = self.normalize_title(title)
-            if title_count[normalized_title] == 1:
-                # 唯一商品
-                unique_products.append(product)
-            else:
-                # 重名商品：按标题分组
-                title_groups[normalized_title].append(product)
-        
-        # 4. 二次检查：对重名商品按价格进行过滤
-        additional_unique, filtered_duplicates = self._filter_duplicate_products(title_groups)
-        
-        # 将价格相同的重名商品添加到唯一商品列表
-        unique_products.extend(additional_unique)
-        
-        # 5. 修正：为唯一商品生成连续索引
-        processed_unique_products = []
-        for i, product in enumerate(unique_products):
-            # 创建新字典，确保_unique_index在最前面
-            new_product = {"_unique_index": i}
-            
-            # 移除原始索引（如果存在）并复制其他字段
-            for key, value in product.items():
-                if key != "_original_index":
-                    new_product[key] = value
-            
-            processed_unique_products.append(new_product)
-        
-        unique_products = processed_unique_products
-        
-        # 6. 修正：将重名商品按标题分组展平
-        # 保持原始数据中标题首次出现的顺序
-        first_occurrence = {}
-        for idx, product in enumerate(all_products):
-            title = product.get("商品标题", "")
-            if not title:
-                continue
-            normalized_title = self.normalize_title(title)
-            if normalized_title in filtered_duplicates and normalized_title not in first_occurrence:
-                first_occurrence[normalized_title] = idx
-        
-        # 按标题首次出现顺序排序
-        sorted_titles = sorted(filtered_duplicates.keys(), key=lambda x: first_occurrence.get(x, float('inf')))
-        duplicate_products = []
-        for title in sorted_titles:
-            duplicate_products.extend(filtered_duplicates[title])
+        # 2. 应用去重规则：标题唯一的商品在前，重名标题中保留的商品在后；重名商品按标题首次出现顺序
+        unique_products, filtered_duplicates = engine.resolve()
+        self._log_filter_summary(engine)
+        duplicate_products = [product for products in filtered_duplicates.values() for product in products]
         
         self.logger.info(f"发现 {len(unique_products)} 个唯一商品")
         self.logger.info(f"发现 {len(duplicate_products)} 个重名商品")
             
-        # 6. 保存结果
+        # 3. 保存结果（唯一商品写出时生成连续索引）
         unique_files = self._save_results(
-            unique_products, 
+            (self._with_unique_index(product, i) for i, product in enumerate(unique_products)),
             unique_output_dir,
             "unique_data_"
         )
@@ -305,17 +240,18 @@ class DuplicateChecker:
             "duplicate_data_"
         )
         
-        # 7. 生成统计报告
+        # 4. 生成统计报告
         result = {
             "total_files": len(json_files),
-            "total_products": len(all_products),
+            "total_products": total_products,
             "missing_title_count": missing_title_count,
             "unique_products": len(unique_products),
             "duplicate_products": len(duplicate_products),
             "unique_files": len(unique_files),
             "duplicate_files": len(duplicate_files),
             "unique_output": unique_output_dir,
-            "duplicate_output": duplicate_output_dir
+            "duplicate_output": duplicate_output_dir,
+            "diagnostics": self.diagnostics.to_report()
         }
         
         self.logger.info(f"重名检查完成。唯一商品文件: {len(unique_files)}，重名商品文件: {len(duplicate_files)}")
@@ -323,36 +259,335 @@ class DuplicateChecker:
         
         return result
     
-    def _save_results(self, items: List[Dict[str, Any]], 
+    def _add_products(self, engine: DedupeEngine, products: List[Dict[str, Any]]) -> int:
+        """
+        把商品加入去重引擎，缺少标题的商品只计数
+        
+        Args:
+            engine: 去重引擎
+            products: 商品列表
+            
+        Returns:
+            缺少商品标题的商品数
+        """
+        missing = 0
+        for product in products:
+            if not engine.add(product):
+                missing += 1
+                self.diagnostics.record("数据问题", "缺少商品标题", product.get("_original_index"))
+        return missing
+    
+    def _with_unique_index(self, product: Dict[str, Any], index: int) -> Dict[str, Any]:
+        """
+        生成带_unique_index的唯一商品（_unique_index在最前面，移除_original_index）
+        
+        Args:
+            product: 商品
+            index: 唯一商品的连续索引
+            
+        Returns:
+            新的商品字典
+        """
+        new_product = {"_unique_index": index}
+        for key, value in product.items():
+            if key != "_original_index":
+                new_product[key] = value
+        return new_product
+    
+    def _check_duplicates_external(self, input_dir: str, json_files: List[str],
+                                   unique_output_dir: str, duplicate_output_dir: str) -> Dict[str, Any]:
+        """
+        外存模式的重名检查：商品写入磁盘标题索引，内存中同时只保留一个标题分组和一个输出文件的商品
+        规则、输出顺序和文件划分与内存模式一致
+        
+        Args:
+            input_dir: 输入目录
+            json_files: 输入目录中的数据文件名
+            unique_output_dir: 唯一商品输出目录
+            duplicate_output_dir: 重名商品输出目录
+            
+        Returns:
+            处理结果统计
+        """
+        total_products = 0
+        missing_title_count = 0
+        
+        with TitleIndex(self.external_temp_dir) as index:
+            self.logger.info(f"外存模式：商品写入临时索引 {index.db_path}")
+            
+            # 1. 逐文件写入索引（缺少标题的商品不参与去重，只计数）
+            for file_name in json_files:
+                file_path = os.path.join(input_dir, file_name)
+                missing_indexes = []
+                
+                def titled_products() -> Iterator[Tuple[str, Dict[str, Any]]]:
+                    for product in iter_records(file_path):
+                        title = product.get("商品标题", "")
+                        if not title:
+                            missing_indexes.append(product.get("_original_index"))
+                            continue
+                        yield self.normalize_title(title), product
+                
+                try:
+                    count = index.add_file(titled_products())
+                except Exception as e:
+                    self.logger.error(f"加载文件 {file_name} 时出错: {e}")
+                    continue
+                total_products += count + len(missing_indexes)
+                missing_title_count += len(missing_indexes)
+                for original_index in missing_indexes:
+                    self.diagnostics.record("数据问题", "缺少商品标题", original_index)
+                self.logger.debug(f"已加载文件: {file_name}, 商品数量: {count + len(missing_indexes)}")
+            
+            self.logger.info(f"共加载 {total_products} 条商品数据")
+            if missing_title_count > 0:
+                self.logger.warning(f"发现 {missing_title_count} 条记录缺少商品标题")
+            
+            # 近似重名：相似标题的商品改用代表标题作为索引键
+            title_mapping = None
+            if self.near_duplicate:
+                title_mapping = self._find_near_duplicate_titles(index.iter_titles())
+                index.remap_titles(title_mapping)
+            
+            # 2. 唯一商品：先按原始顺序输出标题唯一的商品，再按标题首次出现顺序输出各重名分组中保留的商品
+            group_stats = {"total": 0, "filtered_out": 0}
+            
+            def unique_stream() -> Iterator[Dict[str, Any]]:
+                yield from index.iter_singletons()
+                for title, products in index.iter_groups():
+                    engine = self._new_dedupe_engine(title_mapping)
+                    engine.extend(products)
+                    group_unique, group_duplicates = engine.resolve()
+                    group_stats["total"] += engine.total_duplicates
+                    group_stats["filtered_out"] += engine.filtered_out
+                    index.add_duplicates(group_duplicates.get(title, []))
+                    yield from group_unique
+            
+            unique_counter = {"count": 0}
+            
+            def indexed_unique() -> Iterator[Dict[str, Any]]:
+                for i, product in enumerate(unique_stream()):
+                    unique_counter["count"] = i + 1
+                    yield self._with_unique_index(product, i)
+            
+            unique_files = self._save_results(indexed_unique(), unique_output_dir, "unique_data_")
+            
+            self.logger.info(f"重名商品二次检查：共处理 {group_stats['total']} 个重名商品，"
+                             f"过滤掉 {group_stats['filtered_out']} 个冗余商品")
+            if self.diagnostics:
+                self.logger.info(f"去重规则统计: {self.diagnostics.counts.get('去重规则', {})}")
+            
+            # 3. 重名商品：按标题首次出现顺序输出
+            duplicate_counter = {"count": 0}
+            
+            def counted_duplicates() -> Iterator[Dict[str, Any]]:
+                for product in index.iter_duplicates():
+                    duplicate_counter["count"] += 1
+                    yield product
+            
+            duplicate_files = self._save_results(counted_duplicates(), duplicate_output_dir, "duplicate_data_")
+        
+        self.logger.info(f"发现 {unique_counter['count']} 个唯一商品")
+        self.logger.info(f"发现 {duplicate_counter['count']} 个重名商品")
+        
+        result = {
+            "total_files": len(json_files),
+            "total_products": total_products,
+            "missing_title_count": missing_title_count,
+            "unique_products": unique_counter["count"],
+            "duplicate_products": duplicate_counter["count"],
+            "unique_files": len(unique_files),
+            "duplicate_files": len(duplicate_files),
+            "unique_output": unique_output_dir,
+            "duplicate_output": duplicate_output_dir,
+            "diagnostics": self.diagnostics.to_report()
+        }
+        
+        self.logger.info(f"重名检查完成。唯一商品文件: {len(unique_files)}，重名商品文件: {len(duplicate_files)}")
+        return result
+    
+    def _find_full_run_outputs(self, output_dirs: Iterable[str]) -> List[str]:
+        """
+        找出非增量模式写出的结果文件（unique_data_N / duplicate_data_N，不带批次号）
+        
+        Args:
+            output_dirs: 唯一商品和重名商品输出目录
+            
+        Returns:
+            文件路径列表
+        """
+        found = []
+        for output_dir in output_dirs:
+            if not os.path.isdir(output_dir):
+                continue
+            for file_name in sorted(os.listdir(output_dir)):
+                stem = os.path.splitext(file_name)[0]
+                for prefix in ("unique_data_", "duplicate_data_"):
+                    if is_record_file(file_name) and stem.startswith(prefix) and stem[len(prefix):].isdigit():
+                        found.append(os.path.join(output_dir, file_name))
+        return found
+    
+    def _check_duplicates_incremental(self, input_dir: str, json_files: List[str],
+                                      unique_output_dir: str, duplicate_output_dir: str) -> Dict[str, Any]:
+        """
+        增量模式的重名检查：只加载未并入商品目录的输入文件，与目录中相同标题的历史商品一起应用去重规则。
+        历史商品排在新商品之前且不会重新输出；新的唯一商品的_unique_index从目录中的最大值继续编号，
+        新结果写入带批次号的文件（unique_data_<批次>_N），之后并入目录。
+        非增量模式的输出不在目录中，其_unique_index会与增量编号冲突，输出目录中存在这类文件时拒绝运行
+        
+        Args:
+            input_dir: 输入目录
+            json_files: 输入目录中的数据文件名
+            unique_output_dir: 唯一商品输出目录
+            duplicate_output_dir: 重名商品输出目录
+            
+        Returns:
+            处理结果统计
+        """
+        catalog_path = self.catalog_path or os.path.join(os.path.dirname(os.path.abspath(unique_output_dir)),
+                                                         "product_catalog.sqlite")
+        full_run_outputs = self._find_full_run_outputs((unique_output_dir, duplicate_output_dir))
+        if full_run_outputs:
+            raise ValueError(f"输出目录中有非增量模式的结果文件（如 {full_run_outputs[0]}，共 {len(full_run_outputs)} 个），"
+                             f"这些商品不在商品目录中，_unique_index会与增量编号冲突；请先移走这些文件，"
+                             f"并把对应的输入文件交给增量模式重新处理")
+        with ProductCatalog(catalog_path) as catalog:
+            self.logger.info(f"增量模式：商品目录 {catalog_path}，已有 {len(catalog)} 个商品")
+            
+            # 1. 加载未处理过的输入文件
+            loaded_files = []
+            skipped_files = 0
+            total_products = 0
+            for file_name in json_files:
+                file_path = os.path.join(input_dir, file_name)
+                try:
+                    content_hash = catalog.get_file_hash(file_path)
+                    if catalog.is_ingested(content_hash):
+                        skipped_files += 1
+                        continue
+                    products = load_records(file_path)
+                    self.logger.debug(f"已加载文件: {file_name}, 商品数量: {len(products)}")
+                except Exception as e:
+                    self.logger.error(f"加载文件 {file_name} 时出错: {e}")
+                    continue
+                total_products += len(products)
+                loaded_files.append((file_path, content_hash, products))
+            
+            self.logger.info(f"共加载 {total_products} 条新商品数据，跳过 {skipped_files} 个已并入目录的文件")
+            
+            # 2. 新商品的标题；开启近似重名检测时目录中的历史标题排在前面一起检测，
+            #    只保留包含新标题的簇，簇内的历史标题也要从目录中取出
+            titles = dict.fromkeys(self.normalize_title(product.get("商品标题", ""))
+                                   for _, _, products in loaded_files for product in products
+                                   if product.get("商品标题", ""))
+            title_mapping = None
+            lookup_titles = set(titles)
+            if self.near_duplicate and titles:
+                history_titles = list(catalog.iter_titles())
+                history_set = set(history_titles)
+                title_mapping = self._find_near_duplicate_titles(
+                    history_titles + [title for title in titles if title not in history_set], new_titles=titles
+                )
+                lookup_titles.update(title_mapping)
+                lookup_titles.update(title_mapping.values())
+            
+            # 3. 目录中相同标题（或同一近似重名簇）的商品先加入引擎，新商品随后加入
+            engine = self._new_dedupe_engine(title_mapping)
+            catalog_ids = set()
+            for product in catalog.iter_products(lookup_titles):
+                engine.add(product)
+                catalog_ids.add(id(product))
+            self.logger.info(f"从目录中取出 {len(catalog_ids)} 个相同标题的历史商品")
+            
+            missing_title_count = 0
+            for _, _, products in loaded_files:
+                missing_title_count += self._add_products(engine, products)
+            if missing_title_count > 0:
+                self.logger.warning(f"发现 {missing_title_count} 条记录缺少商品标题")
+            
+            unique_products, filtered_duplicates = engine.resolve()
+            self._log_filter_summary(engine)
+            start_index = catalog.max_unique_index() + 1
+            unique_products = [
+                self._with_unique_index(product, start_index + i)
+                for i, product in enumerate(p for p in unique_products if id(p) not in catalog_ids)
+            ]
+            duplicate_products = [product for products in filtered_duplicates.values() for product in products
+                                  if id(product) not in catalog_ids]
+            self.logger.info(f"发现 {len(unique_products)} 个新的唯一商品（_unique_index从 {start_index} 开始）")
+            self.logger.info(f"发现 {len(duplicate_products)} 个新的重名商品")
+            
+            # 4. 输出本批次结果，全部成功后并入目录
+            batch_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+            unique_files = self._save_results(unique_products, unique_output_dir, f"unique_data_{batch_id}_")
+            duplicate_files = self._save_results(duplicate_products, duplicate_output_dir,
+                                                 f"duplicate_data_{batch_id}_")
+            expected_files = sum(-(-len(items) // self.chunk_size) for items in (unique_products, duplicate_products))
+            if len(unique_files) + len(duplicate_files) != expected_files:
+                # 有输出文件保存失败：不并入目录，下次运行重新处理这些输入文件
+                catalog.rollback()
+                raise IOError(f"本批次有输出文件保存失败，未并入商品目录 {catalog_path}")
+            
+            catalog.add_products(unique_products,
+                                 (self.normalize_title(p["商品标题"]) for p in unique_products), STATUS_UNIQUE)
+            catalog.add_products(duplicate_products,
+                                 (self.normalize_title(p["商品标题"]) for p in duplicate_products), STATUS_DUPLICATE)
+            for file_path, content_hash, products in loaded_files:
+                catalog.mark_ingested(file_path, content_hash, len(products))
+            catalog.commit()
+            catalog_products = len(catalog)
+        
+        result = {
+            "total_files": len(json_files),
+            "skipped_files": skipped_files,
+            "total_products": total_products,
+            "missing_title_count": missing_title_count,
+            "unique_products": len(unique_products),
+            "duplicate_products": len(duplicate_products),
+            "unique_files": len(unique_files),
+            "duplicate_files": len(duplicate_files),
+            "unique_output": unique_output_dir,
+            "duplicate_output": duplicate_output_dir,
+            "catalog_products": catalog_products,
+            "diagnostics": self.diagnostics.to_report()
+        }
+        
+        self.logger.info(f"重名检查完成。唯一商品文件: {len(unique_files)}，重名商品文件: {len(duplicate_files)}，"
+                         f"目录商品总数: {catalog_products}")
+        return result
+    
+    def _save_results(self, items: Iterable[Dict[str, Any]], 
                      output_dir: str, prefix: str) -> List[str]:
         """
         保存结果到JSON文件（按300商品/文件分割）
         
         Args:
-            items: 要保存的商品列表
+            items: 要保存的商品（列表或迭代器，迭代器逐个文件读取，不会一次性展开）
             output_dir: 输出目录
             prefix: 文件名前缀
             
         Returns:
             生成的文件列表
         """
-        if not items:
-            self.logger.info(f"没有数据需要保存到 {output_dir}")
-            return []
-        
         # 按chunk_size分割
         chunk_size = self.chunk_size
-        chunks = [items[i:i+chunk_size] for i in range(0, len(items), chunk_size)]
+        iterator = iter(items)
+        chunks = iter(lambda: list(islice(iterator, chunk_size)), [])
         
         saved_files = []
+        chunk_count = 0
+        extension = get_output_extension()
         for i, chunk in enumerate(chunks):
-            output_file = os.path.join(output_dir, f"{prefix}{i+1}.json")
+            chunk_count += 1
+            output_file = os.path.join(output_dir, f"{prefix}{i+1}{extension}")
             try:
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(chunk, f, ensure_ascii=False, indent=2)
+                dump_records((item.to_dict() if isinstance(item, CompactProduct) else item for item in chunk),
+                             output_file)
                 saved_files.append(output_file)
                 self.logger.info(f"已保存 {len(chunk)} 个商品到 {output_file}")
             except Exception as e:
                 self.logger.error(f"保存文件 {output_file} 时出错: {e}")
         
+        if chunk_count == 0:
+            self.logger.info(f"没有数据需要保存到 {output_dir}")
         return saved_files
\ No newline at end of file
@@ -0,0 +1,242 @@
+"""
+近似重名检测 - 基于字符shingle的MinHash + LSH（局部敏感哈希）
+实现思路：
+- 标题做NFKC规范化（全角转半角）、转小写，去掉空白、标点和符号后切分为字符shingle
+- 每个标题计算MinHash签名（numpy批量计算），签名按band切分后哈希，任一band相同的标题成为候选对
+- 每个候选对都用shingle集合的精确Jaccard相似度复核，达到阈值的用并查集合并为同一簇
+  （簇即相似候选对构成的连通分量，与标题加入顺序无关；相似关系可传递，A~B、B~C时A、C同簇）
+- 每簇以最早出现的标题作为代表标题，簇内商品交给原有的公司/价格/SKU规则处理
+候选对只在band哈希相同的标题之间产生，不需要两两比较全部标题
+"""
+import unicodedata
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# MinHash使用的素数模数（小于2^32，a * x + b 在uint64内不溢出）
+_MERSENNE_PRIME = np.uint64(4294967291)
+# 每批计算签名的标题数
+_SIGNATURE_BATCH_SIZE = 1000
+# 选择band参数时假阴性的权重：候选对都会用精确Jaccard复核，假阳性只增加复核次数，因此偏向召回
+_FALSE_NEGATIVE_WEIGHT = 0.9
+# 复核时缓存的shingle集合数上限
+_SHINGLE_CACHE_SIZE = 100000
+
+
+def normalize_for_similarity(title: str) -> str:
+    """
+    相似度比较用的标题规范化：NFKC（全角字母数字和标点转半角）、转小写，去掉空白、标点、符号和控制字符
+
+    Args:
+        title: 标题
+
+    Returns:
+        str: 规范化后的标题
+    """
+    text = unicodedata.normalize("NFKC", title).lower()
+    return "".join(char for char in text if unicodedata.category(char)[0] not in "PZSC")
+
+
+def char_shingles(text: str, size: int) -> Set[str]:
+    """
+    字符shingle集合，文本短于size时整体作为一个shingle
+
+    Args:
+        text: 规范化后的文本
+        size: shingle长度
+
+    Returns:
+        Set[str]: shingle集合
+    """
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """两个集合的Jaccard相似度（任一为空时为0，规范化后为空的标题不与任何标题合并）"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    选择band数和每个band的行数，使相似度为threshold附近的误判（假阳性 + 假阴性，假阴性加权）面积最小
+
+    Args:
+        threshold: Jaccard相似度阈值
+        num_perm: MinHash签名长度
+
+    Returns:
+        Tuple[int, int]: (band数, 每个band的行数)
+    """
+    grid = np.linspace(0.0, 1.0, 201)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        # 相似度为s的两个标题至少有一个band相同的概率
+        probability = 1.0 - (1.0 - grid ** rows) ** bands
+        false_positive = np.where(grid < threshold, probability, 0.0).mean()
+        false_negative = np.where(grid >= threshold, 1.0 - probability, 0.0).mean()
+        error = (1.0 - _FALSE_NEGATIVE_WEIGHT) * false_positive + _FALSE_NEGATIVE_WEIGHT * false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class _UnionFind:
+    """并查集，每个集合的根为其中编号最小的元素（即最早出现的标题）"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return root
+
+    def union(self, a: int, b: int) -> bool:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        if root_a < root_b:
+            self.parent[root_b] = root_a
+        else:
+            self.parent[root_a] = root_b
+        return True
+
+
+class NearDuplicateDetector:
+    """
+    近似重名标题聚类
+    add()按首次出现顺序加入去重后的标题，clusters()返回 非代表标题 -> 代表标题 的映射
+    """
+
+    def __init__(self, threshold: float = 0.8, shingle_size: int = 2, num_perm: int = 128,
+                 bands: Optional[int] = None, seed: int = 1):
+        """
+        Args:
+            threshold: Jaccard相似度阈值，达到阈值的标题视为近似重名
+            shingle_size: 字符shingle长度
+            num_perm: MinHash签名长度
+            bands: LSH的band数，为None时按阈值自动选择
+            seed: 哈希函数的随机种子（相同种子结果可复现）
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"相似度阈值必须在(0, 1]之间: {threshold}")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        if bands is None:
+            bands, rows = optimal_bands(threshold, num_perm)
+        else:
+            rows = num_perm // bands
+        self.bands = bands
+        self.rows = rows
+        self.num_perm = bands * rows
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_MERSENNE_PRIME), size=self.num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, int(_MERSENNE_PRIME), size=self.num_perm, dtype=np.uint64)
+        self._band_weights = rng.randint(1, 2 ** 63, size=rows, dtype=np.uint64) | np.uint64(1)
+        self._titles: List[str] = []
+        self._pending: List[List[int]] = []
+        self._band_keys: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def _shingles(self, title: str) -> Set[str]:
+        return char_shingles(normalize_for_similarity(title), self.shingle_size)
+
+    def add(self, title: str) -> None:
+        """
+        加入一个标题（调用方保证不重复，按首次出现顺序加入）
+
+        Args:
+            title: 标题
+        """
+        self._titles.append(title)
+        self._pending.append([zlib.crc32(shingle.encode("utf-8")) for shingle in self._shingles(title)])
+        if len(self._pending) >= _SIGNATURE_BATCH_SIZE:
+            self._flush()
+
+    def extend(self, titles: Iterable[str]) -> None:
+        """加入多个标题"""
+        for title in titles:
+            self.add(title)
+
+    def _flush(self) -> None:
+        """批量计算待处理标题的MinHash签名和band哈希"""
+        if not self._pending:
+            return
+        lengths = np.fromiter((max(len(hashes), 1) for hashes in self._pending), dtype=np.int64,
+                              count=len(self._pending))
+        # 没有shingle的标题（规范化后为空）使用固定值占位，复核时不会与任何标题合并
+        values = np.fromiter((value for hashes in self._pending for value in (hashes or [0])),
+                             dtype=np.uint64, count=int(lengths.sum()))
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        permuted = (values[:, None] * self._a[None, :] + self._b[None, :]) % _MERSENNE_PRIME
+        signatures = np.minimum.reduceat(permuted, offsets, axis=0)
+        # 每个band的rows个值加权求和（uint64自然溢出）作为band哈希
+        banded = signatures.reshape(len(self._pending), self.bands, self.rows)
+        self._band_keys.append((banded * self._band_weights).sum(axis=2, dtype=np.uint64))
+        self._pending = []
+
+    def clusters(self) -> Dict[str, str]:
+        """
+        找出近似重名的标题簇
+
+        Returns:
+            Dict[str, str]: 非代表标题 -> 代表标题（簇内最早加入的标题），不在任何簇中的标题不出现
+        """
+        self._flush()
+        count = len(self._titles)
+        if count < 2:
+            return {}
+        band_keys = np.concatenate(self._band_keys)
+        self._band_keys = [band_keys]
+        union_find = _UnionFind(count)
+        shingle_cache: Dict[int, Set[str]] = {}
+
+        def shingles(index: int) -> Set[str]:
+            cached = shingle_cache.get(index)
+            if cached is None:
+                cached = shingle_cache[index] = self._shingles(self._titles[index])
+            return cached
+
+        # 同一候选对可能在多个band中出现，相似度只计算一次
+        checked: Set[Tuple[int, int]] = set()
+        for band in range(self.bands):
+            keys = band_keys[:, band]
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            # band哈希相同的连续区间即候选组
+            boundaries = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [count]))
+            candidate = ends - starts > 1
+            for start, end in zip(starts[candidate], ends[candidate]):
+                # 组内每一对候选都复核，相似的合并；已在同一簇的跳过（不影响连通结果），
+                # 聚类结果即相似候选对构成的连通分量，与标题加入顺序无关
+                members = sorted(order[start:end].tolist())
+                for position, first in enumerate(members):
+                    for second in members[position + 1:]:
+                        if (first, second) in checked or union_find.find(first) == union_find.find(second):
+                            continue
+                        checked.add((first, second))
+                        if jaccard(shingles(first), shingles(second)) >= self.threshold:
+                            union_find.union(first, second)
+            if len(shingle_cache) > _SHINGLE_CACHE_SIZE:
+                shingle_cache.clear()
+
+        mapping = {}
+        for index in range(count):
+            root = union_find.find(index)
+            if root != index:
+                mapping[self._titles[index]] = self._titles[root]
+        return mapping
@@ -0,0 +1,196 @@
+"""
+商品目录 - 增量去重使用的持久化SQLite存储
+保存历次去重已经输出的商品（唯一商品带_unique_index，重名商品单独标记），按标准化标题建索引，
+并按内容哈希记录已经处理过的输入文件。新一批商品只需要与目录中相同标题的商品一起去重，耗时与新增数据量成正比。
+去重规则（公司/价格/SKU）在去重引擎中对取出的商品计算，目录只按标题查询。
+"""
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List
+
+from utils.manifest_utils import compute_file_hash
+
+# 目录中商品的状态
+STATUS_UNIQUE = "unique"
+STATUS_DUPLICATE = "duplicate"
+
+# 按标题批量查询时每条SQL的参数个数上限
+_QUERY_BATCH_SIZE = 500
+
+
+class ProductCatalog:
+    """
+    持久化商品目录
+    写入操作在同一个事务中进行，commit()后才生效；中途出错时rollback()，目录保持上一次的状态
+    """
+
+    def __init__(self, db_path: str):
+        """
+        打开（不存在时创建）目录数据库
+
+        Args:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS products (
+                seq INTEGER PRIMARY KEY,
+                status TEXT NOT NULL,
+                unique_index INTEGER,
+                title TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_products_title ON products (title, seq);
+            -- 旧版本目录中从未被查询的索引
+            DROP INDEX IF EXISTS idx_products_company;
+            DROP INDEX IF EXISTS idx_products_sku;
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_products_unique_index ON products (unique_index);
+            CREATE TABLE IF NOT EXISTS files (
+                content_hash TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                size INTEGER,
+                mtime_ns INTEGER,
+                product_count INTEGER,
+                ingested_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_files_path ON files (path);
+        """)
+        self._conn.commit()
+
+    def __enter__(self) -> "ProductCatalog":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            self.rollback()
+        self.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def count(self, status: str) -> int:
+        """
+        统计指定状态的商品数
+
+        Args:
+            status: STATUS_UNIQUE 或 STATUS_DUPLICATE
+
+        Returns:
+            int: 商品数
+        """
+        return self._conn.execute("SELECT COUNT(*) FROM products WHERE status = ?", (status,)).fetchone()[0]
+
+    def max_unique_index(self) -> int:
+        """已分配的最大_unique_index，目录为空时返回-1"""
+        value = self._conn.execute("SELECT MAX(unique_index) FROM products").fetchone()[0]
+        return -1 if value is None else value
+
+    def get_file_hash(self, file_path: str) -> str:
+        """
+        获取输入文件的内容哈希，路径、大小和修改时间与已记录的一致时直接复用
+
+        Args:
+            file_path: 输入文件路径
+
+        Returns:
+            str: 内容哈希（SHA-256）
+        """
+        stat = os.stat(file_path)
+        row = self._conn.execute(
+            "SELECT content_hash FROM files WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (os.path.normpath(file_path), stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        return row[0] if row else compute_file_hash(file_path)
+
+    def is_ingested(self, content_hash: str) -> bool:
+        """
+        判断内容相同的输入文件是否已经并入目录
+
+        Args:
+            content_hash: 输入文件的内容哈希
+
+        Returns:
+            bool: 是否已处理
+        """
+        return self._conn.execute("SELECT 1 FROM files WHERE content_hash = ?", (content_hash,)).fetchone() is not None
+
+    def mark_ingested(self, file_path: str, content_hash: str, product_count: int) -> None:
+        """
+        记录已并入目录的输入文件
+
+        Args:
+            file_path: 输入文件路径
+            content_hash: 内容哈希
+            product_count: 文件中的商品数
+        """
+        stat = os.stat(file_path)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+            (content_hash, os.path.normpath(file_path), stat.st_size, stat.st_mtime_ns,
+             product_count, datetime.now().isoformat())
+        )
+
+    def iter_titles(self) -> Iterator[str]:
+        """按首次写入顺序产出目录中不重复的标准化标题"""
+        for (title,) in self._conn.execute("SELECT title FROM products GROUP BY title ORDER BY MIN(seq)"):
+            yield title
+
+    def iter_products(self, titles: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        按写入顺序产出标题属于titles的商品（唯一商品和重名商品都包括）
+
+        Args:
+            titles: 标准化标题
+
+        Returns:
+            Iterator[Dict[str, Any]]: 商品（与输出文件中的结构一致）
+        """
+        titles = list(titles)
+        rows: List[tuple] = []
+        for start in range(0, len(titles), _QUERY_BATCH_SIZE):
+            batch = titles[start:start + _QUERY_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows.extend(self._conn.execute(
+                f"SELECT seq, data FROM products WHERE title IN ({placeholders})", batch
+            ).fetchall())
+        rows.sort()
+        for _, data in rows:
+            yield json.loads(data)
+
+    def add_products(self, products: Iterable[Dict[str, Any]], titles: Iterable[str], status: str) -> None:
+        """
+        写入一批商品
+
+        Args:
+            products: 商品（唯一商品应已带_unique_index）
+            titles: 与products一一对应的标准化标题（索引键）
+            status: STATUS_UNIQUE 或 STATUS_DUPLICATE
+        """
+        rows = (
+            (status,
+             product.get("_unique_index") if status == STATUS_UNIQUE else None,
+             title,
+             json.dumps(product, ensure_ascii=False, separators=(',', ':')))
+            for product, title in zip(products, titles)
+        )
+        self._conn.executemany(
+            "INSERT INTO products (status, unique_index, title, data) VALUES (?, ?, ?, ?)", rows
+        )
+
+    def commit(self) -> None:
+        """提交本次写入"""
+        self._conn.commit()
+
+    def rollback(self) -> None:
+        """放弃本次写入"""
+        self._conn.rollback()
+
+    def close(self) -> None:
+        """关闭数据库连接（未提交的写入会被放弃）"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
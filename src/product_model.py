@@ -0,0 +1,294 @@
+"""
+紧凑商品模型 - 去重阶段在内存中保存大量清洗后商品时使用
+实现思路：
+- 顶层固定字段使用__slots__，不再为每个商品创建字典
+- 字典和列表转换为不可变元组，内容完全相同的公司信息等结构在商品之间共享同一个对象
+- SKU、包装重量等"表头相同的字典列表"按列存储，表头只保存一份
+- 与JSON结构之间可以无损互相转换（to_dict / from_dict），字段顺序和值类型保持不变
+"""
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 不超过该长度的字符串做驻留（颜色、规格、价格、字段名等高度重复的短文本）
+_INTERN_MAX_LEN = 64
+
+
+def _intern(value: Any) -> Any:
+    """驻留短字符串，相同内容只保留一个对象"""
+    if type(value) is str and len(value) <= _INTERN_MAX_LEN:
+        return sys.intern(value)
+    return value
+
+
+class _FrozenTuple(tuple):
+    """
+    紧凑形式的基类：相等比较要求类型相同，避免内容相同的字典和列表（含嵌套）被当作同一个共享对象
+    """
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return type(other) is type(self) and tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = tuple.__hash__
+
+
+class FrozenDict(_FrozenTuple):
+    """字典的紧凑形式：键和值交替排列的元组 (k1, v1, k2, v2, ...)"""
+    __slots__ = ()
+
+
+class FrozenList(_FrozenTuple):
+    """列表的紧凑形式"""
+    __slots__ = ()
+
+
+class RecordTable:
+    """
+    表头相同的字典列表的列式存储
+    例如SKU列表 [{"颜色规格": .., "图片": .., "价格": ..}, ...] 保存为一份表头和三列值
+    """
+    __slots__ = ("headers", "columns", "size")
+
+    def __init__(self, headers: Tuple[str, ...], columns: Tuple[Tuple[Any, ...], ...], size: int):
+        """
+        Args:
+            headers: 表头（各行字典的键，按原有顺序）
+            columns: 每个表头对应的一列值
+            size: 行数
+        """
+        self.headers = headers
+        self.columns = columns
+        self.size = size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def column(self, header: str) -> Tuple[Any, ...]:
+        """
+        获取一列的值（已解码），不存在该表头时返回空元组
+
+        Args:
+            header: 表头
+
+        Returns:
+            Tuple: 该列各行的值
+        """
+        try:
+            values = self.columns[self.headers.index(header)]
+        except ValueError:
+            return ()
+        return tuple(decode_value(value) for value in values)
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """还原为字典列表"""
+        headers = self.headers
+        columns = self.columns
+        return [
+            {header: decode_value(column[row]) for header, column in zip(headers, columns)}
+            for row in range(self.size)
+        ]
+
+
+class ValueInterner:
+    """
+    值编码器：把JSON值转换为紧凑形式，并在同一个编码器编码的所有商品之间共享相同内容的对象
+    只共享叶子全部为字符串/None的结构，避免1与1.0、True与1等相等但类型不同的值被合并
+    """
+
+    def __init__(self):
+        self._pool: Dict[Tuple[type, Any], Any] = {}
+
+    def pooled(self, value: Any) -> Any:
+        """
+        返回与value内容相同的共享对象（第一次出现时登记value本身）
+
+        Args:
+            value: 可哈希的不可变值
+
+        Returns:
+            Any: 共享对象
+        """
+        return self._pool.setdefault((type(value), value), value)
+
+    def encode(self, value: Any) -> Any:
+        """
+        将JSON值编码为紧凑形式
+
+        Args:
+            value: JSON值（字典、列表、字符串、数字等）
+
+        Returns:
+            Any: 紧凑形式，用decode_value()还原
+        """
+        return self._encode(value)[0]
+
+    def _encode(self, value: Any) -> Tuple[Any, bool]:
+        """
+        编码并返回 (紧凑形式, 是否可以共享)
+        """
+        value_type = type(value)
+        if value_type is str:
+            return _intern(value), True
+        if value is None:
+            return None, True
+
+        if value_type is dict:
+            flat = []
+            shareable = True
+            for key, item in value.items():
+                encoded, item_shareable = self._encode(item)
+                shareable = shareable and item_shareable and type(key) is str
+                flat.append(_intern(key))
+                flat.append(encoded)
+            frozen = FrozenDict(flat)
+            return (self.pooled(frozen) if shareable else frozen), shareable
+
+        if value_type is list:
+            if value and all(type(row) is dict for row in value):
+                headers = tuple(value[0])
+                if all(tuple(row) == headers for row in value):
+                    return self._encode_table(value, headers), False
+
+            elements = []
+            shareable = True
+            for item in value:
+                encoded, item_shareable = self._encode(item)
+                shareable = shareable and item_shareable
+                elements.append(encoded)
+            frozen = FrozenList(elements)
+            return (self.pooled(frozen) if shareable else frozen), shareable
+
+        # 数字、布尔值等原样保存
+        return value, False
+
+    def _encode_table(self, rows: List[Dict[str, Any]], headers: Tuple[str, ...]) -> RecordTable:
+        """将表头相同的字典列表编码为列式存储"""
+        headers = tuple(_intern(header) for header in headers)
+        if all(type(header) is str for header in headers):
+            headers = self.pooled(headers)
+        columns = tuple(
+            tuple(self._encode(row[header])[0] for row in rows)
+            for header in headers
+        )
+        return RecordTable(headers, columns, len(rows))
+
+
+def decode_value(value: Any) -> Any:
+    """
+    将紧凑形式还原为JSON值（每次调用返回新的字典/列表，修改结果不影响商品本身）
+
+    Args:
+        value: ValueInterner.encode()的结果
+
+    Returns:
+        Any: JSON值
+    """
+    value_type = type(value)
+    if value_type is FrozenDict:
+        return {value[i]: decode_value(value[i + 1]) for i in range(0, len(value), 2)}
+    if value_type is FrozenList:
+        return [decode_value(item) for item in value]
+    if value_type is RecordTable:
+        return value.to_rows()
+    return value
+
+
+# 清洗后商品的固定字段 -> 槽位名
+_FIELD_SLOTS = {
+    "_original_index": "original_index",
+    "商品标题": "title",
+    "时间": "time",
+    "价格": "price",
+    "销售": "sales",
+    "商品详情": "details",
+    "包装重量": "package_weight",
+    "主产品图片": "main_images",
+    "商品详情图片": "detail_images",
+    "sku商品详情图片和信息": "sku",
+    "产品网址": "url",
+    "公司基本信息": "company_info",
+    "公司详情信息": "company_details",
+}
+
+
+class CompactProduct:
+    """
+    紧凑商品对象
+    固定字段保存在槽位中，其余字段保存在_extra中；_layout记录字段顺序（相同顺序的商品共享同一个元组）。
+    提供与字典一致的只读接口（get / items / keys / [] / in），读取时解码为JSON值。
+    """
+    __slots__ = ("_layout", "_extra") + tuple(_FIELD_SLOTS.values())
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any], interner: Optional[ValueInterner] = None) -> "CompactProduct":
+        """
+        由清洗后的商品字典创建紧凑对象
+
+        Args:
+            record: 商品字典
+            interner: 值编码器，多个商品使用同一个编码器时共享相同内容的对象；为None时单独创建
+
+        Returns:
+            CompactProduct: 紧凑商品对象
+        """
+        if interner is None:
+            interner = ValueInterner()
+        product = cls.__new__(cls)
+        extra = None
+        for key, value in record.items():
+            encoded = interner.encode(value)
+            slot = _FIELD_SLOTS.get(key)
+            if slot is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = encoded
+            else:
+                setattr(product, slot, encoded)
+        product._layout = interner.pooled(tuple(_intern(key) for key in record))
+        product._extra = extra
+        return product
+
+    def _raw(self, key: str) -> Any:
+        """读取字段的紧凑形式（调用前需确认字段存在）"""
+        slot = _FIELD_SLOTS.get(key)
+        if slot is None:
+            return self._extra[key]
+        return getattr(self, slot)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """与dict.get一致"""
+        if key not in self._layout:
+            return default
+        return decode_value(self._raw(key))
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._layout:
+            raise KeyError(key)
+        return decode_value(self._raw(key))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._layout
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._layout)
+
+    def __len__(self) -> int:
+        return len(self._layout)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._layout
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """按原有字段顺序产出 (字段名, 值)"""
+        for key in self._layout:
+            yield key, decode_value(self._raw(key))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """还原为与from_dict输入完全一致的字典"""
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"CompactProduct({self.get('商品标题')!r})"
@@ -0,0 +1,177 @@
+"""
+磁盘标题索引 - 去重阶段的外存模式使用
+实现思路：
+- 商品逐条写入临时SQLite数据库（标题键 + 加载顺序 + 序列化后的商品），内存中不保留商品
+- 加载完成后按标题统计出现次数和首次出现位置
+- 按加载顺序读出只出现一次的商品；按首次出现顺序逐组读出重名商品，每次只有一组在内存中
+- 判定为重名的商品暂存回数据库，全部分组处理完后再按顺序读出
+"""
+import json
+import os
+import sqlite3
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 每次从游标读取的行数
+_FETCH_SIZE = 1000
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+
+
+class TitleIndex:
+    """
+    基于临时SQLite文件的标题索引，内存占用取决于最大的标题分组而不是商品总数
+    同一个索引只用于一次检查，close()后删除数据库文件
+    """
+
+    def __init__(self, temp_dir: Optional[str] = None):
+        """
+        创建临时数据库
+
+        Args:
+            temp_dir: 临时数据库所在目录，为None时使用系统临时目录
+        """
+        if temp_dir:
+            os.makedirs(temp_dir, exist_ok=True)
+        fd, self.db_path = tempfile.mkstemp(prefix="title_index_", suffix=".sqlite", dir=temp_dir)
+        os.close(fd)
+        self._conn = sqlite3.connect(self.db_path)
+        # 临时数据，不需要日志和落盘保证
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute("PRAGMA temp_store=FILE")
+        self._conn.execute(
+            "CREATE TABLE products (seq INTEGER PRIMARY KEY, title TEXT NOT NULL, data TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE duplicates (seq INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)"
+        )
+        self._next_seq = 0
+        self._finalized = False
+
+    def __enter__(self) -> "TitleIndex":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def add_file(self, items: Iterator[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        写入一个文件的商品；读取过程中出错时该文件的商品全部不写入
+
+        Args:
+            items: (标准化标题, 商品) 的迭代器
+
+        Returns:
+            int: 写入的商品数
+        """
+        rows = []
+        seq = self._next_seq
+        try:
+            for title, record in items:
+                rows.append((seq, title, _dumps(record)))
+                seq += 1
+                if len(rows) >= _FETCH_SIZE:
+                    self._conn.executemany("INSERT INTO products VALUES (?, ?, ?)", rows)
+                    rows = []
+            if rows:
+                self._conn.executemany("INSERT INTO products VALUES (?, ?, ?)", rows)
+        except BaseException:
+            self._conn.rollback()
+            raise
+        self._conn.commit()
+        count = seq - self._next_seq
+        self._next_seq = seq
+        return count
+
+    def iter_titles(self) -> Iterator[str]:
+        """按首次出现顺序产出不重复的标题"""
+        for (title,) in self._iter_query("SELECT title FROM products GROUP BY title ORDER BY MIN(seq)"):
+            yield title
+
+    def remap_titles(self, mapping: Dict[str, str]) -> None:
+        """
+        把商品的标题键替换为映射后的标题（如近似重名标题合并到代表标题），需在finalize()之前调用
+
+        Args:
+            mapping: 原标题 -> 新标题
+        """
+        if self._finalized:
+            raise RuntimeError("标题索引已完成统计，不能再修改标题")
+        if not mapping:
+            return
+        self._conn.execute("CREATE TEMP TABLE title_map (title TEXT PRIMARY KEY, mapped TEXT NOT NULL)")
+        self._conn.executemany("INSERT INTO title_map VALUES (?, ?)", mapping.items())
+        self._conn.execute(
+            "UPDATE products SET title = (SELECT mapped FROM title_map WHERE title_map.title = products.title) "
+            "WHERE title IN (SELECT title FROM title_map)"
+        )
+        self._conn.execute("DROP TABLE title_map")
+        self._conn.commit()
+
+    def finalize(self) -> None:
+        """加载完成后建立索引并统计每个标题的出现次数和首次出现位置"""
+        if self._finalized:
+            return
+        self._conn.execute("CREATE INDEX idx_products_title ON products (title, seq)")
+        self._conn.execute(
+            "CREATE TABLE title_stats AS "
+            "SELECT title, COUNT(*) AS cnt, MIN(seq) AS first_seq FROM products GROUP BY title"
+        )
+        self._conn.execute("CREATE INDEX idx_title_stats_order ON title_stats (cnt, first_seq)")
+        self._conn.commit()
+        self._finalized = True
+
+    def _iter_query(self, sql: str, params: Tuple = ()) -> Iterator[Tuple]:
+        """分批读取查询结果"""
+        cursor = self._conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(_FETCH_SIZE)
+            if not rows:
+                break
+            yield from rows
+
+    def iter_singletons(self) -> Iterator[Dict[str, Any]]:
+        """按加载顺序产出标题只出现一次的商品"""
+        self.finalize()
+        for (data,) in self._iter_query(
+                "SELECT p.data FROM products p JOIN title_stats t ON p.title = t.title "
+                "WHERE t.cnt = 1 ORDER BY p.seq"):
+            yield json.loads(data)
+
+    def iter_groups(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """按标题首次出现顺序产出重名分组 (标准化标题, 按加载顺序排列的商品列表)"""
+        self.finalize()
+        for (title,) in self._iter_query(
+                "SELECT title FROM title_stats WHERE cnt > 1 ORDER BY first_seq"):
+            rows = self._conn.execute(
+                "SELECT data FROM products WHERE title = ? ORDER BY seq", (title,)
+            ).fetchall()
+            yield title, [json.loads(data) for (data,) in rows]
+
+    def add_duplicates(self, records: List[Dict[str, Any]]) -> None:
+        """
+        暂存判定为重名的商品
+
+        Args:
+            records: 商品列表
+        """
+        if records:
+            self._conn.executemany("INSERT INTO duplicates (data) VALUES (?)",
+                                   ((_dumps(record),) for record in records))
+
+    def iter_duplicates(self) -> Iterator[Dict[str, Any]]:
+        """按暂存顺序产出重名商品"""
+        self._conn.commit()
+        for (data,) in self._iter_query("SELECT data FROM duplicates ORDER BY seq"):
+            yield json.loads(data)
+
+    def close(self) -> None:
+        """关闭连接并删除临时数据库文件"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
@@ -2,45 +2,30 @@
 步骤一：数据验证模块使用示例
 演示如何使用DataValidator进行第一步数据验证
 输入：Excel原始数据文件
-输出：完整数据JSON文件和不完整数据JSON文件，以及分割后的小文件
+输出：分块的完整数据文件及分块清单、不完整数据文件（均在验证过程中增量写入）
 """
 import sys
 import os
-import pandas as pd
-import json
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from src.data_validator import DataValidator
 from utils import setup_logger
-from utils.data_splitter_utils import split_json_file, get_split_summary
-from config.config import SPLIT_CONFIG
+from utils.logger_utils import get_log_queue, init_worker_logging
+from utils.excel_reader_utils import iter_excel_rows, iter_excel_batches
+from utils.serialization_utils import open_record_writer, get_output_extension
+from config.config import SPLIT_CONFIG, PROCESSING_RULES
 
 
 def load_data_from_excel(excel_path):
-    """从Excel文件读取数据并转换为所需格式"""
+    """从Excel文件读取数据并转换为所需格式（基于流式读取，仅读取所需列）"""
     logger = setup_logger(log_name="step1_data_validator")
     
     try:
-        # 读取Excel文件
-        df = pd.read_excel(excel_path)
+        sample_data = list(iter_excel_rows(excel_path))
         logger.info(f"成功读取Excel文件: {excel_path}")
-        logger.info(f"表头列名: {df.columns.tolist()}")
-        
-        # 转换为所需的数据格式
-        sample_data = []
-        for index, row in df.iterrows():
-            # 创建数据字典，处理可能的空值
-            data_item = {}
-            for col in df.columns:
-                value = row[col]
-                if pd.isna(value):
-                    data_item[col] = None
-                elif isinstance(value, str) and value.strip() == "":
-                    data_item[col] = ""
-                else:
-                    data_item[col] = value
-            sample_data.append(data_item)
-        
         logger.info(f"成功转换 {len(sample_data)} 条数据")
         return sample_data
         
@@ -48,43 +33,115 @@ def load_data_from_excel(excel_path):
         logger.error(f"读取Excel文件时出错: {e}")
 
 
-def split_complete_data_files(saved_files):
-    """对保存的完整数据文件进行分割"""
+def validate_excel_file_streaming(validator, excel_path, complete_writer=None, incomplete_writer=None):
+    """
+    按批次流式读取Excel并直接送入验证器，内存只随批次大小增长
+    
+    传入写入器时验证结果逐批写出，否则累积在验证器的complete_data/incomplete_data中；
+    读取出错时异常直接抛出，由调用方丢弃该文件已写出的结果
+    """
+    loaded_count = 0
+    for batch in iter_excel_batches(excel_path, batch_size=PROCESSING_RULES['batch_size']):
+        validator.validate_batch(
+            batch,
+            complete_writer.write if complete_writer else None,
+            incomplete_writer.write if incomplete_writer else None
+        )
+        loaded_count += len(batch)
+    return loaded_count
+
+
+def validate_excel_file_worker(excel_path, temp_dir, file_index):
+    """
+    加载并验证单个Excel文件（并行时在工作进程中执行）
+    
+    验证结果流式写入temp_dir下该文件专属的临时文件，只返回计数和文件路径，
+    避免把整个文件的数据序列化后传回主进程。读取中途出错时删除临时文件，
+    整个文件视为未加载（与一次性读取整个文件时的行为一致）
+    
+    Returns:
+        Tuple[str, int, Dict, Optional[str], Optional[str]]:
+            (文件路径, 读取条数, 计数和缺失字段统计, 完整数据临时文件, 不完整数据临时文件)，
+            没有数据的临时文件为None
+    """
+    logger = setup_logger(log_name="step1_data_validator")
+    validator = DataValidator()
+    extension = get_output_extension()
+    complete_writer = open_record_writer(os.path.join(temp_dir, f"{file_index}_complete{extension}"))
+    incomplete_writer = open_record_writer(os.path.join(temp_dir, f"{file_index}_incomplete{extension}"))
+    try:
+        loaded_count = validate_excel_file_streaming(validator, excel_path, complete_writer, incomplete_writer)
+    except Exception as e:
+        logger.error(f"读取Excel文件时出错，跳过整个文件: {e}")
+        complete_writer.abort()
+        incomplete_writer.abort()
+        return excel_path, 0, None, None, None
+    complete_writer.close()
+    incomplete_writer.close()
+    logger.info(f"成功读取Excel文件: {excel_path}，共 {loaded_count} 条数据")
+    
+    results = validator.validation_results
+    counts = {key: results[key] for key in
+              ("total_count", "complete_count", "incomplete_count", "missing_fields_stats")}
+    return (excel_path, loaded_count, counts,
+            complete_writer.file_path if complete_writer.count else None,
+            incomplete_writer.file_path if incomplete_writer.count else None)
+
+
+def validate_excel_files(validator, excel_paths, max_workers=1,
+                         complete_writer=None, incomplete_writer=None):
+    """
+    逐文件加载和验证多个Excel文件，按文件顺序合并验证结果；max_workers>1时使用进程池并行
+    
+    每个文件先完整验证到临时文件，成功后才合并，读取失败的文件不会留下部分结果。
+    传入写入器时，每个文件的结果合并后立即写出，不在主进程中累积数据
+    """
     logger = setup_logger(log_name="step1_data_validator")
     
-    # 检查是否有完整数据文件需要分割
-    complete_file = saved_files.get("complete_data")
-    if not complete_file:
-        logger.info("没有完整数据文件需要分割")
-        return
+    # 各文件的验证结果先写入临时目录，主进程按文件顺序读出后写入最终文件
+    with tempfile.TemporaryDirectory(prefix="step1_validate_") as temp_dir, ExitStack() as stack:
+        task_args = (excel_paths, [temp_dir] * len(excel_paths), range(len(excel_paths)))
+        if max_workers > 1:
+            logger.info(f"启用并行验证模式，进程数: {max_workers}")
+            # 工作进程的日志写入主进程的日志队列，共享同一个日志文件
+            executor = stack.enter_context(ProcessPoolExecutor(
+                max_workers=max_workers, initializer=init_worker_logging, initargs=(get_log_queue(),)))
+            # executor.map按提交顺序返回结果，保证合并后的_row_index与串行处理一致
+            file_results = executor.map(validate_excel_file_worker, *task_args)
+        else:
+            file_results = map(validate_excel_file_worker, *task_args)
+        
+        for excel_path, loaded_count, counts, complete_file, incomplete_file in file_results:
+            excel_file = os.path.basename(excel_path)
+            if loaded_count:
+                validator.merge_result_files(
+                    counts, complete_file, incomplete_file,
+                    complete_writer.write if complete_writer else None,
+                    incomplete_writer.write if incomplete_writer else None
+                )
+                logger.info(f"文件 {excel_file} 已验证 {loaded_count} 条数据，"
+                            f"当前总计 {validator.validation_results['total_count']} 条")
+            else:
+                logger.warning(f"文件 {excel_file} 未加载到有效数据，跳过处理")
+            # 合并后立即删除临时文件，临时目录占用不超过正在合并的文件
+            for temp_file in (complete_file, incomplete_file):
+                if temp_file:
+                    os.remove(temp_file)
+
+
+def log_split_parts(saved_files):
+    """输出验证过程中直接写入的分块文件信息"""
+    logger = setup_logger(log_name="step1_data_validator")
     
-    logger.info("=== 开始数据分割处理 ===")
-    logger.info(f"5. 分割完整数据文件: {os.path.basename(complete_file)}")
+    split_files = saved_files.get("complete_parts", [])
+    logger.info("=== 数据分块信息 ===")
     logger.info(f"分割配置: 每个文件 {SPLIT_CONFIG['chunk_size']} 条数据")
+    logger.info(f"分块清单: {saved_files['complete_data']}")
     
-    try:
-        # 执行分割，使用配置中的参数
-        split_result = split_json_file(
-            input_file_path=complete_file,
-            chunk_size=SPLIT_CONFIG['chunk_size'],
-            create_subdirs=SPLIT_CONFIG['create_subdirs']
-        )
-        
-        if split_result["status"] == "success":
-            logger.info("数据分割成功！")
-            logger.info(get_split_summary(split_result))
-            
-            # 显示分割文件列表
-            logger.info("分割文件列表:")
-            for i, split_file in enumerate(split_result["split_files"], 1):
-                filename = os.path.basename(split_file)
-                logger.info(f"  {i}. {filename}")
-                
-        else:
-            logger.error(f"数据分割失败: {split_result.get('error', '未知错误')}")
-            
-    except Exception as e:
-        logger.error(f"分割数据时发生异常: {str(e)}")
+    # 显示分割文件列表
+    logger.info("分割文件列表:")
+    for i, split_file in enumerate(split_files, 1):
+        logger.info(f"  {i}. {os.path.basename(split_file)}")
 
 
 def main():
@@ -116,67 +173,47 @@ def main():
         logger.warning("未找到任何Excel文件")
         return
     
-    # 初始化 sample_data 为一个空列表
-    sample_data = []
+    logger.info("=== ProductQuotation 步骤一：数据验证 ===")
+    logger.info("1. 开始验证数据完整性，验证结果边验证边写入文件...")
     
-    # 循环处理每个Excel文件
-    for excel_file in excel_files:
-        logger.info(f"===== 处理文件: {excel_file} =====")
-        excel_file_path = os.path.join(input_dir, excel_file)
-        
-        # 从Excel文件读取真实数据
-        file_data = load_data_from_excel(excel_file_path)
-        
-        if file_data:
-            # 将当前文件的数据追加到 sample_data（关键修改）
-            sample_data.extend(file_data)
-            logger.info(f"已添加 {len(file_data)} 条数据，当前总计 {len(sample_data)} 条")
-        else:
-            logger.warning(f"文件 {excel_file} 未加载到有效数据，跳过处理")
+    excel_file_paths = [os.path.join(input_dir, f) for f in excel_files]
+    max_workers = min(PROCESSING_RULES.get('max_workers', 1), len(excel_files))
     
-    if not sample_data:
+    # 每个文件验证成功后才按文件顺序写出结果；max_workers>1时各文件在独立进程中加载和验证
+    validator.reset_results()
+    complete_writer, incomplete_writer = validator.create_stream_writers()
+    try:
+        validate_excel_files(validator, excel_file_paths, max_workers, complete_writer, incomplete_writer)
+    finally:
+        validator.close_stream_writers(complete_writer, incomplete_writer)
+    
+    validation_results = validator.validation_results
+    if validation_results["total_count"] == 0:
         logger.error("没有加载到任何有效数据，无法进行验证")
         return
-
-    
-    logger.info("=== ProductQuotation 步骤一：数据验证 ===")
-    
-    # 第一步：验证必需字段
-    logger.info("1. 开始验证数据完整性...")
-    validation_results = validator.validate_required_fields(sample_data)
     
     # 显示验证摘要
     logger.info("2. 验证摘要:")
     logger.info(validator.get_validation_summary())
     
-    # 第二步：分离完整和不完整数据
-    logger.info("3. 分离数据...")
-    complete_data, incomplete_data = validator.separate_data(sample_data)
+    logger.info(f"3. 数据分离完成：完整数据 {validation_results['complete_count']} 条，"
+                f"不完整数据 {validation_results['incomplete_count']} 条")
     
-    # 第三步：保存验证结果
-    logger.info("4. 保存验证结果...")
-    saved_files = validator.save_validation_results()
+    # 第三步：验证结果已在验证过程中写入文件
+    saved_files = validation_results.get("output_files", {})
+    logger.info(f"4. 验证结果已保存: {saved_files}")
 
-    # 第四步：数据分割（使用配置文件中的设定）
-    if saved_files and "complete_data" in saved_files and SPLIT_CONFIG['auto_split']:
-        # 判断是否需要分割（数据量大于配置的split_threshold时进行分割）
-        complete_count = len(complete_data)
-        chunk_size = SPLIT_CONFIG['chunk_size']
-        split_threshold = SPLIT_CONFIG['split_threshold']
-        
-        if complete_count > split_threshold:
-            logger.info(f"完整数据量较大 ({complete_count} 条)，超过分割阈值 ({split_threshold} 条)，开始进行数据分割...")
-            split_complete_data_files(saved_files)
-        else:
-            logger.info(f"完整数据量适中 ({complete_count} 条)，未超过分割阈值 ({split_threshold} 条)，无需分割")
+    # 第四步：数据分割（完整数据在验证时已直接按配置写入分块文件）
+    if "complete_parts" in saved_files:
+        log_split_parts(saved_files)
     elif not SPLIT_CONFIG['auto_split']:
         logger.info("自动分割功能已禁用")
     else:
         logger.info("没有完整数据文件，跳过分割")
 
     # 显示不完整数据的详细信息
-    if incomplete_data:
-        logger.info(f"不完整数据详情 (共{len(incomplete_data)}条):")
+    if validation_results["incomplete_count"]:
+        logger.info(f"不完整数据详情 (共{validation_results['incomplete_count']}条): {saved_files.get('incomplete_data')}")
         
 
     logger.info("=== ProductQuotation 步骤一：数据验证完成 === \n")
@@ -8,21 +8,31 @@ import sys
 import os
 import json
 import glob
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import chain
 from pathlib import Path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from config.config import STEP2_BATCH_CONFIG
 from src.data_cleaner import DataCleaner
 from utils import setup_logger
+from utils.logger_utils import get_log_queue, init_worker_logging
+from utils.manifest_utils import ProcessingManifest
+from utils.serialization_utils import load_records, iter_records, get_output_extension, RECORD_FILE_EXTENSIONS
 
 
 def find_complete_json_files(complete_dir):
-    """查找complete目录中的所有JSON文件"""
+    """查找complete目录中的所有数据文件（JSON/JSON Lines/MessagePack）"""
     logger = setup_logger("step2_data_cleaner")
     
     try:
-        # 查找所有JSON文件
-        json_pattern = os.path.join(complete_dir, "*.json")
-        json_files = glob.glob(json_pattern)
+        # 查找所有记录文件
+        json_files = [
+            path
+            for extension in RECORD_FILE_EXTENSIONS
+            for path in glob.glob(os.path.join(complete_dir, f"*{extension}"))
+        ]
         
         if not json_files:
             logger.warning(f"在目录 {complete_dir} 中没有找到JSON文件")
@@ -42,9 +52,8 @@ def load_complete_data_from_json(json_path):
     logger = setup_logger("step2_data_cleaner")
     
     try:
-        # 读取JSON文件
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # 读取数据文件（自动识别JSON/JSON Lines/MessagePack格式）
+        data = load_records(json_path)
         
         logger.info(f"成功读取JSON文件: {json_path}")
         logger.info(f"数据条数: {len(data)}")
@@ -62,39 +71,217 @@ def load_complete_data_from_json(json_path):
         return None
 
 
-def process_single_json_file(json_file_path, output_dir):
-    """处理单个JSON文件的数据清洗"""
+def get_output_paths(json_file_path, output_dir):
+    """
+    根据输入文件名生成清洗数据和错误数据的输出路径
+    
+    输出文件名包含完整的输入文件名（不含扩展名），不同批次的分块文件（如
+    complete_data_20250101_120000_part_1 与 complete_data_20250202_130000_part_1）不会写入同一个输出文件
+    
+    Returns:
+        tuple: (清洗数据路径, 错误数据路径)
+    """
+    input_filename = Path(json_file_path).stem
+    
+    extension = get_output_extension()
+    success_file = os.path.join(output_dir, "step2_cleandata", "complete", f"cleaned_data_{input_filename}{extension}")
+    error_file = os.path.join(output_dir, "step2_cleandata", "error", f"cleaning_errors_{input_filename}{extension}")
+    return success_file, error_file
+
+
+def find_output_conflicts(json_files, output_dir):
+    """
+    查找输出路径相同的输入文件（如不同目录下的同名文件、扩展名不同的同名文件）
+    
+    Returns:
+        dict: 输出路径 -> 对应的多个输入文件，没有冲突时为空
+    """
+    inputs_by_output = {}
+    for json_file in json_files:
+        success_file, _ = get_output_paths(json_file, output_dir)
+        inputs_by_output.setdefault(os.path.normcase(os.path.normpath(success_file)), []).append(json_file)
+    return {output: inputs for output, inputs in inputs_by_output.items() if len(inputs) > 1}
+
+
+def process_single_json_file(json_file_path, output_dir, cleaner=None, max_workers=None):
+    """
+    流式处理单个JSON文件的数据清洗：逐条读取、清洗并写入输出文件，内存占用与文件大小无关
+    
+    Args:
+        json_file_path: 步骤1生成的数据文件路径
+        output_dir: 输出根目录
+        cleaner: 跨文件复用的DataCleaner，为None时为该文件单独创建
+        max_workers: 文件内并行清洗的进程数，为None时使用PROCESSING_RULES中的max_workers
+    """
     logger = setup_logger("step2_data_cleaner")
     logger.info(f"正在处理文件: {os.path.basename(json_file_path)}")
 
     
-    # 读取完整数据
-    complete_data = load_complete_data_from_json(json_file_path)
+    # 逐条读取完整数据（自动识别JSON/JSON Lines/MessagePack格式）
+    try:
+        records = iter_records(json_file_path)
+        first_record = next(records, None)
+    except FileNotFoundError:
+        logger.error(f"JSON文件不存在: {json_file_path}")
+        return False, 0
+    except Exception as e:
+        logger.error(f"读取JSON文件时出错: {e}")
+        return False, 0
     
-    if complete_data is None or not complete_data:
+    if first_record is None:
         logger.error(f"无法读取文件或文件为空: {json_file_path}")
         return False, 0
     
-    logger.info(f"数据统计: {len(complete_data)} 条完整数据")
+    # 生成输出文件名
+    success_file, error_file = get_output_paths(json_file_path, output_dir)
+    # 错误文件只在有清洗失败数据时生成，先删除上一次运行留下的错误文件，避免与本次结果混淆
+    if os.path.exists(error_file):
+        os.remove(error_file)
     
-    # 数据清洗
-    cleaner = DataCleaner()
-    cleaning_results = cleaner.clean_product_data(complete_data)
+    # 数据清洗，结果直接写入输出文件
+    own_cleaner = cleaner is None
+    if own_cleaner:
+        cleaner = DataCleaner()
+    try:
+        cleaning_results = cleaner.clean_to_files(chain([first_record], records), success_file, error_file,
+                                                  max_workers=max_workers, source_file=json_file_path)
+    except Exception as e:
+        logger.error(f"清洗或保存数据时出错: {e}")
+        return False, 0
+    finally:
+        if own_cleaner:
+            cleaner.close()
     
+    logger.info(f"数据统计: {cleaning_results['total_count']} 条完整数据")
     
-    # 生成输出文件名
-    input_filename = Path(json_file_path).stem
-    timestamp = input_filename.split('_')[-1] if '_' in input_filename else "unknown"
+    return True, cleaning_results["total_count"]
+
+
+# 文件级工作进程复用同一个清洗器（字段缓存在该进程处理的文件之间复用）
+_file_worker_cleaner = None
+
+
+def _init_file_worker(log_queue=None):
+    """进程池初始化函数：接入主进程的日志队列并创建清洗器"""
+    global _file_worker_cleaner
+    init_worker_logging(log_queue)
+    _file_worker_cleaner = DataCleaner()
+
+
+def _clean_file_worker(task):
+    """
+    进程池工作函数：清洗一个文件（文件之间已经并行，文件内串行清洗）
+    
+    Args:
+        task: (输入文件路径, 输出根目录)
+        
+    Returns:
+        tuple: (是否成功, 数据条数, 耗时秒数)
+    """
+    json_file_path, output_dir = task
+    start_time = time.perf_counter()
+    success, item_count = process_single_json_file(json_file_path, output_dir, _file_worker_cleaner, max_workers=1)
+    return success, item_count, time.perf_counter() - start_time
+
+
+def clean_files_batch(json_files, output_dir, max_workers=None, skip_unchanged=None):
+    """
+    批量清洗多个文件：跳过内容和清洗版本都未变化的文件，其余文件分发到进程池并行处理
+    
+    Args:
+        json_files: 输入文件路径列表
+        output_dir: 输出根目录
+        max_workers: 同时清洗的文件数，为None时使用STEP2_BATCH_CONFIG中的max_workers
+        skip_unchanged: 是否跳过未变化的文件，为None时使用STEP2_BATCH_CONFIG中的配置
+        
+    Returns:
+        dict: 处理统计（成功/失败/跳过的文件数、数据条数、每个文件的吞吐量）
+        
+    Raises:
+        ValueError: 多个输入文件对应同一个输出文件（处理前检查，不会写出任何文件）
+    """
+    logger = setup_logger("step2_data_cleaner")
+    conflicts = find_output_conflicts(json_files, output_dir)
+    if conflicts:
+        details = "; ".join(f"{output} <- {inputs}" for output, inputs in conflicts.items())
+        raise ValueError(f"多个输入文件对应同一个输出文件，请重命名后再处理: {details}")
+    
+    if max_workers is None:
+        max_workers = STEP2_BATCH_CONFIG.get("max_workers", 1)
+    if skip_unchanged is None:
+        skip_unchanged = STEP2_BATCH_CONFIG.get("skip_unchanged", True)
     
-    # 保存数据
-    success_file = os.path.join(output_dir, "step2_cleandata", "complete", f"cleaned_data_{timestamp}.json")
-    error_file = os.path.join(output_dir, "step2_cleandata", "error", f"cleaning_errors_{timestamp}.json")
+    summary = {"success_count": 0, "error_count": 0, "skipped_count": 0, "total_items": 0, "file_stats": []}
+    manifest_path = os.path.join(output_dir, "step2_cleandata",
+                                 STEP2_BATCH_CONFIG.get("manifest_file", "step2_manifest.json"))
+    manifest = ProcessingManifest(manifest_path)
     
-    success = cleaner.save_cleaned_data(success_file)
-    if cleaning_results["error_data"]:
-        cleaner.save_error_data(error_file)
+    # 所有文件共用一个清洗器，字段缓存和进程池在文件之间复用
+    with DataCleaner() as cleaner:
+        version = cleaner.get_version()
+        
+        # 计算内容哈希，跳过已按当前清洗版本处理过的文件
+        pending = []
+        for json_file in json_files:
+            content_hash = manifest.get_file_hash(json_file)
+            if skip_unchanged and manifest.is_fresh(json_file, content_hash, version):
+                logger.info(f"文件未变化，跳过: {os.path.basename(json_file)}")
+                summary["skipped_count"] += 1
+            else:
+                pending.append((json_file, content_hash))
+        
+        logger.info(f"需要处理 {len(pending)} 个文件，跳过 {summary['skipped_count']} 个未变化的文件")
+        
+        def finish(json_file, content_hash, success, item_count, elapsed):
+            """记录单个文件的处理结果和吞吐量，成功时更新清单"""
+            throughput = item_count / elapsed if elapsed > 0 else 0.0
+            summary["file_stats"].append({
+                "文件": os.path.basename(json_file),
+                "数据条数": item_count,
+                "耗时(秒)": round(elapsed, 3),
+                "吞吐量(条/秒)": round(throughput, 1)
+            })
+            if not success:
+                summary["error_count"] += 1
+                return
+            summary["success_count"] += 1
+            summary["total_items"] += item_count
+            logger.info(f"文件 {os.path.basename(json_file)}: {item_count} 条，"
+                        f"耗时 {elapsed:.2f} 秒，吞吐量 {throughput:.1f} 条/秒")
+            # 记录实际写出的输出文件及其内容哈希，输出被改动或覆盖后下次会重新处理
+            outputs = [path for path in get_output_paths(json_file, output_dir) if os.path.exists(path)]
+            manifest.update(json_file, content_hash, version, outputs, {"records": item_count})
+            # 每个文件完成后立即保存，中途中断时已完成的文件下次仍可跳过
+            manifest.save()
+        
+        file_workers = min(max_workers, len(pending))
+        if file_workers > 1:
+            logger.info(f"启用文件级并行清洗，进程数: {file_workers}")
+            with ProcessPoolExecutor(max_workers=file_workers, initializer=_init_file_worker,
+                                     initargs=(get_log_queue(),)) as executor:
+                futures = {
+                    executor.submit(_clean_file_worker, (json_file, output_dir)): (json_file, content_hash)
+                    for json_file, content_hash in pending
+                }
+                for future in as_completed(futures):
+                    json_file, content_hash = futures[future]
+                    try:
+                        finish(json_file, content_hash, *future.result())
+                    except Exception as e:
+                        logger.error(f"处理文件 {json_file} 时出现异常: {e}")
+                        summary["error_count"] += 1
+        else:
+            for i, (json_file, content_hash) in enumerate(pending, 1):
+                logger.info(f"处理进度: {i}/{len(pending)}")
+                start_time = time.perf_counter()
+                try:
+                    success, item_count = process_single_json_file(json_file, output_dir, cleaner)
+                    finish(json_file, content_hash, success, item_count, time.perf_counter() - start_time)
+                except Exception as e:
+                    logger.error(f"处理文件 {json_file} 时出现异常: {e}")
+                    summary["error_count"] += 1
     
-    return success, len(complete_data)
+    return summary
 
 def main():
     """主函数 - 批量处理complete目录中的所有JSON文件"""
@@ -131,34 +318,23 @@ def main():
     # 第三步：批量处理每个JSON文件
     logger.info(f"第二步：开始批量处理 {len(json_files)} 个文件...")
     
-    success_count = 0
-    error_count = 0
-    total_cleaned_items = 0
-    
-    for i, json_file in enumerate(json_files, 1):
-        logger.info(f"处理进度: {i}/{len(json_files)}")
-        
-        try:
-            success, item_count = process_single_json_file(json_file, output_dir)
-            if success:
-                success_count += 1
-                total_cleaned_items += item_count
-            else:
-                error_count += 1
-                
-        except Exception as e:
-            logger.error(f"处理文件 {json_file} 时出现异常: {e}")
-            error_count += 1
-    
-
+    try:
+        summary = clean_files_batch(json_files, output_dir)
+    except ValueError as e:
+        logger.error(f"错误：{e}")
+        return
     
     # 第四步：显示总体统计
+    total_seconds = sum(stats["耗时(秒)"] for stats in summary["file_stats"])
     logger.info("批量处理总结")
     logger.info(f"总文件数: {len(json_files)}")
-    logger.info(f"成功处理: {success_count}")
-    logger.info(f"处理失败: {error_count}")
-    logger.info(f"总数据条数: {total_cleaned_items}")
-    logger.info(f"处理成功率: {(success_count/len(json_files)*100):.2f}%")
+    logger.info(f"成功处理: {summary['success_count']}")
+    logger.info(f"跳过未变化: {summary['skipped_count']}")
+    logger.info(f"处理失败: {summary['error_count']}")
+    logger.info(f"总数据条数: {summary['total_items']}")
+    if total_seconds > 0:
+        logger.info(f"平均吞吐量: {summary['total_items'] / total_seconds:.1f} 条/秒（按各文件耗时合计）")
+    logger.info(f"处理成功率: {((summary['success_count'] + summary['skipped_count'])/len(json_files)*100):.2f}%")
 
 
 
@@ -46,6 +46,8 @@ def main():
         print("\n===== 重名检查结果摘要 =====")
         print(f"处理的JSON文件数量: {result['total_files']}")
         print(f"处理的商品总数: {result['total_products']}")
+        if 'skipped_files' in result:
+            print(f"跳过已并入目录的文件数: {result['skipped_files']}")
         print(f"唯一商品数量: {result['unique_products']}")
         print(f"重名商品数量: {result['duplicate_products']}")
         print(f"缺失标题的商品数: {result['missing_title_count']}")
@@ -53,6 +55,12 @@ def main():
         print(f"生成的重名商品文件数: {result['duplicate_files']}")
         print(f"唯一商品输出目录: {result['unique_output']}")
         print(f"重名商品输出目录: {result['duplicate_output']}")
+        if 'catalog_products' in result:
+            print(f"商品目录中的商品总数: {result['catalog_products']}")
+        for category, items in result.get('diagnostics', {}).items():
+            print(f"{category}:")
+            for key, info in items.items():
+                print(f"  {key}: {info['次数']}")
         print("==========================\n")
         
         if result['duplicate_products'] > 0:
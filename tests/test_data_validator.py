@@ -0,0 +1,68 @@
+"""
+DataValidator 空值判定测试：按列掩码与逐字段检查的结果应完全一致
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import VALIDATION_CONFIG
+from src.data_validator import DataValidator
+
+REQUIRED_FIELDS = ["a", "b", "c"]
+
+# Excel读取路径产出的各种值：None、空白字符串、空容器，以及非空的0/False/非空列表
+ROWS = [
+    {"a": "x", "b": "y", "c": "z"},
+    {"a": None, "b": "y", "c": "z"},
+    {"a": "  ", "b": "\t\n", "c": ""},
+    {"a": [], "b": {}, "c": "z"},
+    {"a": 0, "b": False, "c": ["v"]},
+    {"a": "x", "c": "z"},
+    {"a": 1.5, "b": "y", "c": "z"},
+    {"a": "x", "b": [], "c": None},
+    {"a": None, "b": None, "c": None},
+]
+
+
+def _validate(monkeypatch, columnar, rows):
+    monkeypatch.setitem(VALIDATION_CONFIG, "columnar", columnar)
+    validator = DataValidator(REQUIRED_FIELDS)
+    results = validator.validate_required_fields(rows)
+    return {key: results[key] for key in
+            ("total_count", "complete_count", "incomplete_count",
+             "complete_data", "incomplete_data", "missing_fields_stats")}
+
+
+def test_columnar_and_per_field_paths_agree(monkeypatch):
+    columnar = _validate(monkeypatch, True, ROWS)
+    per_field = _validate(monkeypatch, False, ROWS)
+    assert columnar == per_field
+    assert columnar["complete_count"] == 3
+    assert [row["_row_index"] for row in columnar["incomplete_data"]] == [1, 2, 3, 5, 7, 8]
+
+
+@pytest.mark.parametrize("dtype", [object, "string"])
+def test_validate_dataframe_flags_missing_strings(monkeypatch, dtype):
+    df = pd.DataFrame({
+        "a": pd.Series(["a", None, "c", " "], dtype=dtype),
+        "b": pd.Series(["x", "y", None, "z"], dtype=dtype),
+        "c": [1.0, 2.0, 3.0, np.nan],
+    })
+    results = DataValidator(REQUIRED_FIELDS).validate_dataframe(df)
+    assert results["complete_count"] == 1
+    assert [row["_missing_fields"] for row in results["incomplete_data"]] == [["a"], ["b"], ["a", "c"]]
+
+    # 转换后的记录再走逐字段检查，结果一致
+    monkeypatch.setitem(VALIDATION_CONFIG, "columnar", False)
+    records = results["complete_data"] + [
+        {key: value for key, value in row.items() if not key.startswith("_")}
+        for row in results["incomplete_data"]
+    ]
+    per_field = DataValidator(REQUIRED_FIELDS).validate_required_fields(records)
+    assert per_field["complete_count"] == 1
+    assert per_field["missing_fields_stats"] == results["missing_fields_stats"]
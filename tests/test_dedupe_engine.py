@@ -0,0 +1,47 @@
+"""
+SKU指纹测试：清洗时写入"SKU指纹"，去重引擎直接读取，缺少该字段时现场计算
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import dedupe_engine
+from src.data_cleaner import DataCleaner
+from src.dedupe_engine import SKU_FINGERPRINT_FIELD, DedupeEngine, sku_fingerprint
+
+SKUS = [{"颜色规格": "红色", "价格": "10"}, {"颜色规格": "蓝色", "价格": "12"}]
+
+
+def _product(price, skus, **extra):
+    return {"商品标题": "商品", "价格": price, "公司基本信息": {"公司名称": "某某科技"},
+            "sku商品详情图片和信息": skus, **extra}
+
+
+def test_cleaner_stores_fingerprint():
+    cleaner = DataCleaner()
+    raw_skus = ["1\t\t\t红色\thttp://img/1.jpg\t10", "2\t\t\t蓝色\thttp://img/2.jpg\t12"]
+    cleaned, reordered = (
+        cleaner._clean_single_item({"商品标题": "商品", "价格": "¥10", "sku商品详情图片和信息": skus}, 0)
+        for skus in (raw_skus, raw_skus[::-1])
+    )
+    assert cleaned[SKU_FINGERPRINT_FIELD] == sku_fingerprint(cleaned) == sku_fingerprint(_product("10", SKUS))
+    assert cleaned[SKU_FINGERPRINT_FIELD] == reordered[SKU_FINGERPRINT_FIELD]
+
+
+def test_engine_reads_stored_fingerprint(monkeypatch):
+    calls = []
+    monkeypatch.setattr(dedupe_engine, "sku_fingerprint", lambda product: calls.append(product) or "computed")
+    products = [
+        _product("10", SKUS, **{SKU_FINGERPRINT_FIELD: "a"}),
+        _product("11", [], **{SKU_FINGERPRINT_FIELD: "a"}),
+        _product("12", SKUS, **{SKU_FINGERPRINT_FIELD: "b"}),
+        _product("13", SKUS),
+    ]
+    engine = DedupeEngine(str.strip)
+    engine.extend(products)
+    unique, duplicates = engine.resolve()
+    # 指纹a的两个商品只保留第一个；b和现场计算的各保留一个归入重名商品
+    assert unique == [products[0]]
+    assert duplicates["商品"] == [products[2], products[3]]
+    assert calls == [products[3]]
@@ -0,0 +1,53 @@
+"""
+增量去重测试：新商品与目录中的历史商品做近似重名匹配；输出目录中有非增量结果时拒绝运行
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import DEDUP_CONFIG, NEAR_DUPLICATE_CONFIG
+from src.duplicate_checker import DuplicateChecker
+from utils.serialization_utils import dump_records, get_output_extension
+
+
+def _product(title, company="某某科技", price="10"):
+    return {"商品标题": title, "价格": price, "公司基本信息": {"公司名称": company}}
+
+
+def _run(tmp_path, batch, products):
+    input_dir = tmp_path / f"input_{batch}"
+    input_dir.mkdir()
+    dump_records(products, str(input_dir / f"cleaned_data_{batch}{get_output_extension()}"))
+    return DuplicateChecker().check_duplicates(
+        str(input_dir), str(tmp_path / "unique"), str(tmp_path / "duplicate")
+    )
+
+
+@pytest.fixture
+def incremental(monkeypatch, tmp_path):
+    monkeypatch.setitem(DEDUP_CONFIG, "incremental", True)
+    monkeypatch.setitem(DEDUP_CONFIG, "catalog_path", str(tmp_path / "catalog.sqlite"))
+    monkeypatch.setitem(NEAR_DUPLICATE_CONFIG, "enabled", True)
+
+
+def test_new_titles_match_catalog_history(tmp_path, incremental):
+    first = _run(tmp_path, 1, [_product("无线蓝牙耳机降噪运动款黑色")])
+    assert first["unique_products"] == 1
+
+    # 只与历史标题近似（追加"包邮"），同公司同价格，应作为冗余商品过滤掉
+    second = _run(tmp_path, 2, [_product("无线蓝牙耳机降噪运动款黑色包邮"), _product("不锈钢保温杯大容量")])
+    assert second["unique_products"] == 1
+    assert "近似重名" in second["diagnostics"]
+
+
+def test_full_run_outputs_are_refused(tmp_path, incremental):
+    unique_dir = tmp_path / "unique"
+    unique_dir.mkdir()
+    dump_records([{"_unique_index": 0, **_product("旧商品")}],
+                 str(unique_dir / f"unique_data_1{get_output_extension()}"))
+    with pytest.raises(ValueError):
+        _run(tmp_path, 1, [_product("新商品")])
+    assert not (tmp_path / "catalog.sqlite").exists()
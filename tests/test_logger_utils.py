@@ -0,0 +1,39 @@
+"""
+日志队列模式测试：auto模式下单进程运行不创建队列，启动进程池时已有的日志记录器切换到队列
+"""
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = textwrap.dedent("""
+    import logging.handlers
+    import sys
+    from concurrent.futures import ProcessPoolExecutor
+    sys.path.insert(0, {root!r})
+    from utils import logger_utils
+
+    logger = logger_utils.setup_logger("queue_test", "logs")
+    logger_utils.toggle_console_output(logger, False)
+    logger.info("同步模式")
+    assert logger_utils._log_queue is None and logger_utils._log_listener is None
+    assert not any(isinstance(h, logging.handlers.QueueHandler) for h in logger.handlers)
+
+    with ProcessPoolExecutor(max_workers=2, initializer=logger_utils.init_worker_logging,
+                             initargs=(logger_utils.get_log_queue(),)) as executor:
+        list(executor.map(abs, range(4)))
+    assert [type(h) for h in logger.handlers] == [logging.handlers.QueueHandler]
+    logger.info("队列模式")
+""")
+
+
+def test_queue_starts_with_first_process_pool(tmp_path):
+    completed = subprocess.run([sys.executable, "-c", SCRIPT.format(root=ROOT)], cwd=tmp_path,
+                               capture_output=True, text=True, encoding="utf-8")
+    assert completed.returncode == 0, completed.stderr
+    # 控制台已关闭：两条日志都只写入同一个文件
+    assert "模式" not in completed.stderr
+    log_text = (tmp_path / "logs" / "queue_test.log").read_text(encoding="utf-8")
+    assert "同步模式" in log_text and "队列模式" in log_text
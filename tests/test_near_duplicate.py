@@ -0,0 +1,45 @@
+"""
+近似重名检测测试：聚类结果为相似候选对的连通分量，与标题加入顺序无关
+"""
+import itertools
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.near_duplicate import NearDuplicateDetector, char_shingles, jaccard, normalize_for_similarity
+
+# A~B、B~C相似，A与C不相似；D与其他标题无关
+TITLES = ["无线蓝牙耳机降噪运动款黑色", "无线蓝牙耳机降噪运动款白色", "无线蓝牙耳机降噪跑步款白色", "不锈钢保温杯大容量"]
+THRESHOLD = 0.6
+
+
+def _similarity(first, second):
+    return jaccard(char_shingles(normalize_for_similarity(first), 2),
+                   char_shingles(normalize_for_similarity(second), 2))
+
+
+def _groups(titles):
+    detector = NearDuplicateDetector(threshold=THRESHOLD, bands=64)
+    detector.extend(titles)
+    mapping = detector.clusters()
+    groups = {}
+    for title in titles:
+        groups.setdefault(mapping.get(title, title), set()).add(title)
+    return sorted(sorted(group) for group in groups.values()), mapping
+
+
+def test_fixture_is_a_similarity_chain():
+    assert _similarity(TITLES[0], TITLES[1]) >= THRESHOLD
+    assert _similarity(TITLES[1], TITLES[2]) >= THRESHOLD
+    assert _similarity(TITLES[0], TITLES[2]) < THRESHOLD
+
+
+def test_clusters_do_not_depend_on_input_order():
+    expected = sorted([sorted(TITLES[:3]), [TITLES[3]]])
+    for permutation in itertools.permutations(TITLES):
+        groups, mapping = _groups(list(permutation))
+        assert groups == expected
+        # 代表标题为簇内最早加入的标题
+        first = next(title for title in permutation if title in TITLES[:3])
+        assert all(mapping[title] == first for title in TITLES[:3] if title != first)
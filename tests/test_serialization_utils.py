@@ -0,0 +1,74 @@
+"""
+iter_json_array 边界情况测试：解析结果与报错行为应与json.loads保持一致
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.serialization_utils import iter_json_array
+
+# 合法的JSON数组文本（含BOM、首尾空白、嵌套、字符串中的括号和逗号）
+VALID_CASES = [
+    "[]",
+    "  [ ]  ",
+    "[1,2]",
+    "\ufeff [1,2]",
+    "\ufeff[1,2]\n",
+    "\n\t[1, 2 ,3]\r\n",
+    '[{"a": [1, 2]}, "x,]y", null, true, false, -1.5e3]',
+    '["\\"]", "\\\\"]',
+    "[123456789012345678901234567890]",
+    "[-1.5e3, 0.25, 1E+2, -0]",
+]
+
+# 不合法的JSON数组文本
+INVALID_CASES = [
+    "",
+    "   ",
+    "\ufeff",
+    "[",
+    "[1",
+    "[1,",
+    "[1,2,]",
+    "[,]",
+    "[,1]",
+    "[1,,2]",
+    "[1 2]",
+    "[1,2] junk",
+    "[1,2]]",
+    "[1,2] [3]",
+    "[1,2],",
+]
+
+
+def _write(tmp_path, text):
+    path = tmp_path / "data.json"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("buffer_size", [1, 2, 3, 1 << 20])
+@pytest.mark.parametrize("text", VALID_CASES)
+def test_valid_arrays_match_json_loads(tmp_path, text, buffer_size):
+    expected = json.loads(text.lstrip("\ufeff"))
+    assert list(iter_json_array(_write(tmp_path, text), buffer_size=buffer_size)) == expected
+
+
+@pytest.mark.parametrize("buffer_size", [1, 2, 3, 1 << 20])
+@pytest.mark.parametrize("text", INVALID_CASES)
+def test_invalid_arrays_raise_like_json_loads(tmp_path, text, buffer_size):
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(text.lstrip("\ufeff"))
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(_write(tmp_path, text), buffer_size=buffer_size))
+
+
+@pytest.mark.parametrize("text", ["{}", "1", '"[1]"', "null"])
+def test_non_array_documents_are_rejected(tmp_path, text):
+    json.loads(text)
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(_write(tmp_path, text)))
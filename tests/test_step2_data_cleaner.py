@@ -0,0 +1,69 @@
+"""
+步骤二批量清洗测试：输出文件命名、输出冲突检查、清单中的输出哈希
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from step2_data_cleaner import (
+    clean_files_batch, find_output_conflicts, get_output_paths, process_single_json_file
+)
+from utils.manifest_utils import ProcessingManifest
+
+
+def test_output_names_keep_full_input_stem(tmp_path):
+    first = get_output_paths("split/complete_data_20250101_120000_part_1.json", str(tmp_path))
+    second = get_output_paths("split/complete_data_20250202_130000_part_1.json", str(tmp_path))
+    assert first != second
+    assert os.path.basename(first[0]).startswith("cleaned_data_complete_data_20250101_120000_part_1")
+
+
+def test_conflicting_inputs_are_refused(tmp_path):
+    inputs = [str(tmp_path / "a" / "complete_data_part_1.json"), str(tmp_path / "b" / "complete_data_part_1.json")]
+    assert len(find_output_conflicts(inputs, str(tmp_path))) == 1
+    with pytest.raises(ValueError):
+        clean_files_batch(inputs, str(tmp_path / "out"))
+    assert not (tmp_path / "out").exists()
+
+
+def test_manifest_detects_overwritten_output(tmp_path):
+    source = tmp_path / "input.json"
+    output = tmp_path / "output.json"
+    source.write_text("[1]", encoding="utf-8")
+    output.write_text("[2]", encoding="utf-8")
+
+    manifest = ProcessingManifest(str(tmp_path / "manifest.json"))
+    content_hash = manifest.get_file_hash(str(source))
+    manifest.update(str(source), content_hash, "v1", [str(output)])
+    assert manifest.is_fresh(str(source), content_hash, "v1")
+
+    # 内容相同、仅修改时间变化时仍视为未变化
+    os.utime(output, ns=(0, 0))
+    assert manifest.is_fresh(str(source), content_hash, "v1")
+
+    # 输出被同样大小的其他内容覆盖
+    output.write_text("[3]", encoding="utf-8")
+    assert not manifest.is_fresh(str(source), content_hash, "v1")
+
+    output.unlink()
+    assert not manifest.is_fresh(str(source), content_hash, "v1")
+
+
+def test_truncated_input_leaves_no_partial_outputs(tmp_path):
+    records = ['{"商品标题": "商品%d", "价格": "%d"}' % (i, i) for i in range(300)]
+    source = tmp_path / "complete_data_part_1.json"
+    # 文件在第300条记录中间被截断
+    source.write_text("[" + ",".join(records)[:-10], encoding="utf-8")
+    output_dir = tmp_path / "out"
+    success_file, error_file = get_output_paths(str(source), str(output_dir))
+    os.makedirs(os.path.dirname(error_file))
+    with open(error_file, "w", encoding="utf-8") as f:
+        f.write("[]")
+
+    success, count = process_single_json_file(str(source), str(output_dir), max_workers=1)
+    assert (success, count) == (False, 0)
+    assert not os.path.exists(success_file)
+    assert not os.path.exists(error_file)
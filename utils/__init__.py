@@ -4,9 +4,22 @@
 
 # 导入常用的工具函数，方便其他模块使用
 from .logger_utils import setup_logger, get_logger, set_log_level
-from .validation_utils import is_none_or_empty, check_required_fields, get_missing_fields
+from .validation_utils import (
+    is_none_or_empty, check_required_fields, get_missing_fields,
+    build_empty_masks, summarize_empty_masks
+)
 from .data_utils import create_validation_summary
-from .data_splitter_utils import split_json_file, calculate_split_info, get_split_summary
+from .data_splitter_utils import split_json_file, calculate_split_info, get_split_summary, ChunkedRecordWriter
+from .excel_reader_utils import iter_excel_rows, iter_excel_batches
+from .serialization_utils import (
+    open_record_writer, dump_records, iter_records, load_records, detect_format,
+    get_output_format, get_output_extension
+)
+from .parse_utils import parse_string_list
+from .cache_utils import LRUCache
+from .diagnostics_utils import DiagnosticsCollector
+from .manifest_utils import compute_file_hash, ProcessingManifest
+from .price_utils import extract_price_values, parse_price_number
 from .model_size import extract_brand_info
 
 __all__ = [
@@ -14,10 +27,26 @@ __all__ = [
     'setup_logger', 'get_logger', 'set_log_level',
     # 验证工具
     'is_none_or_empty', 'check_required_fields', 'get_missing_fields',
+    'build_empty_masks', 'summarize_empty_masks',
     # 数据工具
     'create_validation_summary',
     # 数据分割工具
-    'split_json_file', 'calculate_split_info', 'get_split_summary',
+    'split_json_file', 'calculate_split_info', 'get_split_summary', 'ChunkedRecordWriter',
+    # Excel流式读取工具
+    'iter_excel_rows', 'iter_excel_batches',
+    # 序列化工具
+    'open_record_writer', 'dump_records', 'iter_records', 'load_records', 'detect_format',
+    'get_output_format', 'get_output_extension',
+    # 字符串化列表解析工具
+    'parse_string_list',
+    # 缓存工具
+    'LRUCache',
+    # 诊断统计工具
+    'DiagnosticsCollector',
+    # 处理清单工具
+    'compute_file_hash', 'ProcessingManifest',
+    # 价格解析工具
+    'extract_price_values', 'parse_price_number',
     'extract_brand_info',
 
 ]
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+缓存工具模块 - 提供带命中统计的有界LRU缓存
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    有界LRU缓存，超过容量时淘汰最久未使用的条目，并统计命中/未命中次数
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        初始化缓存
+
+        Args:
+            maxsize: 最大缓存条数，<=0时不缓存（只统计未命中）
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """
+        读取缓存，命中时将条目移到最近使用的位置
+
+        Args:
+            key: 缓存键
+            default: 未命中时的返回值
+
+        Returns:
+            Any: 缓存值或default
+        """
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        """
+        写入缓存，超过容量时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+        """
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        """清空缓存内容和统计"""
+        self._data.clear()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """重置命中统计，保留缓存内容"""
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计
+
+        Returns:
+            Dict[str, int]: 命中数、未命中数、当前条数和容量
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize
+        }
@@ -4,45 +4,64 @@
 import json
 import os
 import math
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 from pathlib import Path
 
 # 导入项目工具
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from config.config import OUTPUT_SETTINGS, SPLIT_CONFIG
 from utils.logger_utils import setup_logger
+from utils.serialization_utils import (
+    get_output_format, get_output_extension, serialize_record,
+    open_record_writer, dump_records, iter_records, load_records
+)
 
 
 def split_json_file(
     input_file_path: str,
     output_dir: str = None,
     chunk_size: int = 1000,
-    create_subdirs: bool = True
+    create_subdirs: bool = True,
+    streaming: Optional[bool] = None,
+    max_bytes: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     将大型JSON文件分割成多个小文件
     
+    流式模式下逐个解析顶层数组元素并滚动写入分块文件，内存占用与文件大小无关，
+    总条数和分块数在分割结束时才确定
+    
     Args:
-        input_file_path: 输入JSON文件路径
+        input_file_path: 输入JSON文件路径（JSON数组或JSON Lines）
         output_dir: 输出目录，如果为None则自动生成
-        chunk_size: 每个分割文件的数据条数
+        chunk_size: 每个分割文件的数据条数，流式模式下可为None（仅按字节数分块）
         create_subdirs: 是否创建子目录
+        streaming: 是否使用流式模式，为None时使用SPLIT_CONFIG中的配置
+        max_bytes: 每个分割文件的目标字节数上限，设置后强制使用流式模式
         
     Returns:
         Dict[str, Any]: 分割结果统计
     """
     logger = setup_logger("step1_data_validator")
     
+    if streaming is None:
+        streaming = SPLIT_CONFIG.get("streaming", True)
+    if max_bytes is None:
+        max_bytes = SPLIT_CONFIG.get("max_bytes")
+    
     try:
         # 验证输入文件
         if not os.path.exists(input_file_path):
             raise FileNotFoundError(f"输入文件不存在: {input_file_path}")
         
+        if streaming or max_bytes:
+            return _split_json_file_streaming(input_file_path, output_dir, chunk_size, max_bytes)
+        
         # 读取JSON数据
         # logger.info(f"开始读取文件: {input_file_path}")
-        with open(input_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_records(input_file_path)
         
         if not isinstance(data, list):
             raise ValueError("JSON文件必须包含一个数组")
@@ -64,6 +83,7 @@ def split_json_file(
         # 执行分割
         split_files = []
         base_filename = _extract_base_filename(input_file_path)
+        extension = get_output_extension()
         
         for i in range(split_info['total_files']):
             start_idx = i * chunk_size
@@ -71,12 +91,11 @@ def split_json_file(
             chunk_data = data[start_idx:end_idx]
             
             # 生成输出文件名
-            output_filename = _create_split_filename(base_filename, i + 1, split_info['total_files'])
+            output_filename = _create_split_filename(base_filename, i + 1, split_info['total_files'], extension)
             output_path = os.path.join(output_dir, output_filename)
             
             # 保存分割文件
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(chunk_data, f, ensure_ascii=False, indent=2)
+            dump_records(chunk_data, output_path)
             
             split_files.append(output_path)
             # logger.info(f"已创建分割文件 {i + 1}/{split_info['total_files']}: {output_filename} ({len(chunk_data)} 条数据)")
@@ -88,7 +107,9 @@ def split_json_file(
             "total_data_count": total_count,
             "chunk_size": chunk_size,
             "total_files": split_info['total_files'],
+            "last_file_size": split_info['last_file_size'],
             "split_files": split_files,
+            "mode": "in_memory",
             "status": "success"
         }
         
@@ -104,17 +125,75 @@ def split_json_file(
         }
 
 
-def calculate_split_info(total_count: int, chunk_size: int) -> Dict[str, int]:
+def _split_json_file_streaming(
+    input_file_path: str,
+    output_dir: Optional[str],
+    chunk_size: Optional[int],
+    max_bytes: Optional[int]
+) -> Dict[str, Any]:
+    """
+    流式分割：逐个解析输入元素，达到条数或字节数上限时切换到下一个分块文件
+    
+    Args:
+        input_file_path: 输入文件路径
+        output_dir: 输出目录，如果为None则自动生成
+        chunk_size: 每个分块的最大条数
+        max_bytes: 每个分块的目标字节数上限
+        
+    Returns:
+        Dict[str, Any]: 分割结果统计
+    """
+    if output_dir is None:
+        output_dir = _generate_output_dir(input_file_path)
+    
+    base_filename = _extract_base_filename(input_file_path)
+    with ChunkedRecordWriter(output_dir, base_filename, chunk_size, max_bytes=max_bytes) as writer:
+        for record in iter_records(input_file_path):
+            writer.write(record)
+    
+    # 总条数和每个分块的条数在写完后才能确定
+    split_info = calculate_split_info(writer.count, chunk_size, [part["count"] for part in writer.parts])
+    
+    return {
+        "input_file": input_file_path,
+        "output_dir": output_dir,
+        "total_data_count": split_info['total_count'],
+        "chunk_size": chunk_size,
+        "max_bytes": max_bytes,
+        "total_files": split_info['total_files'],
+        "last_file_size": split_info['last_file_size'],
+        "split_files": writer.split_files,
+        "manifest_file": writer.file_path if writer.split_files else None,
+        "mode": "streaming",
+        "status": "success"
+    }
+
+
+def calculate_split_info(
+    total_count: int,
+    chunk_size: Optional[int],
+    part_counts: Optional[List[int]] = None
+) -> Dict[str, int]:
     """
     计算分割信息
     
     Args:
         total_count: 总数据条数
         chunk_size: 每块大小
+        part_counts: 实际写出的每个分块条数（流式/按字节分块时使用），
+                     提供时以实际结果为准
         
     Returns:
         Dict[str, int]: 分割信息
     """
+    if part_counts is not None:
+        return {
+            "total_count": total_count,
+            "chunk_size": chunk_size,
+            "total_files": len(part_counts),
+            "last_file_size": part_counts[-1] if part_counts else 0
+        }
+    
     total_files = math.ceil(total_count / chunk_size)
     return {
         "total_count": total_count,
@@ -153,7 +232,8 @@ def _extract_base_filename(input_file_path: str) -> str:
     return os.path.splitext(filename)[0]
 
 
-def _create_split_filename(base_filename: str, part_num: int, total_parts: int) -> str:
+def _create_split_filename(base_filename: str, part_num: int, total_parts: int,
+                           extension: str = ".json") -> str:
     """
     创建分割文件名
     
@@ -161,6 +241,7 @@ def _create_split_filename(base_filename: str, part_num: int, total_parts: int)
         base_filename: 基础文件名
         part_num: 当前部分编号
         total_parts: 总部分数
+        extension: 文件扩展名
         
     Returns:
         str: 分割文件名
@@ -169,11 +250,156 @@ def _create_split_filename(base_filename: str, part_num: int, total_parts: int)
     digits = len(str(total_parts))
     part_str = str(part_num).zfill(digits)
     
-    return f"{base_filename}_part_{part_str}.json"
+    return f"{base_filename}_part_{part_str}{extension}"
 
 
 
 
+class ChunkedRecordWriter:
+    """
+    滚动分块写入器
+    按chunk_size条记录（或max_bytes字节）滚动写入多个记录文件（命名规则与split_json_file一致，
+    格式由OUTPUT_SETTINGS["format"]决定），关闭时生成分块清单，记录每个分块文件对应的行号范围
+    """
+    
+    def __init__(
+        self,
+        output_dir: str,
+        base_filename: str,
+        chunk_size: Optional[int] = 1000,
+        fmt: Optional[str] = None,
+        max_bytes: Optional[int] = None
+    ):
+        """
+        初始化写入器
+        
+        Args:
+            output_dir: 分块文件输出目录
+            base_filename: 基础文件名（不含扩展名）
+            chunk_size: 每个分块文件的最大数据条数，为None时不限条数
+            fmt: 输出格式，为None时使用OUTPUT_SETTINGS["format"]
+            max_bytes: 每个分块文件的目标字节数上限，为None时不限大小；
+                       单条记录超过上限时独占一个分块
+        """
+        self.output_dir = output_dir
+        self.base_filename = base_filename
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self.format = get_output_format(fmt)
+        self.extension = get_output_extension(self.format)
+        
+        # 清单文件路径，关闭后写入
+        self.file_path = os.path.join(output_dir, f"{base_filename}.manifest")
+        self.count = 0
+        self.split_files = []
+        self.parts = []
+        
+        self._writer = None
+        self._chunk_bytes = 0
+        self._temp_files = []
+    
+    def write(self, record: Dict[str, Any]) -> None:
+        """
+        写入一条记录，当前分块写满后自动切换到下一个分块
+        
+        Args:
+            record: 要写入的记录
+        """
+        payload = serialize_record(record, self.format)
+        if self.max_bytes:
+            payload_bytes = len(payload) if isinstance(payload, bytes) else len(payload.encode("utf-8"))
+        else:
+            payload_bytes = 0
+        
+        if self._writer is None:
+            self._open_chunk()
+        elif self._chunk_full(payload_bytes):
+            self._close_chunk()
+            self._open_chunk()
+        
+        self._writer.write_serialized(payload)
+        self._chunk_bytes += payload_bytes
+        self.count += 1
+    
+    def _chunk_full(self, next_bytes: int) -> bool:
+        """判断写入下一条记录前是否需要切换分块"""
+        if self.chunk_size and self._writer.count >= self.chunk_size:
+            return True
+        if self.max_bytes and self._chunk_bytes + next_bytes > self.max_bytes:
+            return True
+        return False
+    
+    def _open_chunk(self) -> None:
+        """打开新的分块临时文件（关闭前不会被按扩展名匹配到）"""
+        temp_path = os.path.join(
+            self.output_dir, f"{self.base_filename}_part_{len(self._temp_files) + 1}{self.extension}.tmp"
+        )
+        self._writer = open_record_writer(temp_path, self.format, lazy=False)
+        self._temp_files.append(temp_path)
+        self.parts.append({"start_row": self.count})
+        self._chunk_bytes = 0
+    
+    def _close_chunk(self) -> None:
+        """结束当前分块文件"""
+        self._writer.close()
+        self.parts[-1]["end_row"] = self.count
+        self.parts[-1]["count"] = self._writer.count
+        self._writer = None
+    
+    def close(self) -> None:
+        """
+        关闭写入器：按最终分块数确定编号位数并重命名分块文件，然后写入清单
+        """
+        if self._writer is not None:
+            self._close_chunk()
+        
+        if not self._temp_files or self.split_files:
+            return
+        
+        total_parts = len(self._temp_files)
+        for i, (temp_path, part) in enumerate(zip(self._temp_files, self.parts), 1):
+            filename = _create_split_filename(self.base_filename, i, total_parts, self.extension)
+            final_path = os.path.join(self.output_dir, filename)
+            os.replace(temp_path, final_path)
+            self.parts[i - 1] = {"file": filename, **part}
+            self.split_files.append(final_path)
+        
+        manifest = {
+            "base_filename": self.base_filename,
+            "format": self.format,
+            "chunk_size": self.chunk_size,
+            "max_bytes": self.max_bytes,
+            "total_data_count": self.count,
+            "total_files": total_parts,
+            # 行号从0开始，start_row包含、end_row不包含
+            "parts": self.parts
+        }
+        with open(self.file_path, 'w', encoding=OUTPUT_SETTINGS.get("encoding", "utf-8")) as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+    
+    def abort(self) -> None:
+        """
+        放弃写入：关闭当前分块并删除所有分块临时文件，不重命名分块、不写入清单
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for temp_path in self._temp_files:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        self._temp_files = []
+        self.parts = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
 def get_split_summary(split_result: Dict[str, Any]) -> str:
     """
     生成分割结果摘要
@@ -187,12 +413,21 @@ def get_split_summary(split_result: Dict[str, Any]) -> str:
     if split_result["status"] == "failed":
         return f"分割失败: {split_result.get('error', '未知错误')}"
     
+    chunk_limits = []
+    if split_result.get('chunk_size'):
+        chunk_limits.append(f"{split_result['chunk_size']} 条/文件")
+    if split_result.get('max_bytes'):
+        chunk_limits.append(f"不超过 {split_result['max_bytes']} 字节/文件")
+    chunk_desc = "，".join(chunk_limits) or "不限"
+    if split_result.get('mode') == "streaming":
+        chunk_desc += f"（流式分割，最后一个文件 {split_result['last_file_size']} 条）"
+    
     return f"""
 数据分割摘要:
 - 输入文件: {split_result['input_file']}
 - 输出目录: {split_result['output_dir']}
 - 总数据量: {split_result['total_data_count']} 条
-- 分块大小: {split_result['chunk_size']} 条/文件
+- 分块大小: {chunk_desc}
 - 生成文件: {split_result['total_files']} 个
 - 分割状态: 成功
 """ 
\ No newline at end of file
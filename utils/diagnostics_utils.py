@@ -0,0 +1,108 @@
+"""
+诊断统计工具模块 - 以计数器代替逐条日志，按类别汇总次数并保留少量示例
+"""
+from typing import Any, Dict, List, Optional
+
+# 导入配置
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import DIAGNOSTICS_CONFIG
+
+
+class DiagnosticsCollector:
+    """
+    诊断信息收集器
+    按 类别 -> 项目 统计出现次数，每个项目最多保留max_samples个不重复的示例，
+    处理结束后统一输出一次汇总，避免大数据量时逐条写日志
+    """
+
+    def __init__(self, max_samples: Optional[int] = None):
+        """
+        初始化收集器
+
+        Args:
+            max_samples: 每个项目保留的示例数，为None时使用DIAGNOSTICS_CONFIG中的max_samples
+        """
+        if max_samples is None:
+            max_samples = DIAGNOSTICS_CONFIG.get("max_samples", 3)
+        self.max_samples = max_samples
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.samples: Dict[str, Dict[str, List[Any]]] = {}
+
+    def record(self, category: str, key: str, sample: Any = None, count: int = 1):
+        """
+        记录一次诊断事件
+
+        Args:
+            category: 类别，如"字段原始数据为空"
+            key: 类别下的项目，如字段名
+            sample: 示例（如记录索引、商品标题），为None时不保存
+            count: 本次累加的次数
+        """
+        category_counts = self.counts.setdefault(category, {})
+        category_counts[key] = category_counts.get(key, 0) + count
+
+        if sample is not None:
+            self._add_sample(category, key, sample)
+
+    def _add_sample(self, category: str, key: str, sample: Any):
+        """保存示例，每个项目最多保留max_samples个不重复的示例"""
+        key_samples = self.samples.setdefault(category, {}).setdefault(key, [])
+        if len(key_samples) < self.max_samples and sample not in key_samples:
+            key_samples.append(sample)
+
+    def merge(self, other: "DiagnosticsCollector"):
+        """
+        合并另一个收集器（如并行进程中的统计），示例按合并顺序补足到max_samples个
+
+        Args:
+            other: 另一个收集器
+        """
+        for category, category_counts in other.counts.items():
+            for key, count in category_counts.items():
+                self.record(category, key, count=count)
+        for category, category_samples in other.samples.items():
+            for key, key_samples in category_samples.items():
+                for sample in key_samples:
+                    self._add_sample(category, key, sample)
+
+    def reset(self):
+        """清空所有统计"""
+        self.counts = {}
+        self.samples = {}
+
+    def get_count(self, category: str, key: Optional[str] = None) -> int:
+        """
+        获取统计次数
+
+        Args:
+            category: 类别
+            key: 项目，为None时返回整个类别的总次数
+
+        Returns:
+            int: 次数
+        """
+        category_counts = self.counts.get(category, {})
+        if key is None:
+            return sum(category_counts.values())
+        return category_counts.get(key, 0)
+
+    def to_report(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        生成汇总报告
+
+        Returns:
+            Dict: {类别: {项目: {"次数": n, "示例": [...]}}}
+        """
+        report = {}
+        for category, category_counts in self.counts.items():
+            category_samples = self.samples.get(category, {})
+            report[category] = {
+                key: {"次数": count, "示例": category_samples.get(key, [])}
+                for key, count in category_counts.items()
+            }
+        return report
+
+    def __bool__(self) -> bool:
+        return bool(self.counts)
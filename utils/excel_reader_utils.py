@@ -0,0 +1,166 @@
+"""
+Excel流式读取工具模块 - 以只读模式逐行读取工作表，避免一次性加载整个工作簿
+单元格的空值判定与原pd.read_excel读取逻辑一致（含pandas默认视为缺失值的"NA"、"null"等文本）；
+旧版.xls文件通过pandas + xlrd读取
+"""
+import os
+from typing import List, Dict, Any, Iterator, Optional
+
+import pandas as pd
+from openpyxl import load_workbook
+
+# 导入项目配置
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import REQUIRED_FIELDS, OPTIONAL_FIELDS, PROCESSING_RULES
+
+
+def get_default_fields() -> List[str]:
+    """
+    获取默认读取的字段列表（必需字段 + 清洗阶段使用的可选字段）
+
+    Returns:
+        List[str]: 字段名列表
+    """
+    return list(REQUIRED_FIELDS) + [f for f in OPTIONAL_FIELDS if f not in REQUIRED_FIELDS]
+
+
+# pd.read_excel默认视为缺失值的字符串（与pandas的默认na_values一致，整个单元格完全匹配时才视为缺失）
+DEFAULT_NA_STRINGS = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+])
+
+
+def _normalize_cell_value(value: Any) -> Any:
+    """
+    规范化单元格值，与原pandas读取逻辑保持一致
+
+    Args:
+        value: 单元格原始值
+
+    Returns:
+        Any: None表示空单元格或缺失值（含DEFAULT_NA_STRINGS中的文本），纯空白字符串统一为""
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        if value in DEFAULT_NA_STRINGS:
+            return None
+        if value.strip() == "":
+            return ""
+        return value
+    if (isinstance(value, float) and value != value) or value is pd.NaT:
+        return None
+    return value
+
+
+def _iter_xls_rows(excel_path: str, fields: List[str], sheet_name: Optional[str]) -> Iterator[Dict[str, Any]]:
+    """
+    读取旧版.xls文件（openpyxl不支持该格式，通过pandas + xlrd读取，.xls最多65536行，整表读入内存）
+
+    Args:
+        excel_path: .xls文件路径
+        fields: 需要读取的列名列表
+        sheet_name: 工作表名称，为None时读取第一个工作表
+
+    Yields:
+        Dict[str, Any]: 单条记录，仅包含表头中存在的目标列
+    """
+    wanted = set(fields)
+    try:
+        df = pd.read_excel(excel_path, sheet_name=sheet_name or 0,
+                           usecols=lambda name: str(name).strip() in wanted)
+    except ImportError as e:
+        raise ImportError("读取.xls文件需要先安装xlrd: pip install xlrd") from e
+
+    columns = [(name, str(name).strip()) for name in df.columns]
+    for values in df.itertuples(index=False, name=None):
+        yield {field: _normalize_cell_value(value) for (_, field), value in zip(columns, values)}
+
+
+def iter_excel_rows(
+    excel_path: str,
+    fields: Optional[List[str]] = None,
+    sheet_name: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    以只读模式逐行读取Excel，每次产出一条记录字典
+
+    Args:
+        excel_path: Excel文件路径
+        fields: 需要读取的列名列表，为None时读取必需字段和可选字段
+        sheet_name: 工作表名称，为None时读取第一个工作表
+
+    Yields:
+        Dict[str, Any]: 单条记录，仅包含表头中存在的目标列
+    """
+    if fields is None:
+        fields = get_default_fields()
+
+    if excel_path.lower().endswith(".xls"):
+        yield from _iter_xls_rows(excel_path, fields, sheet_name)
+        return
+
+    workbook = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            return
+
+        # 只保留目标列，记录列号与字段名的对应关系
+        wanted = set(fields)
+        columns = [(i, str(name).strip()) for i, name in enumerate(header)
+                   if name is not None and str(name).strip() in wanted]
+
+        # 中间的空白行保留（与pandas一致），末尾的空白行丢弃，因此先暂存连续空白行
+        pending_blank_rows = 0
+        for row in rows:
+            if row is None or all(cell is None for cell in row):
+                pending_blank_rows += 1
+                continue
+
+            for _ in range(pending_blank_rows):
+                yield {name: None for _, name in columns}
+            pending_blank_rows = 0
+
+            row_len = len(row)
+            yield {
+                name: _normalize_cell_value(row[i]) if i < row_len else None
+                for i, name in columns
+            }
+    finally:
+        workbook.close()
+
+
+def iter_excel_batches(
+    excel_path: str,
+    batch_size: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    按批次读取Excel数据，内存占用只与批次大小相关
+
+    Args:
+        excel_path: Excel文件路径
+        batch_size: 每批记录数，为None时使用PROCESSING_RULES中的batch_size
+        fields: 需要读取的列名列表
+
+    Yields:
+        List[Dict[str, Any]]: 一批记录
+    """
+    batch_size = batch_size or PROCESSING_RULES.get("batch_size", 100)
+
+    batch = []
+    for record in iter_excel_rows(excel_path, fields=fields):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
@@ -1,15 +1,212 @@
 """
 日志工具模块 - 提供通用的日志记录器设置功能
+
+支持两种模式（由LOGGING_CONFIG["queue_mode"]控制）：
+- 同步模式：每个日志记录器直接挂载文件处理器和控制台处理器
+- 队列模式：日志记录器只把记录放入队列，由主进程中唯一的监听线程负责格式化、
+  写文件（按大小轮转）和输出到控制台；进程池工作进程通过init_worker_logging
+  接入同一个队列，多个进程共享同一个日志文件而不会相互交错
+queue_mode为"auto"（默认）时先用同步模式，第一次启动进程池（调用get_log_queue）时才创建队列和监听线程，
+已有的日志记录器随之切换到队列；True时始终使用队列模式，False时不使用
 """
+import atexit
 import logging
+import logging.handlers
+import multiprocessing
 import os
-from typing import Optional
+import threading
+from typing import Dict, Optional
 
 # 导入配置
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.config import LOGGING_CONFIG
 
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# 队列模式的全局状态
+_log_queue = None                                   # 日志队列（主进程创建，工作进程由初始化函数传入）
+_log_listener: Optional[logging.handlers.QueueListener] = None
+_log_router: Optional["_LogFileRouter"] = None
+_listener_pid: Optional[int] = None
+_is_worker_process = False
+_queue_lock = threading.Lock()
+
+
+class _LogFileRouter(logging.Handler):
+    """
+    监听线程中的文件处理器：按日志记录器名称把记录写入各自的日志文件
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.log_dirs: Dict[str, str] = {}          # 日志记录器名称 -> 日志目录
+        self.file_handlers: Dict[str, logging.Handler] = {}
+
+    def register(self, log_name: str, log_dir: str):
+        """登记日志记录器对应的日志目录（文件在首次写入时创建）"""
+        self.log_dirs.setdefault(log_name, log_dir)
+
+    def _get_file_handler(self, log_name: str) -> logging.Handler:
+        handler = self.file_handlers.get(log_name)
+        if handler is None:
+            # 工作进程中新建的日志记录器未在主进程登记时，使用默认目录
+            log_dir = self.log_dirs.get(log_name, "logs")
+            os.makedirs(log_dir, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                os.path.join(log_dir, f"{log_name}.log"),
+                maxBytes=LOGGING_CONFIG.get("max_bytes", 0),
+                backupCount=LOGGING_CONFIG.get("backup_count", 0),
+                encoding="utf-8"
+            )
+            handler.setFormatter(self.formatter)
+            self.file_handlers[log_name] = handler
+        return handler
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self._get_file_handler(record.name).handle(record)
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        for handler in self.file_handlers.values():
+            handler.close()
+        self.file_handlers.clear()
+        super().close()
+
+
+class _ConsoleFlagFilter(logging.Filter):
+    """
+    挂在队列处理器上的过滤器：入队时在记录上标注是否输出到控制台
+    （在调用方线程中标注，开关立即对之后的日志生效，不受监听线程处理进度影响）
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.console_enabled = True
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.console_enabled = self.console_enabled
+        return True
+
+
+def _console_enabled_filter(record: logging.LogRecord) -> bool:
+    """监听线程中控制台处理器的过滤函数"""
+    return getattr(record, "console_enabled", True)
+
+
+def _create_queue_handler(log_queue) -> logging.handlers.QueueHandler:
+    """创建带控制台开关的队列处理器"""
+    handler = logging.handlers.QueueHandler(log_queue)
+    handler.addFilter(_ConsoleFlagFilter())
+    return handler
+
+
+def _queue_mode_enabled() -> bool:
+    """新建的日志记录器是否使用队列模式（工作进程接入了队列、队列已启动或配置为始终使用队列）"""
+    return _is_worker_process or _log_queue is not None or LOGGING_CONFIG.get("queue_mode", "auto") is True
+
+
+def _move_loggers_to_queue(log_queue, router: Optional["_LogFileRouter"] = None) -> None:
+    """
+    把已创建的日志记录器的处理器替换为队列处理器
+
+    Args:
+        log_queue: 日志队列
+        router: 主进程的文件路由，不为None时按原文件处理器登记日志目录，并保留控制台输出的开关状态
+    """
+    for logger in list(logging.Logger.manager.loggerDict.values()):
+        if not isinstance(logger, logging.Logger) or not logger.handlers:
+            continue
+        queue_handler = _create_queue_handler(log_queue)
+        if router is not None:
+            for handler in logger.handlers:
+                if isinstance(handler, logging.FileHandler):
+                    router.register(logger.name, os.path.dirname(handler.baseFilename))
+            console_enabled = any(isinstance(h, logging.StreamHandler) and not isinstance(h, logging.FileHandler)
+                                  for h in logger.handlers)
+            for log_filter in queue_handler.filters:
+                log_filter.console_enabled = console_enabled
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            if router is not None:
+                handler.close()
+        logger.addHandler(queue_handler)
+
+
+def get_log_queue():
+    """
+    获取日志队列，主进程中首次调用时创建队列并启动监听线程
+
+    用作进程池的初始化参数：
+        ProcessPoolExecutor(initializer=init_worker_logging, initargs=(get_log_queue(),))
+
+    Returns:
+        multiprocessing.Queue: 日志队列，queue_mode为False时返回None
+    """
+    global _log_queue, _log_listener, _log_router, _listener_pid
+
+    if _log_queue is not None:
+        return _log_queue
+    if LOGGING_CONFIG.get("queue_mode", "auto") is False:
+        return None
+
+    with _queue_lock:
+        if _log_queue is None:
+            formatter = logging.Formatter(LOG_FORMAT)
+
+            _log_router = _LogFileRouter()
+            _log_router.setFormatter(formatter)
+
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(formatter)
+            console_handler.addFilter(_console_enabled_filter)
+
+            queue = multiprocessing.Queue(-1)
+            _log_listener = logging.handlers.QueueListener(
+                queue, _log_router, console_handler, respect_handler_level=True
+            )
+            _log_listener.start()
+            _listener_pid = os.getpid()
+            # 之前以同步模式创建的日志记录器改为写入队列
+            _move_loggers_to_queue(queue, _log_router)
+            _log_queue = queue
+            # 进程退出前停止监听线程，保证队列中剩余的日志全部写出
+            atexit.register(stop_log_listener)
+
+    return _log_queue
+
+
+def stop_log_listener():
+    """停止监听线程并关闭日志文件（会先写完队列中剩余的日志）"""
+    global _log_listener
+    # fork出的子进程继承了监听器对象，但监听线程只在创建它的进程中运行
+    if _log_listener is None or os.getpid() != _listener_pid:
+        return
+    listener, _log_listener = _log_listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+def init_worker_logging(log_queue) -> None:
+    """
+    进程池工作进程的初始化函数：日志统一写入主进程的日志队列
+
+    Args:
+        log_queue: 主进程get_log_queue()返回的队列，为None时保持同步模式
+    """
+    global _log_queue, _is_worker_process
+    if log_queue is None:
+        return
+
+    _log_queue = log_queue
+    _is_worker_process = True
+
+    # 已创建的日志记录器（如fork继承的处理器）改为写入队列
+    _move_loggers_to_queue(log_queue)
+
 
 def setup_logger(log_name: str, log_dir: str = "logs") -> logging.Logger:
     """
@@ -22,19 +219,27 @@ def setup_logger(log_name: str, log_dir: str = "logs") -> logging.Logger:
     Returns:
         logging.Logger: 配置好的日志记录器
     """
+    logger = logging.getLogger(log_name)
+    logger.setLevel(logging.INFO)
+
+    # 队列模式：只挂载队列处理器，文件和控制台输出由监听线程完成
+    if _queue_mode_enabled():
+        log_queue = get_log_queue()
+        if _log_router is not None:
+            _log_router.register(log_name, log_dir)
+        if not logger.handlers:
+            logger.addHandler(_create_queue_handler(log_queue))
+        return logger
+
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
     log_file = os.path.join(log_dir, f"{log_name}.log")
-    logger = logging.getLogger(log_name)
-    logger.setLevel(logging.INFO)
 
     # 防止重复添加处理器
     if not logger.handlers:
         # 创建格式化器
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
+        formatter = logging.Formatter(LOG_FORMAT)
         
         # 文件处理器
         file_handler = logging.FileHandler(log_file, encoding="utf-8")
@@ -86,15 +291,22 @@ def toggle_console_output(logger: logging.Logger, enable: bool = True) -> None:
         logger: 日志记录器
         enable: True开启控制台输出，False关闭
     """
+    # 队列模式下控制台输出由监听线程统一完成，通过入队时的标记开关
+    queue_handlers = [h for h in logger.handlers if isinstance(h, logging.handlers.QueueHandler)]
+    if queue_handlers:
+        for handler in queue_handlers:
+            for log_filter in handler.filters:
+                if isinstance(log_filter, _ConsoleFlagFilter):
+                    log_filter.console_enabled = enable
+        return
+    
     if enable:
         # 检查是否已有控制台处理器
         has_console = any(isinstance(h, logging.StreamHandler) and not isinstance(h, logging.FileHandler) 
                          for h in logger.handlers)
         if not has_console:
             console_handler = logging.StreamHandler()
-            formatter = logging.Formatter(
-                "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-            )
+            formatter = logging.Formatter(LOG_FORMAT)
             console_handler.setFormatter(formatter)
             console_handler.setLevel(logger.level)
             logger.addHandler(console_handler)
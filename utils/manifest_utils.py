@@ -0,0 +1,154 @@
+"""
+处理清单工具模块 - 记录输入文件的内容哈希和处理版本，重复运行时跳过未变化的文件
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+# 计算文件哈希时每次读取的字节数
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def compute_file_hash(file_path: str, algorithm: str = "sha256") -> str:
+    """
+    分块计算文件内容的哈希值（内存占用与文件大小无关）
+
+    Args:
+        file_path: 文件路径
+        algorithm: hashlib支持的哈希算法
+
+    Returns:
+        str: 十六进制哈希值
+    """
+    digest = hashlib.new(algorithm)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ProcessingManifest:
+    """
+    处理清单
+    按输入文件记录 内容哈希 + 处理版本 + 输出文件及其内容哈希，
+    内容和版本都未变化、且输出文件仍存在并与记录的哈希一致时视为无需重新处理。
+    文件大小和修改时间未变化时直接复用记录的哈希，不再重新读取文件。
+    """
+
+    def __init__(self, manifest_path: str):
+        """
+        初始化并读取已有的清单文件
+
+        Args:
+            manifest_path: 清单文件路径（JSON），不存在时从空清单开始
+        """
+        self.manifest_path = manifest_path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get("files", {})
+            except (ValueError, OSError, AttributeError):
+                # 清单损坏时全部重新处理
+                self.entries = {}
+
+    @staticmethod
+    def _key(file_path: str) -> str:
+        return os.path.normpath(file_path)
+
+    def get_file_hash(self, file_path: str) -> str:
+        """
+        获取输入文件的内容哈希，文件大小和修改时间与清单记录一致时直接复用
+
+        Args:
+            file_path: 输入文件路径
+
+        Returns:
+            str: 内容哈希
+        """
+        stat = os.stat(file_path)
+        entry = self.entries.get(self._key(file_path))
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return entry["content_hash"]
+        return compute_file_hash(file_path)
+
+    def is_fresh(self, file_path: str, content_hash: str, version: str) -> bool:
+        """
+        判断输入文件是否已按当前版本处理过，且输出文件仍然存在、内容未被改动或覆盖
+
+        Args:
+            file_path: 输入文件路径
+            content_hash: 输入文件当前的内容哈希
+            version: 当前的处理版本
+
+        Returns:
+            bool: 是否可以跳过
+        """
+        entry = self.entries.get(self._key(file_path))
+        if not entry:
+            return False
+        if entry.get("content_hash") != content_hash or entry.get("version") != version:
+            return False
+        return all(self._output_matches(output) for output in entry.get("outputs", []))
+
+    @staticmethod
+    def _output_record(path: str) -> Dict[str, Any]:
+        """记录输出文件的内容哈希、大小和修改时间"""
+        stat = os.stat(path)
+        return {
+            "path": path,
+            "content_hash": compute_file_hash(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns
+        }
+
+    @staticmethod
+    def _output_matches(output: Any) -> bool:
+        """输出文件是否存在且内容与记录的哈希一致（大小和修改时间未变化时不重新计算哈希）"""
+        if not isinstance(output, dict):
+            # 旧版清单只记录了输出路径，无法确认内容，重新处理
+            return False
+        try:
+            stat = os.stat(output["path"])
+        except (OSError, KeyError):
+            return False
+        if stat.st_size != output.get("size"):
+            return False
+        if stat.st_mtime_ns == output.get("mtime_ns"):
+            return True
+        return compute_file_hash(output["path"]) == output.get("content_hash")
+
+    def update(self, file_path: str, content_hash: str, version: str,
+               outputs: Iterable[str], extra: Optional[Dict[str, Any]] = None):
+        """
+        记录一个输入文件的处理结果
+
+        Args:
+            file_path: 输入文件路径
+            content_hash: 处理时的内容哈希
+            version: 处理版本
+            outputs: 生成的输出文件路径（同时记录其内容哈希）
+            extra: 其他需要记录的信息（如记录数）
+        """
+        stat = os.stat(file_path)
+        entry = {
+            "content_hash": content_hash,
+            "version": version,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "outputs": [self._output_record(path) for path in outputs],
+            "processed_at": datetime.now().isoformat()
+        }
+        if extra:
+            entry.update(extra)
+        self.entries[self._key(file_path)] = entry
+
+    def save(self):
+        """写入清单文件（先写临时文件再替换，中途中断不会损坏已有清单）"""
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"files": self.entries}, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.manifest_path)
@@ -0,0 +1,181 @@
+"""
+字符串化列表解析工具模块 - 快速解析Excel单元格中"由字符串组成的嵌套列表"
+
+Excel中的大部分字段（时间、价格、销售、商品详情、公司基本信息等）都是
+str(list)生成的文本，例如 [['年销量', '0件'], ['近30天销量', '0件']]。
+这里用正则分词直接构建列表，只有遇到其他形式（数字、None、字典、字符串拼接、
+少见的转义等）时才回退到ast.literal_eval，保证结果与ast.literal_eval完全一致。
+"""
+import ast
+import json
+import re
+from typing import Any, List, Optional
+
+# 字符串字面量中允许的转义序列，其余转义（如\N{...}、八进制、无效转义）回退到ast.literal_eval处理
+_ESCAPE = r"""\\(?:[\\'"abfnrtv]|x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8})"""
+
+# 字符串内容（展开写法：普通字符串段 + 若干"转义 + 普通字符串段"，避免逐字符分支回溯）
+# 内容中不允许出现原始换行、回车和空字节，这些情况的行为交给ast.literal_eval决定
+_SINGLE_BODY = r"[^'\\\n\r\x00]*(?:" + _ESCAPE + r"[^'\\\n\r\x00]*)*"
+_DOUBLE_BODY = r'[^"\\\n\r\x00]*(?:' + _ESCAPE + r'[^"\\\n\r\x00]*)*'
+
+# 分词：可选的空白 + 左括号 / 右括号 / 逗号 / 单引号字符串 / 双引号字符串
+_TOKEN_RE = re.compile(
+    r"[ \t\n]*(?:"
+    r"(\[)|(\])|(,)"
+    r"|'(" + _SINGLE_BODY + r")'"
+    r'|"(' + _DOUBLE_BODY + r')"'
+    r")"
+)
+# 列表之后的空白：换行后的最后一行如果只有空格/制表符，ast.literal_eval会报缩进错误
+_TRAILING_SPACE_RE = re.compile(r"[ \t]*(?:\n(?:[ \t\n]*\n)?)?")
+_ESCAPE_RE = re.compile(_ESCAPE)
+
+_SIMPLE_ESCAPES = {
+    "\\": "\\", "'": "'", '"': '"',
+    "a": "\a", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v",
+}
+
+# 整段转换为JSON的快速路径使用：
+# 字符串字面量（用于剥离后检查剩余骨架只有括号、逗号和空白）
+_STRING_LITERAL_RE = re.compile(
+    r"'" + _SINGLE_BODY + r"'"
+    r'|"' + _DOUBLE_BODY + r'"'
+)
+_SKELETON_RE = re.compile(r"[\[\], \t\n]*")
+# 与JSON语义不同的转义：\a \v \x \U 在JSON中不存在，代理对\ud800-\udbff在JSON中会被合并成一个字符
+_NON_JSON_ESCAPE_RE = re.compile(r"\\(?:[^'nrtbfu]|u[dD][89abAB])")
+
+_OPEN, _CLOSE, _COMMA, _SINGLE, _DOUBLE = 1, 2, 3, 4, 5
+
+
+class _Fallback(Exception):
+    """快速解析器无法处理的输入，需要回退到ast.literal_eval"""
+
+
+def _decode_escape(match: "re.Match") -> str:
+    """将单个转义序列还原为对应字符"""
+    escape = match.group()[1:]
+    if escape[0] in "xuU":
+        code_point = int(escape[1:], 16)
+        if code_point > 0x10FFFF:
+            raise _Fallback
+        return chr(code_point)
+    return _SIMPLE_ESCAPES[escape]
+
+
+def _parse_as_json(text: str) -> Optional[List[Any]]:
+    """
+    将只含单引号字符串的列表文本整体转换为JSON，交给C实现的json模块解析
+
+    仅处理最常见的形式：没有双引号、没有转义的反斜杠、转义都与JSON含义相同。
+    此时内容中的单引号一定以\\'形式出现，可以安全地与字符串两端的引号区分。
+
+    Returns:
+        Optional[List[Any]]: 解析结果，不满足条件时返回None
+    """
+    if ('"' in text or "\\\\" in text or "\x00" in text or "\r" in text
+            or _NON_JSON_ESCAPE_RE.search(text)):
+        return None
+
+    # 字符串之外只允许括号、逗号和空白（排除数字、None、字典等），语法由json模块校验
+    skeleton = _STRING_LITERAL_RE.sub("", text)
+    if not _SKELETON_RE.fullmatch(skeleton):
+        return None
+    last_bracket = text.rfind("]")
+    if last_bracket < 0 or not _TRAILING_SPACE_RE.fullmatch(text, last_bracket + 1):
+        return None
+
+    json_text = text.replace("\\'", "\x00").replace("'", '"').replace("\x00", "'")
+    try:
+        # strict=False允许字符串中出现原始制表符等控制字符，与Python字面量一致
+        return json.loads(json_text, strict=False)
+    except ValueError:
+        # 尾随逗号等JSON不支持但Python合法的写法，交给逐词解析
+        return None
+
+
+def _parse_tokens(text: str) -> List[Any]:
+    """
+    按"字符串组成的嵌套列表"语法逐个记号解析文本
+
+    Raises:
+        _Fallback: 文本包含该语法之外的内容
+    """
+    match_token = _TOKEN_RE.match
+    stack = []
+    current = None
+    result = None
+    expect_value = True   # 下一个记号是否可以是值（字符串或左括号）
+    pos = 0
+    end = len(text)
+
+    while pos < end:
+        match = match_token(text, pos)
+        if match is None:
+            break
+        pos = match.end()
+        kind = match.lastindex
+
+        if kind == _OPEN:
+            if not expect_value:
+                raise _Fallback
+            new_list = []
+            if current is None:
+                if result is not None:
+                    raise _Fallback
+                result = new_list
+            else:
+                current.append(new_list)
+                stack.append(current)
+            current = new_list
+        elif kind == _CLOSE:
+            # ']'可以出现在值之后、逗号之后（尾随逗号）或左括号之后（空列表）
+            if current is None:
+                raise _Fallback
+            current = stack.pop() if stack else None
+            expect_value = False
+            continue
+        elif kind == _COMMA:
+            if expect_value or current is None:
+                raise _Fallback
+        else:
+            if not expect_value or current is None:
+                raise _Fallback
+            value = match.group(kind)
+            if "\\" in value:
+                value = _ESCAPE_RE.sub(_decode_escape, value)
+            current.append(value)
+            expect_value = False
+            continue
+
+        expect_value = True
+
+    # 必须恰好解析出一个闭合的顶层列表，其后只允许空白
+    if result is None or current is not None or not _TRAILING_SPACE_RE.fullmatch(text, pos):
+        raise _Fallback
+    return result
+
+
+def parse_string_list(text: str) -> Any:
+    """
+    解析字符串化的列表，结果与ast.literal_eval(text)完全一致
+
+    对"字符串组成的嵌套列表"使用快速路径，其他输入回退到ast.literal_eval
+
+    Args:
+        text: 以'['开头的列表文本
+
+    Returns:
+        Any: 解析后的数据
+
+    Raises:
+        ValueError, SyntaxError: 与ast.literal_eval相同，文本不是合法的字面量时抛出
+    """
+    result = _parse_as_json(text)
+    if result is not None:
+        return result
+    try:
+        return _parse_tokens(text)
+    except _Fallback:
+        return ast.literal_eval(text)
@@ -0,0 +1,76 @@
+"""
+价格解析工具模块 - 从清洗后的价格展示文本中提取数值价格
+
+价格文本示例：
+    券后¥16.9 首件预估到手价 价格¥17.90 1个起批 ¥16.90 10-100个 ¥15.90 ≥100个
+    ¥12.50 ¥15.00
+    ¥12.50-15.00
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+# 金额：整数或小数，允许千分位逗号
+_AMOUNT = r"(\d[\d,]*(?:\.\d+)?)"
+
+# 带货币符号的价格，可以是区间（¥12.50-15.00）
+_PRICE_RE = re.compile(r"[¥￥]\s*" + _AMOUNT + r"(?:\s*[-~～—]\s*[¥￥]?\s*" + _AMOUNT + r")?")
+# 券后价（第1组为货币符号，用于从普通价格中排除）
+_COUPON_RE = re.compile(r"券后\s*([¥￥])\s*" + _AMOUNT)
+# 不带货币符号的纯数字价格（SKU价格列）
+_NUMBER_RE = re.compile(_AMOUNT)
+
+
+def _to_number(amount: str) -> float:
+    return float(amount.replace(",", ""))
+
+
+def parse_price_number(text: Any) -> Optional[float]:
+    """
+    解析单个价格（如SKU价格"12"、"¥12.5"），取文本中的第一个金额
+
+    Args:
+        text: 价格文本
+
+    Returns:
+        Optional[float]: 价格数值，没有金额时返回None
+    """
+    if not isinstance(text, str) or not text:
+        return None
+    match = _NUMBER_RE.search(text)
+    return _to_number(match.group(1)) if match else None
+
+
+def extract_price_values(text: Any) -> Dict[str, Optional[float]]:
+    """
+    从价格展示文本中提取最低价、最高价和券后价
+
+    券后价单独提取，不参与最低价/最高价的计算；区间价格的两端都参与计算
+
+    Args:
+        text: 清洗后的价格文本
+
+    Returns:
+        Dict[str, Optional[float]]: {"最低价": .., "最高价": .., "券后价": ..}，缺少的项为None
+    """
+    values = {"最低价": None, "最高价": None, "券后价": None}
+    if not isinstance(text, str) or not text:
+        return values
+
+    coupon_positions = set()
+    for match in _COUPON_RE.finditer(text):
+        coupon_positions.add(match.start(1))
+        if values["券后价"] is None:
+            values["券后价"] = _to_number(match.group(2))
+
+    unit_prices: List[float] = []
+    for match in _PRICE_RE.finditer(text):
+        if match.start() in coupon_positions:
+            continue
+        unit_prices.append(_to_number(match.group(1)))
+        if match.group(2):
+            unit_prices.append(_to_number(match.group(2)))
+
+    if unit_prices:
+        values["最低价"] = min(unit_prices)
+        values["最高价"] = max(unit_prices)
+    return values
@@ -0,0 +1,506 @@
+"""
+序列化工具模块 - 统一的记录文件读写层
+
+根据OUTPUT_SETTINGS["format"]选择输出格式：
+- json: 带缩进的JSON数组（缩进取OUTPUT_SETTINGS["indent"]）
+- json_compact: 无缩进、无多余空格的JSON数组
+- jsonl: JSON Lines，每行一条记录
+- msgpack: MessagePack二进制格式（需安装msgpack）
+
+读取时自动识别文件格式，各步骤可以读取任意一种格式的上游输出
+"""
+import json
+import os
+from typing import List, Dict, Any, Iterator, Iterable, Optional, Union
+
+# 导入项目配置
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import OUTPUT_SETTINGS
+
+try:
+    import msgpack
+except ImportError:  # msgpack为可选依赖，仅在使用msgpack格式时需要
+    msgpack = None
+
+
+# 各输出格式对应的文件扩展名
+FORMAT_EXTENSIONS = {
+    "json": ".json",
+    "json_compact": ".json",
+    "jsonl": ".jsonl",
+    "msgpack": ".msgpack",
+}
+
+# 可被iter_records读取的记录文件扩展名
+RECORD_FILE_EXTENSIONS = (".json", ".jsonl", ".msgpack")
+
+
+def get_output_format(fmt: Optional[str] = None) -> str:
+    """
+    获取输出格式，未指定时使用OUTPUT_SETTINGS["format"]
+
+    Args:
+        fmt: 输出格式
+
+    Returns:
+        str: 校验后的输出格式
+
+    Raises:
+        ValueError: 不支持的输出格式
+    """
+    fmt = (fmt or OUTPUT_SETTINGS.get("format", "json")).lower()
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"不支持的输出格式: {fmt}，可选: {', '.join(FORMAT_EXTENSIONS)}")
+    if fmt == "msgpack" and msgpack is None:
+        raise ImportError("使用msgpack输出格式需要先安装msgpack: pip install msgpack")
+    return fmt
+
+
+def get_output_extension(fmt: Optional[str] = None) -> str:
+    """
+    获取输出格式对应的文件扩展名
+
+    Args:
+        fmt: 输出格式，为None时使用OUTPUT_SETTINGS["format"]
+
+    Returns:
+        str: 文件扩展名（含"."）
+    """
+    return FORMAT_EXTENSIONS[get_output_format(fmt)]
+
+
+def serialize_record(record: Any, fmt: Optional[str] = None) -> Union[str, bytes]:
+    """
+    按输出格式序列化单条记录（不含数组分隔符和换行）
+
+    Args:
+        record: 要序列化的记录
+        fmt: 输出格式，为None时使用OUTPUT_SETTINGS["format"]
+
+    Returns:
+        Union[str, bytes]: msgpack格式返回bytes，其余返回str
+    """
+    fmt = get_output_format(fmt)
+    if fmt == "json":
+        indent = OUTPUT_SETTINGS.get("indent", 2)
+        text = json.dumps(record, ensure_ascii=False, indent=indent)
+        if indent:
+            # 与json.dump(list, indent=...)中数组元素的缩进保持一致
+            pad = " " * indent
+            text = pad + text.replace("\n", "\n" + pad)
+        return text
+    if fmt == "msgpack":
+        return msgpack.packb(record, use_bin_type=True)
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+class RecordWriter:
+    """
+    记录文件增量写入器基类
+    每次写入一条记录，写入后即可释放内存；默认首次写入时才创建文件
+    """
+
+    format = "json"
+    binary = False
+
+    def __init__(self, file_path: str, encoding: Optional[str] = None, lazy: bool = True):
+        """
+        初始化写入器
+
+        Args:
+            file_path: 输出文件路径
+            encoding: 文件编码，为None时使用OUTPUT_SETTINGS中的配置
+            lazy: 为True时首次写入才创建文件，为False时立即创建（空数据也会生成文件）
+        """
+        self.file_path = file_path
+        self.encoding = encoding or OUTPUT_SETTINGS.get("encoding", "utf-8")
+        self.count = 0
+        self._file = None
+        self._created = False
+        if not lazy:
+            self._open()
+
+    def _open(self) -> None:
+        """创建输出文件"""
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        if self.binary:
+            self._file = open(self.file_path, 'wb')
+        else:
+            self._file = open(self.file_path, 'w', encoding=self.encoding)
+        self._created = True
+        self._write_header()
+
+    def _write_header(self) -> None:
+        """写入文件头（子类按需实现）"""
+
+    def _write_footer(self) -> None:
+        """写入文件尾（子类按需实现）"""
+
+    def _write_separator(self) -> None:
+        """写入记录之间的分隔符（子类按需实现）"""
+
+    def serialize(self, record: Any) -> Union[str, bytes]:
+        """
+        序列化单条记录
+
+        Args:
+            record: 要序列化的记录
+
+        Returns:
+            Union[str, bytes]: 序列化结果
+        """
+        return serialize_record(record, self.format)
+
+    def write(self, record: Any) -> None:
+        """
+        追加写入一条记录
+
+        Args:
+            record: 要写入的记录
+        """
+        self.write_serialized(self.serialize(record))
+
+    def write_serialized(self, payload: Union[str, bytes]) -> None:
+        """
+        追加写入一条已序列化的记录（供需要预先计算大小的调用方使用）
+
+        Args:
+            payload: serialize()的返回值
+        """
+        if self._file is None:
+            self._open()
+        self._write_separator()
+        self._file.write(payload)
+        self.count += 1
+
+    def close(self) -> None:
+        """写入文件尾并关闭文件"""
+        if self._file is not None:
+            self._write_footer()
+            self._file.close()
+            self._file = None
+
+    def abort(self) -> None:
+        """放弃写入：不写文件尾，关闭并删除本写入器创建的文件，避免留下被截断但格式完整的输出"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._created and os.path.exists(self.file_path):
+            os.remove(self.file_path)
+        self._created = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+class JsonArrayWriter(RecordWriter):
+    """
+    JSON数组增量写入器，输出内容与json.dump(list, ...)一致
+    """
+
+    def __init__(self, file_path: str, encoding: Optional[str] = None,
+                 lazy: bool = True, compact: bool = False):
+        """
+        Args:
+            compact: 为True时输出无缩进的紧凑JSON
+        """
+        self.format = "json_compact" if compact else "json"
+        self.indent = None if compact else OUTPUT_SETTINGS.get("indent", 2)
+        super().__init__(file_path, encoding=encoding, lazy=lazy)
+
+    def _write_header(self) -> None:
+        self._file.write("[")
+
+    def _write_separator(self) -> None:
+        if self.indent:
+            self._file.write(",\n" if self.count else "\n")
+        elif self.count:
+            self._file.write(",")
+
+    def _write_footer(self) -> None:
+        self._file.write("\n]" if self.indent and self.count else "]")
+
+
+class JsonLinesWriter(RecordWriter):
+    """
+    JSON Lines增量写入器
+    每条记录写为一行JSON
+    """
+
+    format = "jsonl"
+
+    def write_serialized(self, payload: str) -> None:
+        super().write_serialized(payload)
+        self._file.write("\n")
+
+
+class MsgpackWriter(RecordWriter):
+    """
+    MessagePack增量写入器，记录依次打包写入同一个二进制文件
+    """
+
+    format = "msgpack"
+    binary = True
+
+    def __init__(self, file_path: str, encoding: Optional[str] = None, lazy: bool = True):
+        get_output_format("msgpack")
+        super().__init__(file_path, encoding=encoding, lazy=lazy)
+
+
+def open_record_writer(file_path: str, fmt: Optional[str] = None, lazy: bool = True) -> RecordWriter:
+    """
+    按输出格式创建增量写入器
+
+    Args:
+        file_path: 输出文件路径
+        fmt: 输出格式，为None时使用OUTPUT_SETTINGS["format"]
+        lazy: 为True时首次写入才创建文件
+
+    Returns:
+        RecordWriter: 写入器实例
+    """
+    fmt = get_output_format(fmt)
+    if fmt == "jsonl":
+        return JsonLinesWriter(file_path, lazy=lazy)
+    if fmt == "msgpack":
+        return MsgpackWriter(file_path, lazy=lazy)
+    return JsonArrayWriter(file_path, lazy=lazy, compact=(fmt == "json_compact"))
+
+
+def dump_records(records: Iterable[Any], file_path: str, fmt: Optional[str] = None) -> int:
+    """
+    将记录写入文件（数据为空时同样生成文件）
+
+    Args:
+        records: 记录列表或可迭代对象
+        file_path: 输出文件路径
+        fmt: 输出格式，为None时使用OUTPUT_SETTINGS["format"]
+
+    Returns:
+        int: 写入的记录数
+    """
+    with open_record_writer(file_path, fmt, lazy=False) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
+
+
+def detect_format(file_path: str) -> str:
+    """
+    识别记录文件格式：优先依据扩展名，.json文件再根据首个非空白字符判断
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        str: "json"（JSON数组，含紧凑格式）、"jsonl" 或 "msgpack"
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".jsonl":
+        return "jsonl"
+    if extension == ".msgpack":
+        return "msgpack"
+
+    with open(file_path, 'rb') as f:
+        head = f.read(64).lstrip(b"\xef\xbb\xbf \t\r\n")
+    if not head or head[:1] == b"[":
+        return "json"
+    if head[:1] == b"{":
+        return "jsonl"
+    return "msgpack"
+
+
+def iter_records(file_path: str, fmt: Optional[str] = None) -> Iterator[Any]:
+    """
+    逐条读取记录文件，自动识别格式
+
+    Args:
+        file_path: 文件路径
+        fmt: 文件格式，为None时自动识别
+
+    Yields:
+        Any: 单条记录
+    """
+    fmt = fmt or detect_format(file_path)
+    if fmt == "jsonl":
+        yield from iter_json_lines(file_path)
+    elif fmt == "msgpack":
+        get_output_format("msgpack")
+        with open(file_path, 'rb') as f:
+            yield from msgpack.Unpacker(f, raw=False)
+    else:
+        yield from iter_json_array(file_path)
+
+
+def load_records(file_path: str, fmt: Optional[str] = None) -> List[Any]:
+    """
+    读取记录文件的全部记录，自动识别格式
+
+    Args:
+        file_path: 文件路径
+        fmt: 文件格式，为None时自动识别
+
+    Returns:
+        List[Any]: 记录列表
+    """
+    fmt = fmt or detect_format(file_path)
+    if fmt == "json":
+        with open(file_path, 'r', encoding=OUTPUT_SETTINGS.get("encoding", "utf-8")) as f:
+            return json.load(f)
+    return list(iter_records(file_path, fmt))
+
+
+def is_record_file(file_name: str) -> bool:
+    """
+    判断文件是否为可读取的记录文件
+
+    Args:
+        file_name: 文件名或路径
+
+    Returns:
+        bool: 扩展名属于RECORD_FILE_EXTENSIONS时返回True
+    """
+    return file_name.lower().endswith(RECORD_FILE_EXTENSIONS)
+
+
+def iter_json_lines(file_path: str, encoding: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    逐行读取JSON Lines文件
+
+    Args:
+        file_path: 文件路径
+        encoding: 文件编码，为None时使用OUTPUT_SETTINGS中的配置
+
+    Yields:
+        Dict[str, Any]: 单条记录
+    """
+    encoding = encoding or OUTPUT_SETTINGS.get("encoding", "utf-8")
+    with open(file_path, 'r', encoding=encoding) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+# 可能出现在JSON数字中的字符
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
+def iter_json_array(
+    file_path: str,
+    encoding: Optional[str] = None,
+    buffer_size: int = 1 << 20
+) -> Iterator[Any]:
+    """
+    增量解析JSON数组文件，逐个产出顶层数组元素
+    
+    每次只读入buffer_size个字符，内存占用与单个元素大小相关，与文件大小无关
+    
+    Args:
+        file_path: JSON数组文件路径
+        encoding: 文件编码，为None时使用OUTPUT_SETTINGS中的配置
+        buffer_size: 每次读取的字符数
+        
+    Yields:
+        Any: 顶层数组中的单个元素
+        
+    Raises:
+        json.JSONDecodeError: 文件内容不是JSON数组或格式错误（ValueError的子类）
+    """
+    encoding = encoding or OUTPUT_SETTINGS.get("encoding", "utf-8")
+    decoder = json.JSONDecoder()
+    
+    with open(file_path, 'r', encoding=encoding) as f:
+        buffer = f.read(buffer_size)
+        eof = len(buffer) < buffer_size
+        pos = 0
+        
+        def fill(pos):
+            """丢弃已解析部分并继续读入数据，返回新的(buffer, pos, eof)"""
+            chunk = f.read(buffer_size)
+            return buffer[pos:] + chunk, 0, len(chunk) < buffer_size
+        
+        def skip_whitespace(pos):
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            return pos
+        
+        # 兼容UTF-8 BOM（BOM只可能出现在文件开头），然后定位数组起始的"["
+        if buffer.startswith("\ufeff"):
+            pos = 1
+        while True:
+            pos = skip_whitespace(pos)
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos, eof = fill(pos)
+        if pos >= len(buffer) or buffer[pos] != "[":
+            raise json.JSONDecodeError("JSON文件必须包含一个数组", buffer, pos)
+        pos += 1
+        
+        # 刚读到"["时可以是元素或"]"；逗号之后必须是元素；元素之后必须是","或"]"
+        expect_value = True
+        after_comma = False
+        while True:
+            pos = skip_whitespace(pos)
+            if pos >= len(buffer):
+                if eof:
+                    raise json.JSONDecodeError("JSON数组未正常结束", buffer, pos)
+                buffer, pos, eof = fill(pos)
+                continue
+            
+            char = buffer[pos]
+            if expect_value and after_comma and char in ",]":
+                raise json.JSONDecodeError("JSON数组的逗号后缺少元素", buffer, pos)
+            if char == "]":
+                pos += 1
+                break
+            if not expect_value:
+                if char != ",":
+                    raise json.JSONDecodeError("JSON数组元素之间缺少逗号", buffer, pos)
+                pos += 1
+                expect_value = True
+                after_comma = True
+                continue
+            
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # 元素跨越了缓冲区边界，读入更多数据后重试
+                if eof:
+                    raise
+                buffer, pos, eof = fill(pos)
+                continue
+            
+            if not eof:
+                # 数字可能在缓冲区边界被截断（如"-1.5"只读入了"-1."），
+                # 读到元素后面的分隔符、且分隔符不会是数字的一部分时才确认解析结果
+                next_pos = skip_whitespace(end)
+                if next_pos >= len(buffer) or (next_pos == end and buffer[end] in _NUMBER_CHARS):
+                    buffer, pos, eof = fill(pos)
+                    continue
+            
+            yield value
+            pos = end
+            expect_value = False
+            after_comma = False
+            
+            # 已解析部分超过一个缓冲区大小时再截断，避免频繁复制
+            if pos > buffer_size:
+                buffer, pos = buffer[pos:], 0
+        
+        # 数组结束后只允许空白字符
+        while True:
+            pos = skip_whitespace(pos)
+            if pos < len(buffer):
+                raise json.JSONDecodeError("JSON数组结束后存在多余内容", buffer, pos)
+            if eof:
+                return
+            buffer, pos, eof = fill(pos)
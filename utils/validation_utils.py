@@ -1,7 +1,10 @@
 """
 数据验证相关工具函数
 """
-from typing import Any, List, Dict, Union
+from typing import Any, List, Dict, Union, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
 
 
 def is_none_or_empty(value: Any) -> bool:
@@ -63,4 +66,109 @@ def get_missing_fields(data_row: Dict[str, Any], required_fields: List[str]) ->
         List[str]: 缺失的字段名列表
     """
     field_status = check_required_fields(data_row, required_fields)
-    return [field for field, is_complete in field_status.items() if not is_complete]
\ No newline at end of file
+    return [field for field, is_complete in field_status.items() if not is_complete]
+
+
+def _column_empty_mask(column: Union[pd.Series, Sequence[Any]]) -> np.ndarray:
+    """
+    按列批量计算单列的空值掩码（isna与.str向量化操作，不逐个值调用Python函数）
+    
+    - None视为空；NaN/pd.NA/NaT同样视为空（Excel读取路径中缺失值已转为None，
+      validate_dataframe输出的记录中也会转为None，与逐字段检查的结果一致）
+    - 仅含空白字符的字符串视为空
+    - 空列表、空字典视为空
+    
+    Args:
+        column: 单列数据（Series或序列）
+        
+    Returns:
+        np.ndarray: 布尔数组，True表示该行此字段为空
+    """
+    if not isinstance(column, pd.Series):
+        column = pd.Series(list(column), dtype=object)
+    
+    mask = column.isna().to_numpy(dtype=bool, copy=True)
+    if column.dtype != object and not pd.api.types.is_string_dtype(column):
+        # 数值、日期等列只可能存在缺失值类型的空值
+        return mask
+    
+    # 按列推断值的类型：纯数值等列只可能存在缺失值类型的空值
+    inferred = pd.api.types.infer_dtype(column, skipna=True)
+    if inferred != "string" and not inferred.startswith("mixed"):
+        return mask
+    
+    text = column.str
+    # 仅含空白字符的字符串：只比较非缺失的位置（非字符串的值strip后为缺失值，不会等于""）
+    np.equal(text.strip().to_numpy(dtype=object), "", out=mask, where=~mask)
+    if inferred != "string":
+        # 可能含列表、字典（JSON/Excel数据中只会出现这两种容器）：.str.len对容器同样适用，长度为0视为空
+        empty_containers = np.zeros(len(mask), dtype=bool)
+        np.equal(text.len().to_numpy(dtype=object), 0, out=empty_containers, where=~mask)
+        mask |= empty_containers
+    return mask
+
+
+def build_empty_masks(
+    columns: Union[pd.DataFrame, Mapping[str, Sequence[Any]]],
+    required_fields: List[str]
+) -> np.ndarray:
+    """
+    按列批量计算必需字段的空值掩码
+    
+    Args:
+        columns: DataFrame，或字段名到列数据的映射
+        required_fields: 必需字段列表
+        
+    Returns:
+        np.ndarray: 形状为(行数, 字段数)的布尔矩阵，True表示该字段缺失；
+                    输入中不存在的字段整列视为缺失
+    """
+    if isinstance(columns, pd.DataFrame):
+        row_count = len(columns)
+    else:
+        row_count = len(next(iter(columns.values()), []))
+    
+    masks = np.ones((row_count, len(required_fields)), dtype=bool)
+    for j, field in enumerate(required_fields):
+        if field in columns:
+            masks[:, j] = _column_empty_mask(columns[field])
+    
+    return masks
+
+
+def records_to_columns(data: List[Dict[str, Any]], fields: List[str]) -> Dict[str, List[Any]]:
+    """
+    将记录列表转换为按列存储的字典（缺失的键以None填充）
+    
+    Args:
+        data: 记录列表
+        fields: 需要提取的字段列表
+        
+    Returns:
+        Dict[str, List[Any]]: 字段名到列数据的映射
+    """
+    return {field: [row.get(field) for row in data] for field in fields}
+
+
+def summarize_empty_masks(masks: np.ndarray, required_fields: List[str]) -> Dict[str, int]:
+    """
+    根据空值掩码统计各字段缺失次数
+    
+    字段顺序与逐行统计时一致：按首次出现缺失的行号排序，同一行内按字段顺序排序
+    
+    Args:
+        masks: build_empty_masks返回的布尔矩阵
+        required_fields: 必需字段列表
+        
+    Returns:
+        Dict[str, int]: 字段名到缺失次数的映射，只包含缺失次数大于0的字段
+    """
+    if masks.size == 0:
+        return {}
+    
+    counts = masks.sum(axis=0)
+    first_rows = masks.argmax(axis=0)
+    present = [j for j in range(len(required_fields)) if counts[j] > 0]
+    present.sort(key=lambda j: (first_rows[j], j))
+    
+    return {required_fields[j]: int(counts[j]) for j in present}